@@ -0,0 +1,58 @@
+"""
+Conditional GET (ETag / Last-Modified) for list endpoints
+
+Polling clients send back the validators they were given; when nothing in
+the list changed the view answers 304 Not Modified after a single aggregate
+query, without fetching or serializing any rows.
+"""
+
+import hashlib
+from calendar import timegm
+from datetime import datetime
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalListMixin:
+    """
+    Add ETag / Last-Modified validators to a ListAPIView's GET
+
+    Subclasses set ``version_aggregates``: aggregate expressions over the
+    filtered queryset that change whenever the rendered list would (row
+    count, max(updated_at), ...). The ETag also covers the user and the full
+    query string, so per-user scopes and filters/pages get their own tags.
+
+    Last-Modified is the newest timestamp among the aggregates. Removing a
+    row does not move it, so clients should rely on If-None-Match (which
+    takes precedence) rather than If-Modified-Since alone.
+    """
+
+    version_aggregates = {}
+
+    def get_version_aggregates(self):
+        return self.version_aggregates
+
+    def get_version(self, request):
+        queryset = self.filter_queryset(self.get_queryset())
+        return queryset.order_by().aggregate(**self.get_version_aggregates())
+
+    def get(self, request, *args, **kwargs):
+        version = self.get_version(request)
+
+        raw = repr((request.user.pk, request.get_full_path(), sorted(version.items())))
+        etag = quote_etag(hashlib.md5(raw.encode()).hexdigest())
+        timestamps = [value for value in version.values() if isinstance(value, datetime)]
+        last_modified = timegm(max(timestamps).utctimetuple()) if timestamps else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+
+        response.headers["ETag"] = etag
+        if last_modified is not None:
+            response.headers["Last-Modified"] = http_date(last_modified)
+        # Always revalidate, and never share one user's list with another
+        patch_cache_control(response, private=True, no_cache=True)
+        patch_vary_headers(response, ["Authorization"])
+        return response
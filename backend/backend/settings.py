@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -122,7 +123,7 @@ WSGI_APPLICATION = "backend.wsgi.application"
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.StaffProfileJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -136,6 +137,65 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 100,
 }
 
+# Upper bound for ?page_size= on maintenance request lists (see maintenance/pagination.py)
+MAINTENANCE_MAX_PAGE_SIZE = 200
+
+# Delta sync (maintenance/sync.py) re-sends changes from the last this many
+# seconds on every call, so rows from a write that committed late are not
+# skipped; keep it above the longest write transaction
+MAINTENANCE_SYNC_WINDOW = 60
+
+# Request photo uploads (see maintenance/uploads.py and maintenance/images.py)
+MAINTENANCE_MAX_PHOTO_SIZE = 10 * 1024 * 1024
+# Threads creating photo variants in the background; 0 processes them inline
+MAINTENANCE_IMAGE_WORKERS = 2
+# Seconds after which generate_photo_variants retries a photo still
+# "processing" (its in-memory job was lost, e.g. to a restart)
+MAINTENANCE_IMAGE_RETRY_AFTER = 600
+
+# SLA targets in hours from creation, by room type ("default" for the rest):
+# "respond" = picked up (in progress), "resolve" = completed.
+# See maintenance/sla.py and the scan_overdue_requests command.
+MAINTENANCE_SLA_TARGETS = {
+    "default": {"respond": 24, "resolve": 120},
+    "restroom": {"respond": 4, "resolve": 24},
+    "utility": {"respond": 4, "resolve": 48},
+    "laboratory": {"respond": 8, "resolve": 72},
+}
+
+# Completed/rejected requests closed longer ago than this are moved to the
+# archive tables by the archive_requests command (maintenance/archive.py)
+MAINTENANCE_ARCHIVE_AFTER_DAYS = 365
+
+# Notifications are written inline during the request. Set to True to queue
+# them after commit for the deliver_notifications worker instead
+# (notifications/queue.py); only do so where that worker is deployed, e.g.
+# ``python manage.py deliver_notifications --loop``, or nothing is delivered
+NOTIFICATIONS_DEFERRED = False
+# Retry backoff for failed delivery jobs, in seconds (doubles per attempt)
+NOTIFICATION_RETRY_DELAY = 30
+NOTIFICATION_RETRY_MAX_DELAY = 3600
+
+# Cache holding the admin recipient ids (notifications/recipients.py).
+# The default LocMemCache is per process: other processes see admin changes
+# after the TTL. Point this at a shared cache to invalidate everywhere.
+NOTIFICATION_RECIPIENTS_CACHE = "default"
+NOTIFICATION_RECIPIENTS_TTL = 300
+
+# Server-sent notification stream (/api/notifications/stream/, served by
+# backend/asgi.py). Processes on this host relay stream events through this
+# SQLite file (notifications/bus.py), kept out of the source tree; None
+# disables the stream (as backend/test_runner.py does for tests).
+NOTIFICATION_EVENT_BUS = Path(tempfile.gettempdir()) / "notification_events.sqlite3"
+# How often each ASGI process checks the bus, in seconds
+NOTIFICATION_EVENT_POLL_INTERVAL = 0.5
+# Seconds of events kept for clients resuming with Last-Event-ID
+NOTIFICATION_EVENT_RETENTION = 3600
+# Seconds between keepalive comments on an idle stream
+NOTIFICATION_STREAM_KEEPALIVE = 15
+# Lifetime of the single-use tickets that open a stream, in seconds
+NOTIFICATION_STREAM_TICKET_TTL = 30
+
 from datetime import timedelta
 
 SIMPLE_JWT = {
@@ -156,9 +216,16 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        # File-backed test database: the in-memory default uses a shared
+        # cache whose table locks fail instantly instead of waiting, which
+        # breaks the concurrent claim tests.
+        "TEST": {"NAME": BASE_DIR / "test_db.sqlite3"},
     }
 }
 
+# Keeps tests off the shared notification event bus
+TEST_RUNNER = "backend.test_runner.TestRunner"
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
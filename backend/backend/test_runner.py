@@ -0,0 +1,21 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    The default runner, with the notification event bus turned off
+
+    NOTIFICATION_EVENT_BUS is a file shared by every process on the host, so
+    events from test users would reach a dev server's streams. Tests that
+    need the bus point it at a temporary file themselves.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._bus_settings = override_settings(NOTIFICATION_EVENT_BUS=None)
+        self._bus_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._bus_settings.disable()
+        super().teardown_test_environment(**kwargs)
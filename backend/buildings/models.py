@@ -19,6 +19,7 @@ class Building(models.Model):
         default=0, help_text="Total number of floors in this building"
     )
     description = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return self.name
@@ -47,6 +48,7 @@ class Floor(models.Model):
         max_length=50,
         help_text="Human-readable label (e.g., 'Ground Floor', '2nd Floor', 'Rooftop')",
     )
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.building.name} – {self.label}"
@@ -107,6 +109,7 @@ class Room(models.Model):
         default="other",
         blank=True,
     )
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         if self.floor:
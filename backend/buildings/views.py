@@ -1,8 +1,9 @@
 from rest_framework import viewsets
 from rest_framework.response import Response
-from django.db.models import Count
+from django.db.models import Count, Max
 from rest_framework import generics
 from rest_framework.permissions import IsAuthenticated
+from api.conditional import ConditionalListMixin
 from .models import Building, Floor, Room
 from .serializers import BuildingSerializer, FloorSerializer, RoomSerializer
 
@@ -28,10 +29,11 @@ class BuildingIssuesViewSet(viewsets.ViewSet):
 
         return Response(buildings)
 
-class BuildingListCreateView(generics.ListCreateAPIView):
+class BuildingListCreateView(ConditionalListMixin, generics.ListCreateAPIView):
     queryset = Building.objects.all()
     serializer_class = BuildingSerializer
     permission_classes = [IsAuthenticated]
+    version_aggregates = {"count": Count("id"), "updated": Max("updated_at")}
 
 
 class BuildingDetailView(generics.RetrieveUpdateDestroyAPIView):
@@ -40,18 +42,29 @@ class BuildingDetailView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
 
 
-class FloorListView(generics.ListAPIView):
+class FloorListView(ConditionalListMixin, generics.ListAPIView):
     serializer_class = FloorSerializer
     permission_classes = [IsAuthenticated]
+    version_aggregates = {
+        "count": Count("id"),
+        "updated": Max("updated_at"),
+        "building": Max("building__updated_at"),
+    }
 
     def get_queryset(self):
         building_id = self.kwargs["building_id"]
         return Floor.objects.filter(building_id=building_id)
 
 
-class RoomListView(generics.ListAPIView):
+class RoomListView(ConditionalListMixin, generics.ListAPIView):
     serializer_class = RoomSerializer
     permission_classes = [IsAuthenticated]
+    version_aggregates = {
+        "count": Count("id"),
+        "updated": Max("updated_at"),
+        "building": Max("building__updated_at"),
+        "floor": Max("floor__updated_at"),
+    }
 
     def get_queryset(self):
         floor_id = self.kwargs.get("floor_id", None)
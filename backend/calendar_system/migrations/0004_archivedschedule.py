@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calendar_system', '0003_alter_maintenanceschedule_assigned_staff'),
+        ('maintenance', '0020_archivedrequest'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedSchedule',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('schedule_date', models.DateField()),
+                ('estimated_duration', models.CharField(blank=True, max_length=100, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('assigned_staff', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('request', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='schedule', to='maintenance.archivedrequest')),
+            ],
+        ),
+    ]
@@ -1,5 +1,5 @@
 from django.db import models
-from maintenance.models import MaintenanceRequest
+from maintenance.models import ArchivedRequest, MaintenanceRequest
 from accounts.models import User
 
 class MaintenanceSchedule(models.Model):
@@ -23,4 +23,22 @@ class MaintenanceSchedule(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"Schedule for Request #{self.request.id} on {self.schedule_date}"
\ No newline at end of file
+        return f"Schedule for Request #{self.request.id} on {self.schedule_date}"
+
+
+class ArchivedSchedule(models.Model):
+    """Schedule of an archived request (see maintenance/archive.py)"""
+
+    id = models.IntegerField(primary_key=True)
+    request = models.OneToOneField(
+        ArchivedRequest, on_delete=models.CASCADE, related_name="schedule"
+    )
+    schedule_date = models.DateField()
+    estimated_duration = models.CharField(max_length=100, blank=True, null=True)
+    assigned_staff = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    created_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Archived schedule for request #{self.request_id} on {self.schedule_date}"
@@ -0,0 +1,46 @@
+"""
+Fast rendering for calendar schedule lists
+
+Builds the same JSON as MaintenanceScheduleSerializer. The query runs from
+the MaintenanceRequest side of the one-to-one so the nested
+``request_details`` can reuse maintenance.rows.request_row directly; schedule
+columns come through the ``schedule__`` prefix. Keep in sync with
+MaintenanceScheduleSerializer.
+"""
+
+from maintenance.rows import REQUEST_VALUES, date_repr, datetime_repr, request_row, user_dict
+
+SCHEDULE_VALUES = REQUEST_VALUES + (
+    "schedule__id",
+    "schedule__schedule_date",
+    "schedule__estimated_duration",
+    "schedule__assigned_staff_id",
+    "schedule__assigned_staff__username",
+    "schedule__assigned_staff__first_name",
+    "schedule__assigned_staff__last_name",
+    "schedule__assigned_staff__email",
+    "schedule__created_at",
+)
+
+
+def schedule_row(row):
+    return {
+        "id": row["schedule__id"],
+        "request": row["id"],
+        # The serializer is used without a request in context, so photo
+        # URLs are relative here as well
+        "request_details": request_row(row, full=True),
+        "schedule_date": date_repr(row["schedule__schedule_date"]),
+        "estimated_duration": row["schedule__estimated_duration"],
+        "assigned_staff": row["schedule__assigned_staff_id"],
+        "assigned_staff_details": user_dict(row, "schedule__assigned_staff"),
+        "created_at": datetime_repr(row["schedule__created_at"]),
+    }
+
+
+def schedule_rows(requests):
+    """
+    Render schedules from a MaintenanceRequest queryset already filtered to
+    requests that have a schedule
+    """
+    return [schedule_row(row) for row in requests.values(*SCHEDULE_VALUES)]
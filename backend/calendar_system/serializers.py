@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import MaintenanceSchedule
+from .models import ArchivedSchedule, MaintenanceSchedule
 from maintenance.serializers import MaintenanceRequestSerializer
 from accounts.serializers import UserSerializer
 from accounts.models import User
@@ -33,3 +33,19 @@ class MaintenanceScheduleSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["created_at"]
 
+
+class ArchivedScheduleSerializer(serializers.ModelSerializer):
+    assigned_staff_details = UserSerializer(source="assigned_staff", read_only=True)
+
+    class Meta:
+        model = ArchivedSchedule
+        fields = [
+            "id",
+            "request",
+            "schedule_date",
+            "estimated_duration",
+            "assigned_staff",
+            "assigned_staff_details",
+            "created_at",
+        ]
+        read_only_fields = fields
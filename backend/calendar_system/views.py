@@ -3,6 +3,7 @@ from rest_framework import permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from .models import MaintenanceSchedule
+from .rows import schedule_rows
 from .serializers import MaintenanceScheduleSerializer
 from maintenance.models import MaintenanceRequest
 
@@ -61,33 +62,16 @@ class CalendarMonthView(APIView):
         if not year or not month:
             return Response({"error": "year and month required"}, status=400)
 
-        # ✅ CRITICAL FIX: Add select_related and prefetch_related
-        # This fetches all nested data in ONE query instead of N+1 queries
-        schedules = MaintenanceSchedule.objects.filter(
-            schedule_date__year=year, 
-            schedule_date__month=month
-        ).select_related(
-            "request",  # Fetch the maintenance request
-            "request__building",  # Fetch the building
-            "request__floor",  # Fetch the floor
-            "request__room",  # Fetch the room
-            "request__assigned_to",  # Fetch assigned user
-            "assigned_staff"  # Fetch schedule assigned staff
+        # Rendered from a values() query (see calendar_system/rows.py) - same
+        # JSON as MaintenanceScheduleSerializer without building model instances
+        requests = MaintenanceRequest.objects.filter(
+            schedule__schedule_date__year=year,
+            schedule__schedule_date__month=month,
         ).exclude(
-            request__status='for_approval'  # ✅ Exclude for_approval at DB level
-        )
-
-        # ✅ DEBUG: Print query results
-        print(f"📊 Found {schedules.count()} schedules for {year}-{month}")
-        for schedule in schedules:
-            print(f"  - Schedule #{schedule.id}: {schedule.schedule_date}, Request: #{schedule.request.id}, Status: {schedule.request.status}")
+            status='for_approval'  # ✅ Exclude for_approval at DB level
+        ).order_by("schedule__id")
 
-        serializer = MaintenanceScheduleSerializer(schedules, many=True)
-        
-        # ✅ DEBUG: Print serialized data
-        print(f"📤 Returning {len(serializer.data)} schedules")
-        
-        return Response(serializer.data)
+        return Response(schedule_rows(requests))
 
 
 # ✅ BONUS: Add this view to get ALL schedules (for debugging/fallback)
@@ -0,0 +1,219 @@
+"""
+Database-side analytics for maintenance requests.
+
+Every number here is produced by aggregate/annotate queries so the
+analytics endpoint never has to load individual requests into Python.
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.utils import timezone
+
+from .models import MaintenanceRequest, RequestDailyStat, RequestStatusEvent
+
+DEFAULT_WINDOW_DAYS = 30
+PERCENTILES = (50, 90, 95)
+
+
+def day_start(day):
+    """Return an aware datetime for the first instant of ``day``"""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _hours(value):
+    if value is None:
+        return None
+    if isinstance(value, timedelta):
+        value = value.total_seconds()
+    else:
+        # Some backends hand back durations as raw microseconds
+        value = value / 1_000_000
+    return round(value / 3600, 1)
+
+
+def _elapsed(field):
+    return ExpressionWrapper(F(field) - F("created_at"), output_field=DurationField())
+
+
+def _percentiles(queryset, count):
+    """
+    Pick percentile values straight out of the database with ORDER BY/OFFSET
+    instead of pulling every duration into memory.
+    """
+    result = {}
+    ordered = queryset.order_by("elapsed").values_list("elapsed", flat=True)
+    for p in PERCENTILES:
+        if not count:
+            result[f"p{p}"] = None
+            continue
+        index = min(count - 1, round(p / 100 * (count - 1)))
+        result[f"p{p}"] = _hours(ordered[index])
+    return result
+
+
+def _duration_stats(queryset, field):
+    """Count, average and percentiles of ``field - created_at`` in hours"""
+    queryset = queryset.filter(**{f"{field}__isnull": False}).annotate(elapsed=_elapsed(field))
+    stats = queryset.aggregate(count=Count("id"), average=Avg("elapsed"))
+    return {
+        "count": stats["count"],
+        "average": _hours(stats["average"]),
+        "percentiles": _percentiles(queryset, stats["count"]),
+    }
+
+
+def _time_in_status(requests):
+    """
+    Average hours requests spent in each status before moving on, from the
+    ``duration`` recorded on each RequestStatusEvent
+    """
+    rows = (
+        RequestStatusEvent.objects.filter(request__in=requests, duration__isnull=False)
+        .values("from_status")
+        .annotate(count=Count("id"), average=Avg("duration"))
+        .order_by()
+    )
+    return {
+        row["from_status"]: {"count": row["count"], "average": _hours(row["average"])}
+        for row in rows
+    }
+
+
+def daily_series(counter, key, start, end, building_id=None, status=None):
+    """
+    Read a per-day series from the RequestDailyStat rollup
+
+    Args:
+        counter (str): ``"created"`` or ``"entered"``
+        key (str): Name of the value key in each returned point
+        start (date): First day (inclusive)
+        end (date): Last day (inclusive)
+        building_id (int, optional): Restrict to one building
+        status (str, optional): Restrict to one status
+    """
+    rows = RequestDailyStat.objects.filter(day__gte=start, day__lte=end)
+    if building_id:
+        rows = rows.filter(building_id=building_id)
+    if status:
+        rows = rows.filter(status=status)
+    counts = dict(rows.values("day").annotate(total=Sum(counter)).values_list("day", "total").order_by())
+
+    # Fill in the empty days so charts get a continuous series
+    series = []
+    day = start
+    while day <= end:
+        series.append({"date": day.isoformat(), key: counts.get(day) or 0})
+        day += timedelta(days=1)
+    return series
+
+
+def build_analytics(start=None, end=None, building_id=None):
+    """
+    Compute the analytics payload for the admin dashboard
+
+    Args:
+        start (date, optional): First day (inclusive) of the reporting window
+        end (date, optional): Last day (inclusive) of the reporting window
+        building_id (int, optional): Restrict everything to one building
+
+    Totals, averages and per-building figures cover the whole window; when
+    no window is given they cover all requests. Daily series come from the
+    RequestDailyStat rollup and default to the last 30 days.
+    """
+    today = timezone.localdate()
+    queryset = MaintenanceRequest.objects.all()
+
+    if building_id:
+        queryset = queryset.filter(building_id=building_id)
+
+    scoped = queryset
+    if start:
+        scoped = scoped.filter(created_at__gte=day_start(start))
+    if end:
+        scoped = scoped.filter(created_at__lt=day_start(end + timedelta(days=1)))
+
+    status_aggregates = {
+        value: Count("id", filter=Q(status=value))
+        for value, _label in MaintenanceRequest.STATUS_CHOICES
+    }
+    totals = scoped.aggregate(
+        total=Count("id"),
+        last_7_days=Count("id", filter=Q(created_at__gte=day_start(today - timedelta(days=6)))),
+        last_30_days=Count("id", filter=Q(created_at__gte=day_start(today - timedelta(days=29)))),
+        **status_aggregates,
+    )
+    total = totals.pop("total")
+    recent = {
+        "last_7_days": totals.pop("last_7_days"),
+        "last_30_days": totals.pop("last_30_days"),
+    }
+    status_counts = totals
+
+    # Response time: created -> first picked up, completion time: created ->
+    # completed, both from the timestamps the status history maintains
+    response = _duration_stats(scoped, "responded_at")
+    completion = _duration_stats(scoped, "completed_at")
+    time_in_status = _time_in_status(scoped)
+
+    series_end = end or today
+    series_start = start or series_end - timedelta(days=DEFAULT_WINDOW_DAYS - 1)
+
+    buildings = (
+        scoped.values("building_id", "building__name")
+        .annotate(total=Count("id"), **status_aggregates)
+        .order_by("-total", "building__name")
+    )
+
+    locations = (
+        scoped.values("building__name", "floor__number")
+        .annotate(count=Count("id"))
+        .order_by("-count")[:10]
+    )
+
+    engagement = (
+        scoped.filter(created_at__gte=day_start(today - timedelta(days=29)))
+        .values("requester_name")
+        .annotate(count=Count("id"))
+        .order_by("-count")[:10]
+    )
+
+    return {
+        "range": {
+            "start": start.isoformat() if start else None,
+            "end": end.isoformat() if end else None,
+        },
+        "building": building_id,
+        "total_requests": total,
+        "status_counts": status_counts,
+        "completion_rate": round(status_counts["completed"] / total * 100, 1) if total else 0,
+        "recent": recent,
+        "avg_response_time": response["average"],
+        "avg_completion_time": completion["average"],
+        "response_time": response,
+        "completion_time": completion,
+        "time_in_status": time_in_status,
+        "request_trends": daily_series("created", "requests", series_start, series_end, building_id),
+        "completion_trends": daily_series(
+            "entered", "completed", series_start, series_end, building_id, status="completed"
+        ),
+        "buildings": [
+            {
+                "building_id": row.pop("building_id"),
+                "building": row.pop("building__name"),
+                **row,
+            }
+            for row in buildings
+        ],
+        "top_locations": [
+            {
+                "location": f"{row['building__name'] or 'Unknown Building'} - Floor {row['floor__number'] or 'N/A'}",
+                "count": row["count"],
+            }
+            for row in locations
+        ],
+        "user_engagement": [
+            {"user": row["requester_name"] or "Anonymous", "count": row["count"]}
+            for row in engagement
+        ],
+    }
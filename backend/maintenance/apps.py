@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class MaintenanceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'maintenance'
+
+    def ready(self):
+        """Import signals when the app is ready"""
+        import maintenance.signals  # Keeps the daily stats rollup up to date
@@ -0,0 +1,143 @@
+"""
+Hot/cold archival of closed maintenance requests
+
+Completed and rejected requests that were closed more than
+settings.MAINTENANCE_ARCHIVE_AFTER_DAYS ago are moved, with their
+notifications, schedule and status history, from the hot tables into
+ArchivedRequest / ArchivedNotification / ArchivedSchedule, keeping their ids.
+
+The move writes everything with bulk_create and deletes the hot rows
+directly, so no model signals run. Of what they would do:
+- a RequestTombstone is written, so delta-sync clients drop the request
+- the request is removed from the full-text index (search covers hot only)
+- the daily stats rollup is left alone: archived requests still count in
+  it, and ``stats.rebuild`` reads the archive too
+- unread notifications that move come off their users' unread counters
+  (notifications/counters.py counts hot rows only)
+Live analytics (analytics/) only cover the hot table.
+"""
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from calendar_system.models import ArchivedSchedule, MaintenanceSchedule
+from notifications import counters
+from notifications.models import ArchivedNotification, Notification
+from . import search
+from .models import ArchivedRequest, MaintenanceRequest, RequestStatusEvent, RequestTombstone
+from .sla import CLOSED_STATUSES
+
+# Columns copied as-is from MaintenanceRequest to ArchivedRequest
+REQUEST_FIELDS = [
+    "id", "status", "rejection_reason",
+    "requester_name", "role", "section", "student_id",
+    "description", "issue_photo",
+    "building_id", "floor_id", "room_id",
+    "created_at", "updated_at", "status_changed_at", "responded_at", "completed_at",
+    "assigned_to_id", "created_by_id",
+    "completion_notes", "completion_photo", "photo_variants",
+]
+NOTIFICATION_FIELDS = ["id", "user_id", "message", "maintenance_request_id", "created_at", "is_read"]
+SCHEDULE_FIELDS = ["id", "request_id", "schedule_date", "estimated_duration", "assigned_staff_id", "created_at"]
+
+
+def cutoff(days=None):
+    """Requests closed before this moment are due for archival"""
+    if days is None:
+        days = settings.MAINTENANCE_ARCHIVE_AFTER_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+def due(before):
+    """Closed requests whose status last changed before ``before``"""
+    # Unordered: an ORDER BY would let the planner walk the whole table by id
+    return MaintenanceRequest.objects.filter(
+        status__in=CLOSED_STATUSES, status_changed_at__lt=before
+    ).order_by()
+
+
+def event_dict(event):
+    return {
+        "from": event["from_status"],
+        "to": event["to_status"],
+        "actor": event["actor_id"],
+        "at": event["at"].isoformat(),
+        "duration": event["duration"].total_seconds() if event["duration"] is not None else None,
+    }
+
+
+def archive_batch(ids, before):
+    """
+    Move one batch of requests to the archive tables
+
+    Args:
+        ids (list): Request ids, normally from ``due(before)``
+        before (datetime): Rows are re-checked against it inside the
+            transaction, so a request reopened meanwhile stays hot
+
+    Returns:
+        int: Number of requests archived
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        rows = list(
+            due(before).select_for_update().filter(id__in=ids).values(*REQUEST_FIELDS)
+        )
+        if not rows:
+            return 0
+        ids = [row["id"] for row in rows]
+
+        history = defaultdict(list)
+        events = RequestStatusEvent.objects.filter(request_id__in=ids).order_by("at", "id")
+        for event in events.values("request_id", "from_status", "to_status", "actor_id", "at", "duration"):
+            history[event["request_id"]].append(event_dict(event))
+
+        ArchivedRequest.objects.bulk_create(
+            ArchivedRequest(**row, status_history=history[row["id"]], archived_at=now) for row in rows
+        )
+        ArchivedSchedule.objects.bulk_create(
+            ArchivedSchedule(**row)
+            for row in MaintenanceSchedule.objects.filter(request_id__in=ids).values(*SCHEDULE_FIELDS)
+        )
+        notifications = Notification.objects.filter(maintenance_request_id__in=ids)
+        ArchivedNotification.objects.bulk_create(
+            (ArchivedNotification(**row) for row in notifications.values(*NOTIFICATION_FIELDS).iterator()),
+            batch_size=500,
+        )
+
+        counters.subtract_unread(notifications)
+        notifications.delete()
+        MaintenanceSchedule.objects.filter(request_id__in=ids).delete()
+        events.delete()
+        # A queryset delete() would send pre/post_delete for every row
+        placeholders = ", ".join(["%s"] * len(ids))
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {MaintenanceRequest._meta.db_table} WHERE id IN ({placeholders})", ids
+            )
+
+        RequestTombstone.objects.bulk_create(RequestTombstone(request_id=pk) for pk in ids)
+        search.unindex_requests(ids)
+    return len(ids)
+
+
+def archive(before, batch_size=500):
+    """
+    Archive every request due before ``before``, ``batch_size`` per transaction
+
+    Returns:
+        int: Number of requests archived
+    """
+    total = 0
+    while True:
+        ids = list(due(before).values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return total
+        archived = archive_batch(ids, before)
+        if not archived:
+            return total
+        total += archived
@@ -0,0 +1,122 @@
+"""
+Streaming CSV / NDJSON export of maintenance requests
+
+Rows come from a ``.values()`` queryset read with ``.iterator()``, are
+encoded one at a time and handed to StreamingHttpResponse, so memory use
+doesn't grow with the size of the export.
+
+CSV text cells that a spreadsheet would run as a formula (starting with
+``=``, ``+``, ``-``, ``@``, tab or carriage return) are prefixed with ``'``;
+the importer strips that prefix again.
+"""
+
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from .rows import REQUEST_VALUES, datetime_repr, request_row
+
+EXPORT_CHUNK_SIZE = 2000
+
+CSV_COLUMNS = (
+    ("id", lambda row: row["id"]),
+    ("created_at", lambda row: datetime_repr(row["created_at"])),
+    ("updated_at", lambda row: datetime_repr(row["updated_at"])),
+    ("status", lambda row: row["status"]),
+    ("building", lambda row: row["building__name"]),
+    ("floor", lambda row: row["floor__label"]),
+    ("room", lambda row: row["room__name"]),
+    ("requester_name", lambda row: row["requester_name"]),
+    ("role", lambda row: row["role"]),
+    ("section", lambda row: row["section"]),
+    ("student_id", lambda row: row["student_id"]),
+    ("description", lambda row: row["description"]),
+    ("rejection_reason", lambda row: row["rejection_reason"]),
+    ("assigned_to", lambda row: row["assigned_to__username"]),
+    ("created_by", lambda row: row["created_by_id"]),
+    ("completion_notes", lambda row: row["completion_notes"]),
+)
+
+
+# Leading characters that make spreadsheets treat a cell as a formula
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def escape_cell(value):
+    """Neutralise a text cell a spreadsheet would evaluate"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def unescape_cell(value):
+    """Undo ``escape_cell``"""
+    if isinstance(value, str) and value.startswith("'") and value[1:].startswith(FORMULA_PREFIXES):
+        return value[1:]
+    return value
+
+
+class _ExportRenderer(BaseRenderer):
+    """
+    Lets ``?format=csv|ndjson`` (or a matching Accept header) through DRF
+    content negotiation. Successful exports are streamed by the view; only
+    error responses (auth, bad filters) are rendered here, as JSON.
+    """
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return JSONRenderer().render(data)
+
+
+class CSVRenderer(_ExportRenderer):
+    media_type = "text/csv"
+    format = "csv"
+
+
+class NDJSONRenderer(_ExportRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+
+class _Echo:
+    """File-like object whose write() just returns the line csv.writer built"""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([header for header, _value in CSV_COLUMNS])
+    for row in rows:
+        yield writer.writerow([escape_cell(value(row)) for _header, value in CSV_COLUMNS])
+
+
+def ndjson_lines(rows, request=None):
+    """One request per line, in the same shape as the list API"""
+    for row in rows:
+        yield json.dumps(request_row(row, request), ensure_ascii=False) + "\n"
+
+
+def export_response(queryset, export_format, request=None):
+    """
+    Stream ``queryset`` as CSV or NDJSON
+
+    Args:
+        queryset (QuerySet): Filtered MaintenanceRequest queryset
+        export_format (str): "csv" or "ndjson"
+        request (Request, optional): Used to build absolute photo URLs
+    """
+    rows = queryset.values(*REQUEST_VALUES).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    if export_format == "csv":
+        lines, content_type = csv_lines(rows), "text/csv; charset=utf-8"
+    else:
+        lines, content_type = ndjson_lines(rows, request), "application/x-ndjson; charset=utf-8"
+
+    response = StreamingHttpResponse(lines, content_type=content_type)
+    filename = f"maintenance-requests-{timezone.localdate():%Y%m%d}.{export_format}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,70 @@
+"""
+Status history for maintenance requests
+
+Every status transition appends a RequestStatusEvent and updates three
+denormalized timestamps on the request, so metrics never need to replay the
+log:
+
+- status_changed_at: when the request entered its current status; the next
+  event's ``duration`` (time in the previous status) is measured from it
+- responded_at: first time it reached in_progress or completed
+- completed_at: when it was completed (cleared again if reopened)
+
+Saves go through the signals in maintenance/signals.py. Code that writes
+with update()/bulk_update() calls ``transition`` itself and saves the events.
+Set ``instance._actor_id`` before save() to record who made the change.
+"""
+
+from django.utils import timezone
+
+from .models import RequestStatusEvent
+
+# Statuses that mean somebody has picked the request up
+RESPONDED_STATUSES = ["in_progress", "completed"]
+TRANSITION_FIELDS = ["status_changed_at", "responded_at", "completed_at"]
+
+
+def transition(instance, old_status, actor_id=None, at=None):
+    """
+    Apply a status change to ``instance``'s denormalized timestamps
+
+    Args:
+        instance (MaintenanceRequest): Request already holding the new status
+        old_status (str): Previous status, or None for a new request
+        actor_id (int, optional): User who made the change
+        at (datetime, optional): When it happened; defaults to now
+
+    Returns:
+        RequestStatusEvent: Unsaved event, or None if the status didn't change
+    """
+    if old_status == instance.status:
+        return None
+    at = at or timezone.now()
+
+    duration = None
+    if old_status and instance.status_changed_at:
+        duration = at - instance.status_changed_at
+
+    instance.status_changed_at = at
+    if instance.status in RESPONDED_STATUSES and instance.responded_at is None:
+        instance.responded_at = at
+    if instance.status == "completed":
+        instance.completed_at = at
+    elif old_status == "completed":
+        instance.completed_at = None
+
+    return RequestStatusEvent(
+        request_id=instance.pk,
+        from_status=old_status or "",
+        to_status=instance.status,
+        actor_id=actor_id,
+        at=at,
+        duration=duration,
+    )
+
+
+def record(events):
+    """Save events built by ``transition`` (after their requests have ids)"""
+    events = [event for event in events if event is not None]
+    RequestStatusEvent.objects.bulk_create(events)
+    return events
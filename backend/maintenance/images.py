@@ -0,0 +1,268 @@
+"""
+Thumbnail / medium variants for request photos
+
+Originals are kept as uploaded. For each photo field a set of smaller JPEGs
+is written next to it under ``variants/``, EXIF-orientation corrected and
+recompressed, and their names recorded in ``MaintenanceRequest.photo_variants``:
+
+    {"issue_photo": {"source": "issue_photos/a.jpg",
+                     "state": "ready",
+                     "thumb": "issue_photos/variants/a.thumb.jpg",
+                     "medium": "issue_photos/variants/a.medium.jpg"}}
+
+``source`` is the original the variants were made from, so a replaced photo
+is detected and its variants regenerated. ``state`` is "processing" (with
+``queued_at``) until a background worker has decoded the photo, then
+"ready" or "failed" (the upload was not a readable image).
+
+Work runs on a small thread pool (MAINTENANCE_IMAGE_WORKERS threads) after
+the saving transaction commits, so uploads return without waiting for it.
+Jobs live in memory only: if the process restarts they are lost, and the
+generate_photo_variants command picks up entries still "processing" after
+MAINTENANCE_IMAGE_RETRY_AFTER seconds, along with "failed" ones.
+"""
+
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from PIL import Image, ImageOps
+
+from .models import MaintenanceRequest
+
+logger = logging.getLogger(__name__)
+
+PHOTO_FIELDS = ("issue_photo", "completion_photo")
+
+# name: (max width, max height, JPEG quality)
+VARIANTS = {
+    "thumb": (320, 320, 75),
+    "medium": (1280, 1280, 82),
+}
+
+
+def variant_name(name, variant):
+    directory, filename = posixpath.split(name)
+    stem = posixpath.splitext(filename)[0]
+    return posixpath.join(directory, "variants", f"{stem}.{variant}.jpg")
+
+
+def render_variants(fieldfile):
+    """
+    Decode one photo and encode every variant
+
+    Returns:
+        dict: ``{variant: jpeg bytes}``
+
+    Raises:
+        OSError: If the file is missing or not a readable image
+    """
+    with fieldfile.open("rb") as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+
+        rendered = {}
+        for variant, (width, height, quality) in VARIANTS.items():
+            copy = image.copy()
+            copy.thumbnail((width, height), Image.Resampling.LANCZOS)
+            buffer = BytesIO()
+            copy.save(buffer, "JPEG", quality=quality, optimize=True, progressive=True)
+            rendered[variant] = buffer.getvalue()
+    return rendered
+
+
+def photo_variants_repr(photo_variants, field, name, request=None):
+    """
+    API representation of one photo's variants
+
+    ``{"status": "ready", "thumb": URL, "medium": URL}`` once processed,
+    ``{"status": "processing"}`` / ``{"status": "failed"}`` otherwise, and
+    None when there is no photo or it predates variants.
+
+    Args:
+        photo_variants (dict): The request's ``photo_variants``
+        field (str): "issue_photo" or "completion_photo"
+        name (str): Current file name of that photo
+        request (Request, optional): Used to build absolute URLs, as the
+            photo fields do
+    """
+    entry = (photo_variants or {}).get(field)
+    if not name or not entry or entry.get("source") != name:
+        return None
+    storage = MaintenanceRequest._meta.get_field(field).storage
+    data = {"status": entry.get("state", "ready")}
+    for variant in VARIANTS:
+        if entry.get(variant):
+            url = storage.url(entry[variant])
+            data[variant] = request.build_absolute_uri(url) if request is not None else url
+    return data
+
+
+def delete_variants(storage, entry):
+    for variant in VARIANTS:
+        if entry.get(variant):
+            storage.delete(entry[variant])
+
+
+def _delete_replaced(replaced):
+    for storage, entry in replaced:
+        delete_variants(storage, entry)
+
+
+def stale_fields(instance):
+    """Photo fields whose recorded variants don't match the current file"""
+    variants = instance.photo_variants or {}
+    return [
+        field for field in PHOTO_FIELDS
+        if (getattr(instance, field).name or None) != (variants.get(field) or {}).get("source")
+    ]
+
+
+def retry_fields(instance, now=None):
+    """
+    Photo fields the backfill should (re)process: stale ones, "failed"
+    ones, and ones "processing" for longer than MAINTENANCE_IMAGE_RETRY_AFTER
+    seconds (their job was lost)
+    """
+    now = now or timezone.now()
+    stalled_before = now - timedelta(seconds=getattr(settings, "MAINTENANCE_IMAGE_RETRY_AFTER", 600))
+    fields = stale_fields(instance)
+    for field, entry in (instance.photo_variants or {}).items():
+        if field in fields or field not in PHOTO_FIELDS:
+            continue
+        if entry.get("state") == "failed":
+            fields.append(field)
+        elif entry.get("state") == "processing":
+            queued_at = parse_datetime(entry.get("queued_at") or "")
+            if queued_at is None or queued_at < stalled_before:
+                fields.append(field)
+    return fields
+
+
+def generate_variants(instance, fields=None):
+    """
+    Create (or drop) variants for the given photo fields and save the result
+
+    Writes ``photo_variants`` with a queryset update, so it doesn't
+    re-trigger save() signals; ``updated_at`` is bumped so list ETags and
+    delta sync pick up the new state.
+
+    Args:
+        instance (MaintenanceRequest): The request to process
+        fields (list, optional): Photo fields to process; defaults to the
+            ones whose variants are missing or stale
+
+    Returns:
+        dict: The new ``photo_variants`` value
+    """
+    variants = dict(instance.photo_variants or {})
+    for field in stale_fields(instance) if fields is None else fields:
+        fieldfile = getattr(instance, field)
+        old = variants.pop(field, None)
+        if old:
+            delete_variants(fieldfile.storage, old)
+        if not fieldfile.name:
+            continue
+
+        try:
+            rendered = render_variants(fieldfile)
+        except (OSError, ValueError, Image.DecompressionBombError):
+            logger.warning("Could not create variants for %s of request #%s", field, instance.pk, exc_info=True)
+            variants[field] = {"source": fieldfile.name, "state": "failed"}
+            continue
+
+        entry = {"source": fieldfile.name, "state": "ready"}
+        for variant, data in rendered.items():
+            name = variant_name(fieldfile.name, variant)
+            fieldfile.storage.delete(name)
+            entry[variant] = fieldfile.storage.save(name, ContentFile(data))
+        variants[field] = entry
+
+    instance.photo_variants = variants
+    instance.updated_at = timezone.now()
+    MaintenanceRequest.objects.filter(pk=instance.pk).update(
+        photo_variants=variants, updated_at=instance.updated_at
+    )
+    return variants
+
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.MAINTENANCE_IMAGE_WORKERS,
+            thread_name_prefix="photo-variants",
+        )
+    return _executor
+
+
+def process_variants(pk, fields):
+    """Load a request and generate variants for ``fields`` (worker entry point)"""
+    try:
+        instance = MaintenanceRequest.objects.only("id", "photo_variants", *PHOTO_FIELDS).get(pk=pk)
+    except MaintenanceRequest.DoesNotExist:
+        return
+    # Only regenerate what is still waiting; a newer upload may have superseded it
+    fields = [field for field in fields if field not in stale_fields(instance)]
+    generate_variants(instance, fields)
+
+
+def _run_in_worker(pk, fields):
+    try:
+        process_variants(pk, fields)
+    except Exception:
+        logger.exception("Photo variant job for request #%s failed", pk)
+    finally:
+        # Worker threads get their own connection; don't leak it
+        connection.close()
+
+
+def schedule_variants(instance):
+    """
+    Mark new or replaced photos as processing and queue their variants
+
+    Called from post_save. The old variant files are deleted and the job is
+    submitted once the surrounding transaction commits, so a rolled-back
+    save keeps them and the worker always sees the saved row.
+    """
+    fields = stale_fields(instance)
+    if not fields:
+        return
+
+    now = timezone.now()
+    variants = dict(instance.photo_variants or {})
+    replaced = []
+    for field in fields:
+        fieldfile = getattr(instance, field)
+        old = variants.pop(field, None)
+        if old:
+            replaced.append((fieldfile.storage, old))
+        if fieldfile.name:
+            variants[field] = {"source": fieldfile.name, "state": "processing", "queued_at": now.isoformat()}
+    instance.photo_variants = variants
+    instance.updated_at = now
+    MaintenanceRequest.objects.filter(pk=instance.pk).update(
+        photo_variants=variants, updated_at=instance.updated_at
+    )
+    if replaced:
+        transaction.on_commit(lambda: _delete_replaced(replaced))
+
+    pending = [field for field in fields if getattr(instance, field).name]
+    if not pending:
+        return
+    if settings.MAINTENANCE_IMAGE_WORKERS:
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_worker, instance.pk, pending))
+    else:
+        transaction.on_commit(lambda: process_variants(instance.pk, pending))
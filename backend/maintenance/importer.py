@@ -0,0 +1,314 @@
+"""
+Bulk import of historical maintenance requests from CSV or JSONL
+
+Used by the ``import_requests`` command and the requests/import/ endpoint.
+
+Each input row is a flat record with these keys (CSV header / JSON keys):
+description, requester_name, role, section, student_id, status,
+rejection_reason, completion_notes, building, floor, room, assigned_to,
+created_by, created_at, updated_at. The export's CSV columns are accepted
+as-is.
+
+- building / floor / room are names (a floor may also be its number),
+  resolved against maps loaded once up front
+- a room given without a floor must be the only room of that name in the
+  building; otherwise the row is rejected as ambiguous
+- assigned_to / created_by are exact (case-sensitive) usernames, or user ids
+- created_at / updated_at are ISO 8601; both default to now
+- SLA deadlines are computed from created_at, so old open rows are
+  escalated by the next scan_overdue_requests run
+
+Rows are validated and inserted ``batch_size`` at a time with bulk_create,
+then the historical created_at / updated_at that auto_now replaced are
+written back in one bulk_update. That skips model signals, so nobody gets
+a "new request" notification per row; the daily stats and search index
+are updated per batch instead. Invalid rows are skipped and reported with
+their line number. A file that isn't UTF-8 or isn't valid CSV raises
+UnicodeDecodeError / csv.Error while reading; batches before that point
+stay imported.
+"""
+
+import csv
+import io
+import json
+
+from django.contrib.auth.models import User
+from django.db import NotSupportedError, connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from buildings.models import Building, Floor, Room
+from notifications.helpers import notify_admins
+from . import history, search, sla, stats
+from .export import unescape_cell
+from .models import MaintenanceRequest, RequestStatusEvent
+
+IMPORT_FORMATS = ("csv", "jsonl")
+
+_ROLES = {value for value, _label in MaintenanceRequest.ROLE_CHOICES}
+_STATUSES = {value for value, _label in MaintenanceRequest.STATUS_CHOICES}
+
+
+class RowError(ValueError):
+    """A row that can't be imported; the message is reported to the caller"""
+
+
+# Room name shared by several rooms of a building (see Lookups.room)
+_AMBIGUOUS = object()
+
+
+def guess_format(filename):
+    return "jsonl" if filename.lower().endswith((".jsonl", ".ndjson", ".json")) else "csv"
+
+
+def read_rows(stream, import_format):
+    """
+    Yield ``(line number, dict)`` from a binary or text file object
+
+    Lines that aren't valid JSON are yielded as ``(line, RowError)``.
+    """
+    if isinstance(stream.read(0), bytes):
+        stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+    if import_format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            # Exported cells carry a ' before formula characters
+            yield reader.line_num, {key: unescape_cell(value) for key, value in row.items()}
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield line_number, RowError(f"Invalid JSON: {e}")
+            continue
+        if not isinstance(row, dict):
+            yield line_number, RowError("Each line must be a JSON object")
+            continue
+        yield line_number, row
+
+
+class Lookups:
+    """Name -> id maps for buildings, floors, rooms and users, loaded once"""
+
+    def __init__(self):
+        self.buildings = {
+            name.lower(): pk for pk, name in Building.objects.values_list("id", "name")
+        }
+        self.floors = {}
+        for pk, building_id, number, label in Floor.objects.values_list("id", "building_id", "number", "label"):
+            self.floors[(building_id, label.lower())] = pk
+            self.floors.setdefault((building_id, str(number)), pk)
+        self.rooms = {}
+        self.building_rooms = {}
+        self.room_types = {}
+        rooms = Room.objects.values_list("id", "building_id", "floor_id", "name", "room_type")
+        for pk, building_id, floor_id, name, room_type in rooms:
+            self.rooms[(building_id, floor_id, name.lower())] = pk
+            self.room_types[pk] = room_type
+            key = (building_id, name.lower())
+            self.building_rooms[key] = _AMBIGUOUS if key in self.building_rooms else pk
+        self.usernames = {}
+        self.user_ids = set()
+        for pk, username in User.objects.values_list("id", "username"):
+            self.usernames[username] = pk
+            self.user_ids.add(pk)
+
+    def building(self, name):
+        try:
+            return self.buildings[name.lower()]
+        except KeyError:
+            raise RowError(f"Unknown building {name!r}") from None
+
+    def floor(self, building_id, name):
+        try:
+            return self.floors[(building_id, name.lower())]
+        except KeyError:
+            raise RowError(f"Unknown floor {name!r} in that building") from None
+
+    def room(self, building_id, floor_id, name):
+        if floor_id is None:
+            pk = self.building_rooms.get((building_id, name.lower()))
+            if pk is _AMBIGUOUS:
+                raise RowError(f"Room {name!r} is on more than one floor of that building; give the floor")
+        else:
+            pk = self.rooms.get((building_id, floor_id, name.lower()))
+        if pk is None:
+            raise RowError(f"Unknown room {name!r} in that building/floor")
+        return pk
+
+    def user(self, value):
+        if value in self.usernames:
+            return self.usernames[value]
+        if value.isdigit() and int(value) in self.user_ids:
+            return int(value)
+        raise RowError(f"Unknown user {value!r}")
+
+
+def _text(row, key):
+    value = row.get(key)
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def _datetime(value, key):
+    try:
+        parsed = parse_datetime(value)
+    except ValueError as e:
+        # Well formed but impossible, e.g. February 30th
+        raise RowError(f"Invalid {key} {value!r}: {e}") from None
+    if parsed is None:
+        raise RowError(f"Invalid {key} {value!r}; use ISO 8601")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def build_request(row, lookups, now):
+    """Validate one input row and return an unsaved MaintenanceRequest"""
+    description = _text(row, "description")
+    if not description:
+        raise RowError("description is required")
+
+    role = _text(row, "role") or "staff"
+    if role not in _ROLES:
+        raise RowError(f"Invalid role {role!r}")
+    status = _text(row, "status") or "pending"
+    if status not in _STATUSES:
+        raise RowError(f"Invalid status {status!r}")
+
+    building_name = _text(row, "building")
+    if not building_name:
+        raise RowError("building is required")
+    building_id = lookups.building(building_name)
+    floor_id = lookups.floor(building_id, _text(row, "floor")) if _text(row, "floor") else None
+    room_id = lookups.room(building_id, floor_id, _text(row, "room")) if _text(row, "room") else None
+
+    created_at = _datetime(_text(row, "created_at"), "created_at") if _text(row, "created_at") else now
+    updated_at = _datetime(_text(row, "updated_at"), "updated_at") if _text(row, "updated_at") else created_at
+    if updated_at < created_at:
+        raise RowError("updated_at is before created_at")
+
+    request = MaintenanceRequest(
+        description=description,
+        requester_name=_text(row, "requester_name"),
+        role=role,
+        section=_text(row, "section") or None,
+        student_id=_text(row, "student_id") or None,
+        status=status,
+        rejection_reason=_text(row, "rejection_reason") or None,
+        completion_notes=_text(row, "completion_notes") or None,
+        building_id=building_id,
+        floor_id=floor_id,
+        room_id=room_id,
+        assigned_to_id=lookups.user(_text(row, "assigned_to")) if _text(row, "assigned_to") else None,
+        created_by_id=lookups.user(_text(row, "created_by")) if _text(row, "created_by") else None,
+        created_at=created_at,
+        updated_at=updated_at,
+    )
+    # No history in the file: the request is taken to have reached its
+    # current status at updated_at
+    request.status_changed_at = updated_at
+    if status in history.RESPONDED_STATUSES:
+        request.responded_at = updated_at
+    if status == "completed":
+        request.completed_at = updated_at
+    sla.apply_deadlines(request, lookups.room_types.get(room_id))
+    return request
+
+
+def history_events(requests):
+    """Creation event, plus one for reaching a later status, per imported row"""
+    events = []
+    for request in requests:
+        # A row that moved on from pending is logged as pending until updated_at
+        moved_on = request.status != "pending" and request.updated_at > request.created_at
+        first = "pending" if moved_on else request.status
+        events.append(RequestStatusEvent(
+            request_id=request.pk, from_status="", to_status=first, actor_id=request.created_by_id,
+            at=request.created_at,
+        ))
+        if first != request.status:
+            events.append(RequestStatusEvent(
+                request_id=request.pk, from_status=first, to_status=request.status,
+                at=request.updated_at, duration=request.updated_at - request.created_at,
+            ))
+    return events
+
+
+def insert_with_timestamps(requests):
+    """
+    bulk_create unsaved requests, keeping their created_at / updated_at
+
+    bulk_create runs pre_save(), so auto_now_add / auto_now replace the
+    historical timestamps with now; a bulk_update then writes them back (one
+    UPDATE per batch). Sets ``pk`` on every request, which needs a database
+    that returns ids from bulk inserts.
+    """
+    if not connection.features.can_return_rows_from_bulk_insert:
+        raise NotSupportedError("Importing requests needs a database that returns ids from bulk inserts")
+    timestamps = [(request.created_at, request.updated_at) for request in requests]
+    MaintenanceRequest.objects.bulk_create(requests)
+    for request, (created_at, updated_at) in zip(requests, timestamps):
+        request.created_at, request.updated_at = created_at, updated_at
+    MaintenanceRequest.objects.bulk_update(requests, ["created_at", "updated_at"])
+    return requests
+
+
+def _insert(batch):
+    """Insert one batch and apply what the save() signals would have"""
+    with transaction.atomic():
+        created = insert_with_timestamps(batch)
+        events = history.record(history_events(created))
+        stats.record_creates(created, events)
+        search.index_requests([request.pk for request in created])
+    return len(created)
+
+
+def import_requests(rows, batch_size=500, dry_run=False):
+    """
+    Validate and insert rows from ``read_rows``
+
+    Args:
+        rows (iterable): ``(line number, dict or RowError)`` pairs
+        batch_size (int): Rows per INSERT batch
+        dry_run (bool): Validate only, insert nothing
+
+    Returns:
+        dict: ``created`` (int) and ``errors`` (list of {line, error})
+    """
+    lookups = Lookups()
+    now = timezone.now()
+    created = 0
+    errors = []
+    batch = []
+
+    for line, row in rows:
+        try:
+            if isinstance(row, RowError):
+                raise row
+            batch.append(build_request(row, lookups, now))
+        except RowError as e:
+            errors.append({"line": line, "error": str(e)})
+            continue
+
+        if len(batch) >= batch_size:
+            created += len(batch) if dry_run else _insert(batch)
+            batch = []
+
+    if batch:
+        created += len(batch) if dry_run else _insert(batch)
+
+    return {"created": created, "errors": errors}
+
+
+def notify_import_summary(result, source):
+    """One notification per admin for the whole import, instead of one per row"""
+    message = f"Imported {result['created']} maintenance requests from {source}."
+    if result["errors"]:
+        message += f" {len(result['errors'])} rows were skipped."
+    notify_admins(message)
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from maintenance.archive import archive, cutoff, due
+
+
+class Command(BaseCommand):
+    help = (
+        "Move completed/rejected requests closed more than "
+        "MAINTENANCE_ARCHIVE_AFTER_DAYS ago, with their notifications, "
+        "schedules and status history, into the archive tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            help="Archive requests closed more than this many days ago "
+                 "(default: MAINTENANCE_ARCHIVE_AFTER_DAYS)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Requests moved per transaction (default: 500)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the requests that would be archived",
+        )
+
+    def handle(self, *args, **options):
+        before = cutoff(options["older_than_days"])
+        if options["dry_run"]:
+            self.stdout.write(f"{due(before).count()} requests closed before {before:%Y-%m-%d} would be archived")
+            return
+
+        archived = archive(before, options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Archived {archived} requests closed before {before:%Y-%m-%d}"))
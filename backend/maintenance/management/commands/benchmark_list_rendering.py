@@ -0,0 +1,166 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from buildings.models import Building, Floor, Room
+from calendar_system.models import MaintenanceSchedule
+from calendar_system.rows import schedule_rows
+from calendar_system.serializers import MaintenanceScheduleSerializer
+from maintenance.models import MaintenanceRequest
+from maintenance.rows import request_rows
+from maintenance.serializers import MaintenanceRequestListSerializer, MaintenanceRequestSerializer
+from notifications.models import Notification
+from notifications.rows import notification_rows
+from notifications.serializers import NotificationSerializer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare rows/second of the values() list rendering against the "
+        "ModelSerializer path and check both produce identical JSON. "
+        "'requests/base' compares against MaintenanceRequestSerializer, which "
+        "ListRequestsView used before the slim list serializer. "
+        "Test data is created inside a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[1000, 10000, 100000],
+            help="Row counts to benchmark (default: 1000 10000 100000)",
+        )
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        request = Request(APIRequestFactory().get("/api/maintenance/requests/", HTTP_HOST="localhost"))
+
+        self.stdout.write(f"{'endpoint':<14}{'rows':>8}{'serializer r/s':>17}{'values() r/s':>15}{'speedup':>9}  identical")
+        for size in options["sizes"]:
+            try:
+                with transaction.atomic():
+                    user = self._seed(size)
+
+                    requests = MaintenanceRequest.objects.order_by("-created_at", "-id")
+                    notifications = Notification.objects.filter(user=user).order_by("-created_at")
+                    schedules = MaintenanceSchedule.objects.order_by("id")
+
+                    cases = [
+                        (
+                            "requests",
+                            lambda: MaintenanceRequestListSerializer(
+                                requests.select_related("building", "floor", "room", "assigned_to"),
+                                many=True,
+                                context={"request": request},
+                            ).data,
+                            lambda: request_rows(requests, request),
+                        ),
+                        (
+                            "requests/base",
+                            lambda: MaintenanceRequestSerializer(
+                                requests.select_related("building", "floor", "room", "assigned_to"),
+                                many=True,
+                                context={"request": request},
+                            ).data,
+                            lambda: request_rows(requests, request, full=True),
+                        ),
+                        (
+                            "notifications",
+                            lambda: NotificationSerializer(
+                                notifications.select_related(
+                                    "maintenance_request",
+                                    "maintenance_request__building",
+                                    "maintenance_request__room",
+                                ),
+                                many=True,
+                            ).data,
+                            lambda: notification_rows(notifications),
+                        ),
+                        (
+                            "calendar",
+                            lambda: MaintenanceScheduleSerializer(
+                                schedules.select_related(
+                                    "request",
+                                    "request__building",
+                                    "request__floor",
+                                    "request__room",
+                                    "request__assigned_to",
+                                    "assigned_staff",
+                                ),
+                                many=True,
+                            ).data,
+                            lambda: schedule_rows(
+                                MaintenanceRequest.objects.filter(schedule__isnull=False).order_by("schedule__id")
+                            ),
+                        ),
+                    ]
+                    for name, slow, fast in cases:
+                        slow_time, slow_bytes = self._time(lambda: renderer.render(slow()))
+                        fast_time, fast_bytes = self._time(lambda: renderer.render(fast()))
+                        self.stdout.write(
+                            f"{name:<14}{size:>8}{size / slow_time:>17,.0f}{size / fast_time:>15,.0f}"
+                            f"{slow_time / fast_time:>8.1f}x  {'yes' if slow_bytes == fast_bytes else 'NO'}"
+                        )
+                    raise Rollback
+            except Rollback:
+                pass
+
+    def _time(self, fn):
+        start = time.perf_counter()
+        result = fn()
+        return time.perf_counter() - start, result
+
+    def _seed(self, size):
+        """Create ``size`` requests, notifications and schedules"""
+        user = User.objects.create_user("benchmark-user", first_name="Bench", last_name="Mark")
+        building = Building.objects.create(name="Benchmark Building")
+        floor = Floor.objects.create(building=building, number=1, label="1st Floor")
+        room = Room.objects.create(building=building, floor=floor, name="Room B1")
+
+        statuses = [value for value, _label in MaintenanceRequest.STATUS_CHOICES]
+        requests = MaintenanceRequest.objects.bulk_create(
+            (
+                MaintenanceRequest(
+                    description=f"Benchmark issue {i}",
+                    requester_name=f"user{i % 50}",
+                    role="staff",
+                    status=statuses[i % len(statuses)],
+                    building=building,
+                    floor=floor if i % 3 else None,
+                    room=room if i % 4 else None,
+                    assigned_to=user if i % 2 else None,
+                    created_by=user,
+                    issue_photo=f"issue_photos/{i}.jpg" if i % 10 == 0 else None,
+                )
+                for i in range(size)
+            ),
+            batch_size=2000,
+        )
+        Notification.objects.bulk_create(
+            (
+                Notification(user=user, message=f"Request #{r.id} updated.", maintenance_request=r if i % 5 else None)
+                for i, r in enumerate(requests)
+            ),
+            batch_size=2000,
+        )
+        MaintenanceSchedule.objects.bulk_create(
+            (
+                MaintenanceSchedule(
+                    request=r, schedule_date="2026-01-15", estimated_duration="2 hours",
+                    assigned_staff=user if i % 2 else None,
+                )
+                for i, r in enumerate(requests)
+            ),
+            batch_size=2000,
+        )
+        return user
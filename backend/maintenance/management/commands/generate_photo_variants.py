@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from maintenance.images import PHOTO_FIELDS, generate_variants, retry_fields
+from maintenance.models import MaintenanceRequest
+
+
+class Command(BaseCommand):
+    help = (
+        "Create thumbnail/medium variants for request photos that don't have "
+        "up-to-date ones (e.g. uploaded before variants existed), and retry "
+        "failed ones and ones whose background job was lost."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate variants for every photo, not just missing, failed or stalled ones",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Requests loaded per query (default: 200)",
+        )
+
+    def handle(self, *args, **options):
+        has_photo = Q()
+        for field in PHOTO_FIELDS:
+            has_photo |= Q(**{f"{field}__gt": ""})
+
+        requests = (
+            MaintenanceRequest.objects.filter(has_photo)
+            .only("id", "photo_variants", *PHOTO_FIELDS)
+            .order_by("id")
+            .iterator(chunk_size=options["batch_size"])
+        )
+        now = timezone.now()
+        processed = 0
+        for maintenance in requests:
+            fields = list(PHOTO_FIELDS) if options["force"] else retry_fields(maintenance, now)
+            if fields:
+                generate_variants(maintenance, fields)
+                processed += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Generated variants for {processed} requests"))
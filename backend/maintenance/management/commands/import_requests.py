@@ -0,0 +1,71 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+
+from maintenance.importer import IMPORT_FORMATS, guess_format, import_requests, notify_import_summary, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Import historical maintenance requests from a CSV or JSONL file "
+        "(see maintenance/importer.py for the columns). Rows are inserted in "
+        "batches without per-row notifications; invalid rows are reported "
+        "and skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSONL file to import")
+        parser.add_argument(
+            "--format",
+            choices=IMPORT_FORMATS,
+            help="Input format (default: from the file extension)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Rows per bulk insert (default: 500)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate the file without inserting anything",
+        )
+        parser.add_argument(
+            "--no-notify",
+            action="store_true",
+            help="Don't send admins a summary notification",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        import_format = options["format"] or guess_format(path)
+        try:
+            stream = open(path, "rb")
+        except OSError as e:
+            raise CommandError(f"Cannot open {path}: {e}")
+
+        with stream:
+            try:
+                result = import_requests(
+                    read_rows(stream, import_format),
+                    batch_size=options["batch_size"],
+                    dry_run=options["dry_run"],
+                )
+            except (UnicodeDecodeError, csv.Error) as e:
+                raise CommandError(f"Cannot read {path}: {e}. Batches before that point were imported.")
+
+        for error in result["errors"]:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+
+        if options["dry_run"]:
+            self.stdout.write(self.style.SUCCESS(
+                f"{result['created']} rows valid, {len(result['errors'])} invalid (dry run, nothing imported)"
+            ))
+            return
+
+        if result["created"] and not options["no_notify"]:
+            notify_import_summary(result, path)
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result['created']} requests, skipped {len(result['errors'])}"
+        ))
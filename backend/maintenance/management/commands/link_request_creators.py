@@ -0,0 +1,69 @@
+from collections import defaultdict
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from maintenance.models import MaintenanceRequest
+
+
+class Command(BaseCommand):
+    help = (
+        "Set created_by on historical maintenance requests that only have a "
+        "requester_name, by matching it case-insensitively against usernames. "
+        "Names matching no user, or more than one, are left unlinked."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Requests per UPDATE (default: 500)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be linked without writing anything",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        users = {}
+        ambiguous = set()
+        for user_id, username in User.objects.values_list("id", "username"):
+            key = username.lower()
+            if key in users:
+                ambiguous.add(key)
+            users[key] = user_id
+
+        matched = defaultdict(list)
+        unmatched = 0
+        rows = (
+            MaintenanceRequest.objects.filter(created_by__isnull=True)
+            .values_list("id", "requester_name")
+            .iterator(chunk_size=batch_size)
+        )
+        for request_id, requester_name in rows:
+            key = (requester_name or "").strip().lower()
+            if key in users and key not in ambiguous:
+                matched[users[key]].append(request_id)
+            else:
+                unmatched += 1
+
+        linked = sum(len(ids) for ids in matched.values())
+        if not options["dry_run"]:
+            # created_by is part of the synced payload, so bump updated_at
+            # for delta sync (maintenance/sync.py)
+            now = timezone.now()
+            for user_id, ids in matched.items():
+                for start in range(0, len(ids), batch_size):
+                    MaintenanceRequest.objects.filter(
+                        id__in=ids[start:start + batch_size], created_by__isnull=True
+                    ).update(created_by_id=user_id, updated_at=now)
+
+        verb = "Would link" if options["dry_run"] else "Linked"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {linked} requests to {len(matched)} users; {unmatched} left unlinked"
+        ))
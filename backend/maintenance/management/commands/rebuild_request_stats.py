@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from maintenance.stats import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the RequestDailyStat rollup table from scratch. "
+        "Run once after deploying and after any bulk edit that bypasses save()."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Rows per bulk insert (default: 500)",
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt daily stats: {count} rows"))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from maintenance.search import is_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the maintenance request full-text search index from scratch. "
+        "Run after any bulk edit that bypasses save()."
+    )
+
+    def handle(self, *args, **options):
+        if not is_available():
+            raise CommandError("Full-text search requires SQLite FTS5")
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} requests"))
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from maintenance import sla
+from maintenance.models import MaintenanceRequest
+from notifications.helpers import notify_sla_breaches
+
+
+class Command(BaseCommand):
+    help = (
+        "Escalate maintenance requests that missed their SLA deadline. "
+        "Each breach is notified once; run this periodically (e.g. every "
+        "5 minutes from cron)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Breaches escalated per transaction (default: 200)",
+        )
+        parser.add_argument(
+            "--recompute",
+            action="store_true",
+            help="Recompute every open request's deadlines first "
+                 "(after changing MAINTENANCE_SLA_TARGETS)",
+        )
+
+    def handle(self, *args, **options):
+        if options["recompute"]:
+            updated = sla.recompute_deadlines(MaintenanceRequest.objects.all(), options["batch_size"])
+            self.stdout.write(f"Recomputed deadlines for {updated} open requests")
+
+        now = timezone.now()
+        for kind in ("respond", "resolve"):
+            total = 0
+            while True:
+                batch = self._escalate(kind, now, options["batch_size"])
+                if not batch:
+                    break
+                total += batch
+            self.stdout.write(self.style.SUCCESS(f"Escalated {total} missed '{kind}' deadlines"))
+
+    def _escalate(self, kind, now, batch_size):
+        """Notify and mark one batch of breaches; returns its size"""
+        with transaction.atomic():
+            requests = list(
+                sla.overdue(MaintenanceRequest.objects.select_for_update(), kind, now)
+                .only("id", "assigned_to")[:batch_size]
+            )
+            if not requests:
+                return 0
+            notify_sla_breaches([(request, kind) for request in requests])
+            MaintenanceRequest.objects.filter(id__in=[request.id for request in requests]).update(
+                **{f"{kind}_breached_at": now}
+            )
+        return len(requests)
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:32
+
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_stats(apps, schema_editor):
+    # As stats.rebuild() does for requests without status history: each
+    # counts once as created, and once as entering its current status on
+    # the day it was last updated
+    MaintenanceRequest = apps.get_model("maintenance", "MaintenanceRequest")
+    RequestDailyStat = apps.get_model("maintenance", "RequestDailyStat")
+    group = ("day", "building_id", "floor_id", "status")
+    buckets = defaultdict(lambda: {"created": 0, "entered": 0})
+    for counter, column in (("created", "created_at"), ("entered", "updated_at")):
+        rows = (
+            MaintenanceRequest.objects.annotate(day=TruncDate(column))
+            .values(*group)
+            .annotate(total=Count("id"))
+            .order_by()
+        )
+        for row in rows:
+            buckets[tuple(row[field] for field in group)][counter] += row["total"]
+    RequestDailyStat.objects.bulk_create(
+        (
+            RequestDailyStat(day=day, building_id=building_id, floor_id=floor_id, status=status, **counts)
+            for (day, building_id, floor_id, status), counts in buckets.items()
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buildings', '0003_alter_building_options_alter_floor_options_and_more'),
+        ('maintenance', '0012_alter_maintenancerequest_assigned_to_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('in_progress', 'In Progress'), ('completed', 'Completed')], max_length=20)),
+                ('created', models.IntegerField(default=0)),
+                ('entered', models.IntegerField(default=0)),
+                ('building', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='buildings.building')),
+                ('floor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='buildings.floor')),
+            ],
+            options={
+                'ordering': ['day'],
+                'constraints': [models.UniqueConstraint(fields=('day', 'building', 'floor', 'status'), name='unique_request_daily_stat')],
+            },
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buildings', '0003_alter_building_options_alter_floor_options_and_more'),
+        ('maintenance', '0013_requestdailystat'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='maintenancerequest',
+            options={'ordering': ['-created_at']},
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['created_at', 'id'], name='mreq_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['status', 'created_at'], name='mreq_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['building', 'floor', 'room', 'status'], name='mreq_location_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['assigned_to', 'status'], name='mreq_assignee_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['created_by', 'created_at'], name='mreq_creator_created_idx'),
+        ),
+    ]
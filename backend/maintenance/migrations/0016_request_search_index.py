@@ -0,0 +1,53 @@
+import sys
+
+from django.db import migrations
+
+COLUMNS = "description, requester_name, completion_notes, rejection_reason, building_name, room_name"
+
+
+def skip_on(vendor):
+    """Full-text search is SQLite FTS5 only; say so instead of failing"""
+    sys.stdout.write(
+        f"\n  Skipping the full-text search index on {vendor}: it needs SQLite FTS5. "
+        "requests/search/ returns 501 on this database."
+    )
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor != "sqlite":
+        skip_on(vendor)
+        return
+    schema_editor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS maintenance_request_fts USING fts5("
+        f"{COLUMNS}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+    )
+    schema_editor.execute(
+        f"INSERT INTO maintenance_request_fts (rowid, {COLUMNS}) "
+        "SELECT r.id, r.description, r.requester_name, "
+        "COALESCE(r.completion_notes, ''), COALESCE(r.rejection_reason, ''), "
+        "COALESCE(b.name, ''), COALESCE(rm.name, '') "
+        "FROM maintenance_maintenancerequest r "
+        "LEFT JOIN buildings_building b ON b.id = r.building_id "
+        "LEFT JOIN buildings_room rm ON rm.id = r.room_id"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor != "sqlite":
+        skip_on(vendor)
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS maintenance_request_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buildings', '0004_building_updated_at_floor_updated_at_room_updated_at'),
+        ('maintenance', '0015_requesttombstone'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0016_request_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='maintenancerequest',
+            name='photo_variants',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
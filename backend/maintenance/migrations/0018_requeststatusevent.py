@@ -0,0 +1,59 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:52
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_transition_times(apps, schema_editor):
+    # There is no history for existing rows; updated_at is the best guess for
+    # when they reached their current status (what analytics used before)
+    MaintenanceRequest = apps.get_model("maintenance", "MaintenanceRequest")
+    MaintenanceRequest.objects.update(status_changed_at=F("updated_at"))
+    MaintenanceRequest.objects.filter(status__in=["in_progress", "completed"]).update(responded_at=F("updated_at"))
+    MaintenanceRequest.objects.filter(status="completed").update(completed_at=F("updated_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0017_maintenancerequest_photo_variants'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='maintenancerequest',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='maintenancerequest',
+            name='responded_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='maintenancerequest',
+            name='status_changed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='RequestStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(blank=True, max_length=20)),
+                ('to_status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('in_progress', 'In Progress'), ('completed', 'Completed')], max_length=20)),
+                ('at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('duration', models.DurationField(blank=True, null=True)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_events', to='maintenance.maintenancerequest')),
+            ],
+            options={
+                'ordering': ['at', 'id'],
+                'indexes': [models.Index(fields=['request', 'at'], name='mreq_event_request_at_idx'), models.Index(fields=['at'], name='mreq_event_at_idx'), models.Index(fields=['from_status', 'at'], name='mreq_event_from_at_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_transition_times, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:56
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+
+# MAINTENANCE_SLA_TARGETS when this migration was written, in case the
+# setting is renamed later
+DEFAULT_TARGETS = {
+    "default": {"respond": 24, "resolve": 120},
+    "restroom": {"respond": 4, "resolve": 24},
+    "utility": {"respond": 4, "resolve": 48},
+    "laboratory": {"respond": 8, "resolve": 72},
+}
+
+
+def backfill_deadlines(apps, schema_editor):
+    """
+    Set respond_by / resolve_by on open requests as sla.apply_deadlines
+    would, writing only those two columns so updated_at is left alone
+    """
+    MaintenanceRequest = apps.get_model("maintenance", "MaintenanceRequest")
+    table = getattr(settings, "MAINTENANCE_SLA_TARGETS", DEFAULT_TARGETS)
+    requests = (
+        MaintenanceRequest.objects.exclude(status__in=("completed", "rejected"))
+        .annotate(sla_room_type=models.F("room__room_type"))
+        .only("id", "created_at", "responded_at")
+        .order_by("id")
+    )
+    batch = []
+    for instance in requests.iterator(chunk_size=500):
+        target = table.get(instance.sla_room_type or "") or table["default"]
+        instance.respond_by = (
+            instance.created_at + timedelta(hours=target["respond"])
+            if instance.responded_at is None
+            else None
+        )
+        instance.resolve_by = instance.created_at + timedelta(hours=target["resolve"])
+        batch.append(instance)
+        if len(batch) >= 500:
+            MaintenanceRequest.objects.bulk_update(batch, ["respond_by", "resolve_by"])
+            batch = []
+    if batch:
+        MaintenanceRequest.objects.bulk_update(batch, ["respond_by", "resolve_by"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buildings', '0004_building_updated_at_floor_updated_at_room_updated_at'),
+        ('maintenance', '0018_requeststatusevent'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='maintenancerequest',
+            name='resolve_breached_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='maintenancerequest',
+            name='resolve_by',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='maintenancerequest',
+            name='respond_breached_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='maintenancerequest',
+            name='respond_by',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['respond_by'], name='mreq_respond_by_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['resolve_by'], name='mreq_resolve_by_idx'),
+        ),
+        migrations.RunPython(backfill_deadlines, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:59
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buildings', '0004_building_updated_at_floor_updated_at_room_updated_at'),
+        ('maintenance', '0019_sla_deadlines'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedRequest',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('in_progress', 'In Progress'), ('completed', 'Completed')], max_length=20)),
+                ('rejection_reason', models.TextField(blank=True, null=True)),
+                ('requester_name', models.CharField(blank=True, max_length=255, null=True)),
+                ('role', models.CharField(choices=[('instructor', 'Instructor'), ('staff', 'Staff')], max_length=20)),
+                ('section', models.CharField(blank=True, max_length=50, null=True)),
+                ('student_id', models.CharField(blank=True, max_length=50, null=True)),
+                ('description', models.TextField()),
+                ('issue_photo', models.ImageField(blank=True, null=True, upload_to='issue_photos/')),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('status_changed_at', models.DateTimeField(blank=True, null=True)),
+                ('responded_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('completion_notes', models.TextField(blank=True, null=True)),
+                ('completion_photo', models.ImageField(blank=True, null=True, upload_to='completed_photos/')),
+                ('photo_variants', models.JSONField(blank=True, default=dict)),
+                ('status_history', models.JSONField(blank=True, default=list)),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='maintenancerequest',
+            index=models.Index(fields=['status', 'status_changed_at'], name='mreq_status_changed_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedrequest',
+            name='assigned_to',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivedrequest',
+            name='building',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='buildings.building'),
+        ),
+        migrations.AddField(
+            model_name='archivedrequest',
+            name='created_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='archivedrequest',
+            name='floor',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='buildings.floor'),
+        ),
+        migrations.AddField(
+            model_name='archivedrequest',
+            name='room',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='buildings.room'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedrequest',
+            index=models.Index(fields=['created_at', 'id'], name='marc_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedrequest',
+            index=models.Index(fields=['created_by', 'created_at'], name='marc_creator_created_idx'),
+        ),
+    ]
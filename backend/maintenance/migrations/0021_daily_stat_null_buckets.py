@@ -0,0 +1,40 @@
+# Generated by Django 5.2.8 on 2026-10-17 19:19
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+
+
+def merge_duplicate_buckets(apps, schema_editor):
+    """Fold rows for the same bucket (possible with NULL building/floor) into one"""
+    RequestDailyStat = apps.get_model("maintenance", "RequestDailyStat")
+    keep = {}
+    for row in RequestDailyStat.objects.order_by("id"):
+        key = (row.day, row.building_id, row.floor_id, row.status)
+        if key not in keep:
+            keep[key] = row
+            continue
+        first = keep[key]
+        first.created += row.created
+        first.entered += row.entered
+        first.save(update_fields=["created", "entered"])
+        row.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buildings', '0004_building_updated_at_floor_updated_at_room_updated_at'),
+        ('maintenance', '0020_archivedrequest'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_buckets, migrations.RunPython.noop),
+        migrations.RemoveConstraint(
+            model_name='requestdailystat',
+            name='unique_request_daily_stat',
+        ),
+        migrations.AddConstraint(
+            model_name='requestdailystat',
+            constraint=models.UniqueConstraint(models.F('day'), django.db.models.functions.comparison.Coalesce('building', models.Value(0)), django.db.models.functions.comparison.Coalesce('floor', models.Value(0)), models.F('status'), name='unique_request_daily_bucket'),
+        ),
+    ]
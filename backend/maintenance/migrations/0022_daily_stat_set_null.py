@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-17 19:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('buildings', '0004_building_updated_at_floor_updated_at_room_updated_at'),
+        ('maintenance', '0021_daily_stat_null_buckets'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='requestdailystat',
+            name='building',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='buildings.building'),
+        ),
+        migrations.AlterField(
+            model_name='requestdailystat',
+            name='floor',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='buildings.floor'),
+        ),
+    ]
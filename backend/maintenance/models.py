@@ -1,9 +1,13 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from accounts.models import User
 from buildings.models import Building, Floor, Room
+from .tracking import ChangeTrackingMixin
 
 
-class MaintenanceRequest(models.Model):
+class MaintenanceRequest(ChangeTrackingMixin, models.Model):
     ROLE_CHOICES = [
         ("instructor", "Instructor"),
         ("staff", "Staff"),
@@ -39,6 +43,17 @@ class MaintenanceRequest(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Denormalized from the status history (see maintenance/history.py)
+    status_changed_at = models.DateTimeField(null=True, blank=True)
+    responded_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    # SLA deadlines, None once met or no longer applicable (see maintenance/sla.py)
+    respond_by = models.DateTimeField(null=True, blank=True)
+    resolve_by = models.DateTimeField(null=True, blank=True)
+    respond_breached_at = models.DateTimeField(null=True, blank=True)
+    resolve_breached_at = models.DateTimeField(null=True, blank=True)
+
     # Staff assigned
     assigned_to = models.ForeignKey(
         User,
@@ -64,6 +79,9 @@ class MaintenanceRequest(models.Model):
         upload_to="completed_photos/", null=True, blank=True
     )
 
+    # Resized copies of the photos, see maintenance/images.py
+    photo_variants = models.JSONField(default=dict, blank=True)
+
     requester_name = models.CharField(
         max_length=255,
         blank=True,
@@ -74,23 +92,203 @@ class MaintenanceRequest(models.Model):
     # ✅ NEW: Optional rejection reason
     rejection_reason = models.TextField(null=True, blank=True)
 
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Newest-first lists and keyset pagination over (created_at, id)
+            models.Index(fields=['created_at', 'id'], name='mreq_created_id_idx'),
+            # Status-filtered lists and status counts
+            models.Index(fields=['status', 'created_at'], name='mreq_status_created_idx'),
+            # Building / floor / room views
+            models.Index(fields=['building', 'floor', 'room', 'status'], name='mreq_location_status_idx'),
+            # "My assigned tasks"
+            models.Index(fields=['assigned_to', 'status'], name='mreq_assignee_status_idx'),
+            # "My requests"
+            models.Index(fields=['created_by', 'created_at'], name='mreq_creator_created_idx'),
+            # Delta sync (requests/changes/)
+            models.Index(fields=['updated_at', 'id'], name='mreq_updated_id_idx'),
+            # Overdue requests: met deadlines are NULL, so "< now" only
+            # reaches open requests that are late
+            models.Index(fields=['respond_by'], name='mreq_respond_by_idx'),
+            models.Index(fields=['resolve_by'], name='mreq_resolve_by_idx'),
+            # Archival: closed requests by when they were closed
+            models.Index(fields=['status', 'status_changed_at'], name='mreq_status_changed_idx'),
+        ]
+
+    def __str__(self):
+        return f"Request #{self.id} - {self.description[:50]}"
+
+    def get_status_display(self):
+        """Return human-readable status"""
+        status_map = {
+            'pending': 'Pending',
+            'for_approval': 'For Approval',
+            'approved': 'Approved',
+            'in_progress': 'In Progress',
+            'completed': 'Completed',
+            'rejected': 'Rejected',
+        }
+        return status_map.get(self.status, self.status.title())
+
+    # Set by the pre_save receivers in signals.py when status or room changes
+    # (history.TRANSITION_FIELDS and sla.SLA_FIELDS)
+    DERIVED_FIELDS = [
+        "status_changed_at", "responded_at", "completed_at", "respond_by", "resolve_by",
+    ]
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            # Partial saves still bump updated_at and write what the
+            # pre_save receivers derive from the changed fields
+            update_fields = set(update_fields) | {"updated_at"}
+            if update_fields & {"status", "room", "room_id"}:
+                update_fields.update(self.DERIVED_FIELDS)
+            kwargs["update_fields"] = update_fields
+
+        # Keep the row and everything the post_save hooks write (daily stats,
+        # notifications) in one transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class RequestDailyStat(models.Model):
+    """
+    Pre-aggregated request counts for dashboards and trend charts
+
+    One row per (day, building, floor, status):
+    - created: requests created on ``day`` that currently have ``status``
+    - entered: requests that moved into ``status`` on ``day``
+
+    Maintained by maintenance/signals.py, rebuilt by the
+    ``rebuild_request_stats`` management command.
+    """
+
+    day = models.DateField()
+    # SET_NULL like MaintenanceRequest; before the delete the rows are folded
+    # into the NULL buckets (stats.release_location), so nothing is left to null
+    building = models.ForeignKey(Building, on_delete=models.SET_NULL, null=True, blank=True)
+    floor = models.ForeignKey(Floor, on_delete=models.SET_NULL, null=True, blank=True)
+    status = models.CharField(max_length=20, choices=MaintenanceRequest.STATUS_CHOICES)
+    created = models.IntegerField(default=0)
+    entered = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["day"]
+        constraints = [
+            # On the coalesced ids: a plain unique constraint treats NULLs as
+            # distinct, so building/floor-less buckets could be duplicated
+            models.UniqueConstraint(
+                F("day"),
+                Coalesce("building", Value(0)),
+                Coalesce("floor", Value(0)),
+                F("status"),
+                name="unique_request_daily_bucket",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.status}: {self.created} created, {self.entered} entered"
+
+
+class RequestTombstone(models.Model):
+    """
+    Deletion log for delta sync: one row per deleted MaintenanceRequest so
+    clients holding a local copy can drop it. Written by maintenance/signals.py.
+    """
+
+    request_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
     def __str__(self):
-        return f"{self.description[:30]}... ({self.status})"
-
-class Meta:
-    ordering = ['-created_at']
-
-def __str__(self):
-    return f"Request #{self.id} - {self.description[:50]}"
-
-def get_status_display(self):
-    """Return human-readable status"""
-    status_map = {
-        'pending': 'Pending',
-        'for_approval': 'For Approval',
-        'approved': 'Approved',
-        'in_progress': 'In Progress',
-        'completed': 'Completed',
-        'rejected': 'Rejected',
-    }
-    return status_map.get(self.status, self.status.title())
\ No newline at end of file
+        return f"Request #{self.request_id} deleted {self.deleted_at}"
+
+
+class RequestStatusEvent(models.Model):
+    """
+    Append-only status history: one row per transition of a
+    MaintenanceRequest, including its creation (``from_status`` empty).
+    Written by maintenance/history.py; rows are never updated.
+    """
+
+    request = models.ForeignKey(
+        MaintenanceRequest, on_delete=models.CASCADE, related_name="status_events"
+    )
+    from_status = models.CharField(max_length=20, blank=True)
+    to_status = models.CharField(max_length=20, choices=MaintenanceRequest.STATUS_CHOICES)
+    actor = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    at = models.DateTimeField(default=timezone.now)
+    # Time the request spent in from_status; None for the creation event
+    duration = models.DurationField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["at", "id"]
+        indexes = [
+            models.Index(fields=["request", "at"], name="mreq_event_request_at_idx"),
+            models.Index(fields=["at"], name="mreq_event_at_idx"),
+            models.Index(fields=["from_status", "at"], name="mreq_event_from_at_idx"),
+        ]
+
+    def __str__(self):
+        return f"Request #{self.request_id}: {self.from_status or '-'} -> {self.to_status}"
+
+
+class ArchivedRequest(models.Model):
+    """
+    A closed MaintenanceRequest moved out of the hot table by the
+    ``archive_requests`` command (see maintenance/archive.py). Keeps the
+    original id; read-only from then on.
+    """
+
+    id = models.IntegerField(primary_key=True)
+    status = models.CharField(max_length=20, choices=MaintenanceRequest.STATUS_CHOICES)
+    rejection_reason = models.TextField(null=True, blank=True)
+
+    requester_name = models.CharField(max_length=255, blank=True, null=True)
+    role = models.CharField(max_length=20, choices=MaintenanceRequest.ROLE_CHOICES)
+    section = models.CharField(max_length=50, blank=True, null=True)
+    student_id = models.CharField(max_length=50, blank=True, null=True)
+
+    description = models.TextField()
+    issue_photo = models.ImageField(upload_to="issue_photos/", null=True, blank=True)
+
+    building = models.ForeignKey(Building, on_delete=models.SET_NULL, null=True, related_name="+")
+    floor = models.ForeignKey(Floor, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    room = models.ForeignKey(Room, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    status_changed_at = models.DateTimeField(null=True, blank=True)
+    responded_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    assigned_to = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="+"
+    )
+
+    completion_notes = models.TextField(null=True, blank=True)
+    completion_photo = models.ImageField(upload_to="completed_photos/", null=True, blank=True)
+    photo_variants = models.JSONField(default=dict, blank=True)
+
+    # The request's RequestStatusEvents as {from, to, actor, at, duration}
+    # (duration in seconds), oldest first
+    status_history = models.JSONField(default=list, blank=True)
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="marc_created_id_idx"),
+            models.Index(fields=["created_by", "created_at"], name="marc_creator_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"Archived request #{self.id} - {self.description[:50]}"
+
+    def get_status_display(self):
+        return MaintenanceRequest(status=self.status).get_status_display()
@@ -0,0 +1,131 @@
+"""
+Pagination for maintenance request lists
+
+Page-number pagination stays the default so existing clients keep working.
+Sending a ``cursor`` or ``newer_than`` parameter switches to keyset
+pagination over (created_at, id), which never uses OFFSET and does not skip
+or repeat rows when new requests arrive between page loads.
+"""
+
+import base64
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def encode_cursor(created_at, pk):
+    """Build an opaque cursor for the row at (created_at, pk)"""
+    raw = f"{created_at.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def row_position(row):
+    """(created_at, id) of a model instance or a .values() dict"""
+    if isinstance(row, dict):
+        return row["created_at"], row["id"]
+    return row.created_at, row.pk
+
+
+def decode_cursor(cursor):
+    """Return (created_at, pk) for a cursor, raising NotFound if it is invalid"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, pk = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        created_at = parse_datetime(created_at)
+        pk = int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        created_at = None
+    if created_at is None:
+        raise NotFound("Invalid cursor")
+    return created_at, pk
+
+
+class RequestListPagination(PageNumberPagination):
+    """
+    Page-number pagination with an opt-in keyset (cursor) mode
+
+    Cursor mode query parameters:
+        cursor: Return requests older than this cursor (empty for the first page)
+        newer_than: Return requests newer than this cursor, for polling
+        page_size: Rows per page, capped at ``MAINTENANCE_MAX_PAGE_SIZE``
+    """
+
+    cursor_query_param = "cursor"
+    newer_query_param = "newer_than"
+    page_size_query_param = "page_size"
+
+    @property
+    def max_page_size(self):
+        return getattr(settings, "MAINTENANCE_MAX_PAGE_SIZE", 100)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        self.keyset = self.cursor_query_param in params or self.newer_query_param in params
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.size = self.get_page_size(request)
+        queryset = queryset.order_by()  # ordering is set explicitly below
+
+        newer_than = params.get(self.newer_query_param)
+        cursor = params.get(self.cursor_query_param)
+
+        if newer_than:
+            # Walk forward from the cursor, then flip to newest-first for display
+            created_at, pk = decode_cursor(newer_than)
+            queryset = queryset.filter(
+                Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+            ).order_by("created_at", "id")
+            rows = list(queryset[: self.size + 1])
+            self.has_more = len(rows) > self.size
+            self.rows = rows[: self.size][::-1]
+            self.newest_cursor = encode_cursor(*row_position(self.rows[0])) if self.rows else newer_than
+            self.next_cursor = None
+            return self.rows
+
+        if cursor:
+            created_at, pk = decode_cursor(cursor)
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+
+        rows = list(queryset.order_by("-created_at", "-id")[: self.size + 1])
+        self.has_more = len(rows) > self.size
+        self.rows = rows[: self.size]
+        self.next_cursor = encode_cursor(*row_position(self.rows[-1])) if self.has_more else None
+        self.newest_cursor = encode_cursor(*row_position(self.rows[0])) if self.rows else None
+        return self.rows
+
+    def get_page_size(self, request):
+        size = super().get_page_size(request)
+        return min(size, self.max_page_size) if size else self.max_page_size
+
+    def _url(self, param, value):
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.cursor_query_param)
+        url = remove_query_param(url, self.newer_query_param)
+        return replace_query_param(url, param, value)
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+
+        return Response(OrderedDict([
+            ("next", self._url(self.cursor_query_param, self.next_cursor) if self.next_cursor else None),
+            ("newer", self._url(self.newer_query_param, self.newest_cursor) if self.newest_cursor else None),
+            ("has_more", self.has_more),
+            ("results", data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        page_schema = super().get_paginated_response_schema(schema)
+        page_schema["properties"]["newer"] = {"type": "string", "nullable": True, "format": "uri"}
+        page_schema["properties"]["has_more"] = {"type": "boolean"}
+        return page_schema
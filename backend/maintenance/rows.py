@@ -0,0 +1,129 @@
+"""
+Fast rendering for read-only maintenance request lists
+
+Builds response rows from ``.values()`` querysets with plain dicts instead of
+instantiating models and running DRF serializer fields. The output must stay
+byte-identical to the serializers it stands in for:
+
+- request_rows()  -> MaintenanceRequestListSerializer (default fields)
+                     or MaintenanceRequestSerializer with ``full=True``
+
+If you add a field to one of those serializers, add it here too. The
+``benchmark_list_rendering`` command checks both paths render the same JSON.
+"""
+
+from django.utils import timezone
+
+from .images import photo_variants_repr
+from .models import MaintenanceRequest
+
+REQUEST_VALUES = (
+    "id",
+    "building_id", "building__name",
+    "floor_id", "floor__number", "floor__label",
+    "room_id", "room__name",
+    "requester_name", "role", "section", "student_id",
+    "description", "issue_photo", "rejection_reason",
+    "status", "created_at", "updated_at", "respond_by", "resolve_by",
+    "assigned_to_id", "assigned_to__username", "assigned_to__first_name",
+    "assigned_to__last_name", "assigned_to__email",
+    "created_by_id",
+    "completion_notes", "completion_photo",
+    "photo_variants",
+)
+
+_ISSUE_PHOTO = MaintenanceRequest._meta.get_field("issue_photo")
+_COMPLETION_PHOTO = MaintenanceRequest._meta.get_field("completion_photo")
+
+
+def datetime_repr(value):
+    """Same output as rest_framework.fields.DateTimeField (ISO 8601)"""
+    if value is None:
+        return None
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    value = value.isoformat()
+    if value.endswith("+00:00"):
+        value = value[:-6] + "Z"
+    return value
+
+
+def date_repr(value):
+    """Same output as rest_framework.fields.DateField (ISO 8601)"""
+    return value.isoformat() if value is not None else None
+
+
+def file_url(field, name, request=None):
+    """Same output as rest_framework.fields.FileField with use_url=True"""
+    if not name:
+        return None
+    url = field.storage.url(name)
+    if request is not None:
+        return request.build_absolute_uri(url)
+    return url
+
+
+def user_dict(row, prefix):
+    """accounts.serializers.UserSerializer output for joined user columns"""
+    if row[f"{prefix}_id"] is None:
+        return None
+    return {
+        "id": row[f"{prefix}_id"],
+        "username": row[f"{prefix}__username"],
+        "first_name": row[f"{prefix}__first_name"],
+        "last_name": row[f"{prefix}__last_name"],
+        "email": row[f"{prefix}__email"],
+    }
+
+
+def request_row(row, request=None, full=False):
+    """Build one serialized maintenance request from a REQUEST_VALUES row"""
+    assignee = user_dict(row, "assigned_to")
+    data = {
+        "id": row["id"],
+        "building": (
+            {"id": row["building_id"], "name": row["building__name"]}
+            if row["building_id"] is not None else None
+        ),
+        "floor": (
+            {"id": row["floor_id"], "number": row["floor__number"], "label": row["floor__label"]}
+            if row["floor_id"] is not None else None
+        ),
+        "room": (
+            {"id": row["room_id"], "name": row["room__name"]}
+            if row["room_id"] is not None else None
+        ),
+        "requester_name": row["requester_name"],
+        "role": row["role"],
+        "section": row["section"],
+        "student_id": row["student_id"],
+        "description": row["description"],
+        "issue_photo": file_url(_ISSUE_PHOTO, row["issue_photo"], request),
+        "issue_photo_variants": photo_variants_repr(
+            row["photo_variants"], "issue_photo", row["issue_photo"], request
+        ),
+        "rejection_reason": row["rejection_reason"],
+        "status": row["status"],
+        "created_at": datetime_repr(row["created_at"]),
+        "updated_at": datetime_repr(row["updated_at"]),
+        "respond_by": datetime_repr(row["respond_by"]),
+        "resolve_by": datetime_repr(row["resolve_by"]),
+        "assigned_to": row["assigned_to_id"],
+        "assigned_to_details": assignee,
+    }
+    if full:
+        data["assigned_to_details_maintenance"] = dict(assignee) if assignee else None
+    data["created_by"] = row["created_by_id"]
+    data["completion_notes"] = row["completion_notes"]
+    data["completion_photo"] = file_url(_COMPLETION_PHOTO, row["completion_photo"], request)
+    data["completion_photo_variants"] = photo_variants_repr(
+        row["photo_variants"], "completion_photo", row["completion_photo"], request
+    )
+    return data
+
+
+def request_rows(queryset, request=None, full=False):
+    """Render a MaintenanceRequest queryset (or REQUEST_VALUES rows) as a list"""
+    if hasattr(queryset, "values"):
+        queryset = queryset.values(*REQUEST_VALUES)
+    return [request_row(row, request, full) for row in queryset]
@@ -0,0 +1,163 @@
+"""
+Full-text search over maintenance requests (SQLite FTS5)
+
+``maintenance_request_fts`` holds one row per request, keyed by rowid =
+request id, with the searchable text: description, requester name,
+completion notes, rejection reason and the building/room names. Signals in
+``maintenance/signals.py`` keep it in step with saves and deletes; run
+``rebuild_search_index`` after anything that bypasses them.
+
+Every function here is a no-op (or returns nothing) on other databases.
+"""
+
+from django.db import connection
+from django.utils.html import escape
+
+from .models import MaintenanceRequest
+
+SEARCH_TABLE = "maintenance_request_fts"
+SEARCH_COLUMNS = (
+    "description", "requester_name", "completion_notes", "rejection_reason",
+    "building_name", "room_name",
+)
+
+# MaintenanceRequest columns the index is built from
+SOURCE_FIELDS = (
+    "description", "requester_name", "completion_notes", "rejection_reason",
+    "building_id", "room_id",
+)
+
+# Control characters can't appear in user text, so they are safe markers to
+# find the highlighted terms again after HTML-escaping the snippet
+_MARK_START, _MARK_END = "\x02", "\x03"
+
+
+def is_available():
+    return connection.vendor == "sqlite"
+
+
+def _source_sql(where):
+    return (
+        f"SELECT r.id, r.description, r.requester_name, "
+        f"COALESCE(r.completion_notes, ''), COALESCE(r.rejection_reason, ''), "
+        f"COALESCE(b.name, ''), COALESCE(rm.name, '') "
+        f"FROM {MaintenanceRequest._meta.db_table} r "
+        f"LEFT JOIN buildings_building b ON b.id = r.building_id "
+        f"LEFT JOIN buildings_room rm ON rm.id = r.room_id "
+        f"WHERE {where}"
+    )
+
+
+def index_requests(ids):
+    """(Re)index the given request ids from their current rows"""
+    if not is_available() or not ids:
+        return
+    ids = list(ids)
+    placeholders = ", ".join(["%s"] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})", ids)
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)}) "
+            + _source_sql(f"r.id IN ({placeholders})"),
+            ids,
+        )
+
+
+def unindex_request(pk):
+    unindex_requests([pk])
+
+
+def unindex_requests(ids):
+    if not is_available() or not ids:
+        return
+    ids = list(ids)
+    placeholders = ", ".join(["%s"] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({placeholders})", ids)
+
+
+def rename_location(column, fk, pk, name):
+    """
+    Update ``building_name``/``room_name`` for every request at a location
+
+    Args:
+        column (str): "building_name" or "room_name"
+        fk (str): "building_id" or "room_id"
+        pk (int): The building or room id
+        name (str): Its new name
+    """
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {SEARCH_TABLE} SET {column} = %s WHERE rowid IN "
+            f"(SELECT id FROM {MaintenanceRequest._meta.db_table} WHERE {fk} = %s)",
+            [name, pk],
+        )
+
+
+def rebuild_index():
+    """Repopulate the whole index from MaintenanceRequest; returns the row count"""
+    if not is_available():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, {', '.join(SEARCH_COLUMNS)}) " + _source_sql("1")
+        )
+        return cursor.rowcount
+
+
+def build_match(query):
+    """
+    Turn free text into an FTS5 query: every word must match, as a prefix
+
+    Words are quoted so FTS5 syntax in user input (AND, NEAR, ``:``, ``-``)
+    is treated as plain text.
+    """
+    terms = [word.replace('"', '""') for word in query.split()]
+    return " ".join(f'"{term}"*' for term in terms if term)
+
+
+def highlight(snippet):
+    """HTML-escape a snippet and wrap matched terms in <mark>"""
+    return (
+        escape(snippet)
+        .replace(_MARK_START, "<mark>")
+        .replace(_MARK_END, "</mark>")
+    )
+
+
+def search(query, limit=20, offset=0, created_by=None):
+    """
+    Rank requests matching ``query`` by BM25
+
+    Args:
+        query (str): Free text typed by the user
+        limit (int): Max results
+        offset (int): Results to skip
+        created_by (int, optional): Only search requests owned by this user
+
+    Returns:
+        list: ``(request_id, rank, snippet_html)`` tuples, best match first
+        (lower rank is better)
+    """
+    match = build_match(query)
+    if not is_available() or not match:
+        return []
+
+    where, params = f"{SEARCH_TABLE} MATCH %s", [match]
+    if created_by is not None:
+        where += " AND r.created_by_id = %s"
+        params.append(created_by)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT {SEARCH_TABLE}.rowid, {SEARCH_TABLE}.rank, "
+            f"snippet({SEARCH_TABLE}, -1, %s, %s, '…', 12) "
+            f"FROM {SEARCH_TABLE} "
+            f"JOIN {MaintenanceRequest._meta.db_table} r ON r.id = {SEARCH_TABLE}.rowid "
+            f"WHERE {where} ORDER BY {SEARCH_TABLE}.rank LIMIT %s OFFSET %s",
+            [_MARK_START, _MARK_END, *params, limit, offset],
+        )
+        return [(pk, rank, highlight(snippet)) for pk, rank, snippet in cursor.fetchall()]
@@ -1,9 +1,29 @@
 from rest_framework import serializers
-from .models import MaintenanceRequest
+from .images import photo_variants_repr
+from .models import ArchivedRequest, MaintenanceRequest
+from .uploads import validate_photo
 from accounts.serializers import StaffProfileSerializer, UserSerializer
 from accounts.models import User
 from buildings.serializers import BuildingSimpleSerializer, FloorSimpleSerializer, RoomSimpleSerializer 
 
+class PhotoVariantsField(serializers.Field):
+    """Read-only ``{variant: URL}`` for a photo field (see maintenance/images.py)"""
+
+    def __init__(self, photo_field, **kwargs):
+        kwargs['read_only'] = True
+        kwargs['source'] = '*'
+        self.photo_field = photo_field
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        return photo_variants_repr(
+            instance.photo_variants,
+            self.photo_field,
+            getattr(instance, self.photo_field).name,
+            self.context.get('request'),
+        )
+
+
 # maintenance/serializers.py
 class MaintenanceRequestSerializer(serializers.ModelSerializer):
     building = BuildingSimpleSerializer(read_only=True)
@@ -28,8 +48,14 @@ class MaintenanceRequestSerializer(serializers.ModelSerializer):
         allow_null=True
     )
 
-    issue_photo = serializers.ImageField(use_url=True, required=False)
-    completion_photo = serializers.ImageField(use_url=True, required=False, allow_null=True)
+    # Plain FileFields: uploads are only sniffed here and decoded in the
+    # background (maintenance/images.py) instead of on the request thread
+    issue_photo = serializers.FileField(use_url=True, required=False, validators=[validate_photo])
+    completion_photo = serializers.FileField(
+        use_url=True, required=False, allow_null=True, validators=[validate_photo]
+    )
+    issue_photo_variants = PhotoVariantsField('issue_photo')
+    completion_photo_variants = PhotoVariantsField('completion_photo')
 
     assigned_to_details_maintenance = serializers.SerializerMethodField()
 
@@ -38,13 +64,21 @@ class MaintenanceRequestSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'building', 'building_id', 'floor', 'floor_id', 'room', 'room_id',
             'requester_name', 'role', 'section', 'student_id',
-            'description', 'issue_photo', 'rejection_reason',
-            'status', 'created_at', 'updated_at',
+            'description', 'issue_photo', 'issue_photo_variants', 'rejection_reason',
+            'status', 'created_at', 'updated_at', 'respond_by', 'resolve_by',
             'assigned_to', 'assigned_to_details', 'assigned_to_details_maintenance',
             'created_by',
-            'completion_notes', 'completion_photo'
+            'completion_notes', 'completion_photo', 'completion_photo_variants'
         ]
-        read_only_fields = ["created_at", "updated_at"]
+        read_only_fields = ["created_at", "updated_at", "respond_by", "resolve_by"]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # created_by decides ownership (requests/mine/, search, archive);
+        # only admins may set it to someone else
+        request = self.context.get('request')
+        if request is None or not request.user.is_staff:
+            self.fields['created_by'].read_only = True
 
     def get_assigned_to_details_maintenance(self, obj):
         if obj.assigned_to:
@@ -57,6 +91,117 @@ class MaintenanceRequestSerializer(serializers.ModelSerializer):
             }
         return None
 
+class CompactRelatedField(serializers.Field):
+    """Read-only {attr: value} dict for a select_related object, no nested serializer"""
+
+    def __init__(self, attrs, **kwargs):
+        kwargs['read_only'] = True
+        self.attrs = attrs
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return {attr: getattr(value, attr) for attr in self.attrs}
+
+
+class SparseFieldsetsMixin:
+    """
+    Let list endpoints pick their columns from the query string
+
+    ?fields=id,status,building   only build these fields
+    ?expand=a,b                  also build the optional fields listed in
+                                 Meta.expandable_fields
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        params = request.query_params if request is not None else {}
+
+        expand = set(filter(None, params.get('expand', '').split(',')))
+        for name in set(getattr(self.Meta, 'expandable_fields', [])) - expand:
+            self.fields.pop(name, None)
+
+        fields = set(filter(None, params.get('fields', '').split(',')))
+        if fields:
+            for name in set(self.fields) - fields - expand - {'id'}:
+                self.fields.pop(name)
+
+
+class MaintenanceRequestListSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
+    """
+    Read-only row for list endpoints
+
+    Same output shape as MaintenanceRequestSerializer minus the write-only
+    inputs, with relations rendered straight from select_related objects.
+    ``assigned_to_details_maintenance`` is only built with
+    ?expand=assigned_to_details_maintenance.
+    """
+    building = CompactRelatedField(['id', 'name'])
+    floor = CompactRelatedField(['id', 'number', 'label'])
+    room = CompactRelatedField(['id', 'name'])
+    assigned_to = serializers.IntegerField(source='assigned_to_id', read_only=True)
+    created_by = serializers.IntegerField(source='created_by_id', read_only=True)
+    assigned_to_details = CompactRelatedField(
+        ['id', 'username', 'first_name', 'last_name', 'email'], source='assigned_to'
+    )
+    assigned_to_details_maintenance = CompactRelatedField(
+        ['id', 'username', 'first_name', 'last_name', 'email'], source='assigned_to'
+    )
+    issue_photo = serializers.ImageField(use_url=True, read_only=True)
+    completion_photo = serializers.ImageField(use_url=True, read_only=True)
+    issue_photo_variants = PhotoVariantsField('issue_photo')
+    completion_photo_variants = PhotoVariantsField('completion_photo')
+
+    class Meta:
+        model = MaintenanceRequest
+        fields = [
+            'id', 'building', 'floor', 'room',
+            'requester_name', 'role', 'section', 'student_id',
+            'description', 'issue_photo', 'issue_photo_variants', 'rejection_reason',
+            'status', 'created_at', 'updated_at', 'respond_by', 'resolve_by',
+            'assigned_to', 'assigned_to_details', 'assigned_to_details_maintenance',
+            'created_by',
+            'completion_notes', 'completion_photo', 'completion_photo_variants'
+        ]
+        read_only_fields = fields
+        expandable_fields = ['assigned_to_details_maintenance']
+
+
+class ArchivedRequestSerializer(serializers.ModelSerializer):
+    """Read-only archived request; ``status_history`` only with history=True"""
+    building = CompactRelatedField(['id', 'name'])
+    floor = CompactRelatedField(['id', 'number', 'label'])
+    room = CompactRelatedField(['id', 'name'])
+    assigned_to = serializers.IntegerField(source='assigned_to_id', read_only=True)
+    created_by = serializers.IntegerField(source='created_by_id', read_only=True)
+    assigned_to_details = CompactRelatedField(
+        ['id', 'username', 'first_name', 'last_name', 'email'], source='assigned_to'
+    )
+    issue_photo = serializers.ImageField(use_url=True, read_only=True)
+    completion_photo = serializers.ImageField(use_url=True, read_only=True)
+    issue_photo_variants = PhotoVariantsField('issue_photo')
+    completion_photo_variants = PhotoVariantsField('completion_photo')
+
+    class Meta:
+        model = ArchivedRequest
+        fields = [
+            'id', 'building', 'floor', 'room',
+            'requester_name', 'role', 'section', 'student_id',
+            'description', 'issue_photo', 'issue_photo_variants', 'rejection_reason',
+            'status', 'created_at', 'updated_at',
+            'status_changed_at', 'responded_at', 'completed_at',
+            'assigned_to', 'assigned_to_details', 'created_by',
+            'completion_notes', 'completion_photo', 'completion_photo_variants',
+            'archived_at', 'status_history',
+        ]
+        read_only_fields = fields
+
+    def __init__(self, *args, history=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not history:
+            self.fields.pop('status_history')
+
+
 class ClaimRequestSerializer(serializers.ModelSerializer):
     class Meta:
         model = MaintenanceRequest
@@ -64,6 +209,7 @@ class ClaimRequestSerializer(serializers.ModelSerializer):
 
 
 class CompleteRequestSerializer(serializers.ModelSerializer):
+    completion_photo = serializers.FileField(required=False, allow_null=True, validators=[validate_photo])
     assigned_to = serializers.PrimaryKeyRelatedField(
         queryset=User.objects.all(),
         required=False,
@@ -74,3 +220,10 @@ class CompleteRequestSerializer(serializers.ModelSerializer):
         model = MaintenanceRequest
         fields = ["status", "completion_notes", "completion_photo", "assigned_to"]
 
+    def update(self, instance, validated_data):
+        # Only write the columns that changed (see maintenance/tracking.py)
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save_changes()
+        return instance
+
@@ -0,0 +1,131 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from buildings.models import Building, Floor, Room
+from .models import MaintenanceRequest, RequestTombstone
+from . import history, images, search, sla, stats
+
+
+# =============================================================================
+# BEFORE SAVE - One receiver, so no step depends on receiver order
+# =============================================================================
+@receiver(pre_save, sender=MaintenanceRequest)
+def prepare_request_save(sender, instance, **kwargs):
+    """
+    Compute everything this save changes from the row's saved values
+
+    Kept in one receiver rather than one per concern: the steps below build
+    on each other, and pre_save receivers run in the order they happen to
+    be connected.
+    """
+    # From the instance's load-time snapshot: no query (see tracking.py)
+    old = instance.previous_values(["status", "building_id", "floor_id", "room_id"])
+
+    # 1. Rollup bucket the row was in, for update_daily_stats
+    instance._old_stat_key = old
+
+    # 2. Transition timestamps (status_changed_at, responded_at, ...), written
+    #    by this save; the event itself is saved by save_status_event
+    instance._status_event = history.transition(
+        instance,
+        old["status"] if old else None,
+        actor_id=getattr(instance, "_actor_id", None) or (None if old else instance.created_by_id),
+    )
+
+    # 3. SLA deadlines, from the responded_at step 2 may have just set
+    sla.update_deadlines(instance, old)
+
+
+# =============================================================================
+# DAILY STATS ROLLUP - Keep RequestDailyStat in step with every save/delete
+# =============================================================================
+@receiver(post_save, sender=MaintenanceRequest)
+def update_daily_stats(sender, instance, created, **kwargs):
+    """Move the request between rollup buckets (runs inside save()'s transaction)"""
+    stats.record_change(
+        instance,
+        old=getattr(instance, "_old_stat_key", None),
+        created=created,
+    )
+
+
+@receiver(pre_delete, sender=MaintenanceRequest)
+def remove_daily_stats(sender, instance, **kwargs):
+    """Before the delete, while the request's status events still exist"""
+    stats.record_delete(instance)
+
+
+@receiver(pre_delete, sender=Building)
+def release_building_stats(sender, instance, **kwargs):
+    """Its requests keep existing with building=NULL, so their counts move there"""
+    stats.release_location("building_id", instance.pk)
+
+
+@receiver(pre_delete, sender=Floor)
+def release_floor_stats(sender, instance, **kwargs):
+    stats.release_location("floor_id", instance.pk)
+
+
+# =============================================================================
+# STATUS HISTORY - Append a RequestStatusEvent for every status transition
+# =============================================================================
+@receiver(post_save, sender=MaintenanceRequest)
+def save_status_event(sender, instance, **kwargs):
+    event = getattr(instance, "_status_event", None)
+    if event is not None:
+        event.request_id = instance.pk
+        history.record([event])
+        instance._status_event = None
+
+
+# =============================================================================
+# DELTA SYNC - Record deletions so requests/changes/ can send tombstones
+# =============================================================================
+@receiver(post_delete, sender=MaintenanceRequest)
+def record_tombstone(sender, instance, **kwargs):
+    RequestTombstone.objects.create(request_id=instance.pk)
+
+
+# =============================================================================
+# FULL-TEXT SEARCH - Keep maintenance_request_fts in step with saves/deletes
+# =============================================================================
+@receiver(post_save, sender=MaintenanceRequest)
+def index_request(sender, instance, created, **kwargs):
+    # Status-only saves leave the indexed text alone
+    if created or instance.has_changed(*search.SOURCE_FIELDS):
+        search.index_requests([instance.pk])
+
+
+@receiver(post_delete, sender=MaintenanceRequest)
+def unindex_request(sender, instance, **kwargs):
+    search.unindex_request(instance.pk)
+
+
+@receiver(post_save, sender=Building)
+def reindex_building_name(sender, instance, created, **kwargs):
+    if not created:
+        search.rename_location("building_name", "building_id", instance.pk, instance.name)
+
+
+@receiver(post_save, sender=Room)
+def reindex_room_name(sender, instance, created, **kwargs):
+    if not created:
+        search.rename_location("room_name", "room_id", instance.pk, instance.name)
+
+
+@receiver(pre_delete, sender=Building)
+def clear_building_name(sender, instance, **kwargs):
+    """Requests keep existing with building=NULL; drop the name before the FK is cleared"""
+    search.rename_location("building_name", "building_id", instance.pk, "")
+
+
+@receiver(pre_delete, sender=Room)
+def clear_room_name(sender, instance, **kwargs):
+    search.rename_location("room_name", "room_id", instance.pk, "")
+
+
+# =============================================================================
+# PHOTO VARIANTS - Thumbnails / medium copies for new or replaced photos
+# =============================================================================
+@receiver(post_save, sender=MaintenanceRequest)
+def create_photo_variants(sender, instance, **kwargs):
+    images.schedule_variants(instance)
@@ -0,0 +1,145 @@
+"""
+SLA deadlines for maintenance requests
+
+Targets come from settings.MAINTENANCE_SLA_TARGETS (hours from creation, by
+the room's ``room_type``). Which deadline is live depends on the status:
+
+- pending / approved: must be picked up by ``respond_by``
+- anything not completed or rejected: must be finished by ``resolve_by``
+
+A deadline that no longer applies is set to None, so "overdue right now" is
+a range query on the indexed ``respond_by`` / ``resolve_by`` columns. The
+``*_breached_at`` fields record that a breach was escalated (by the
+scan_overdue_requests command) so it is reported only once.
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from buildings.models import Room
+
+CLOSED_STATUSES = ("completed", "rejected")
+SLA_FIELDS = ["respond_by", "resolve_by"]
+
+
+def targets(room_type):
+    """``{"respond": hours, "resolve": hours}`` for a room type"""
+    table = settings.MAINTENANCE_SLA_TARGETS
+    return table.get(room_type) or table["default"]
+
+
+def room_types(room_ids):
+    """Map room id -> room_type for a batch of requests, in one query"""
+    room_ids = {room_id for room_id in room_ids if room_id}
+    if not room_ids:
+        return {}
+    return dict(Room.objects.filter(id__in=room_ids).values_list("id", "room_type"))
+
+
+def apply_deadlines(instance, room_type=None):
+    """
+    Set ``respond_by`` / ``resolve_by`` from the request's current state
+
+    Args:
+        instance (MaintenanceRequest): Request with its new status and
+            ``responded_at`` already applied
+        room_type (str, optional): Type of ``instance.room``; looked up when
+            omitted
+    """
+    if room_type is None and instance.room_id:
+        if type(instance).room.is_cached(instance):
+            room_type = instance.room.room_type
+        else:
+            room_type = room_types([instance.room_id]).get(instance.room_id)
+    target = targets(room_type)
+    created_at = instance.created_at or timezone.now()
+
+    if instance.status in CLOSED_STATUSES:
+        instance.respond_by = instance.resolve_by = None
+        return
+    instance.respond_by = (
+        created_at + timedelta(hours=target["respond"]) if instance.responded_at is None else None
+    )
+    instance.resolve_by = created_at + timedelta(hours=target["resolve"])
+
+
+
+def settle_deadlines(instance):
+    """
+    Clear the deadlines a status change has met, without recomputing
+
+    For moves between open statuses or into a closed one; a reopened
+    request needs ``apply_deadlines``.
+    """
+    if instance.status in CLOSED_STATUSES:
+        instance.respond_by = instance.resolve_by = None
+    elif instance.responded_at is not None:
+        instance.respond_by = None
+
+
+def update_deadlines(instance, old=None, room_type=None):
+    """
+    Bring the deadlines in line with a change to ``instance``
+
+    Set on create, room change or reopen; settled on other status changes.
+    Shared by the save() signals and bulk writes so they can't drift apart.
+
+    Args:
+        instance (MaintenanceRequest): Request with its new values and
+            transition timestamps already applied
+        old (dict, optional): Previous ``status`` and ``room_id``; None
+            for a new request
+        room_type (str, optional): As for ``apply_deadlines``
+    """
+    reopened = old is not None and old["status"] in CLOSED_STATUSES and instance.status not in CLOSED_STATUSES
+    if old is None or old["room_id"] != instance.room_id or reopened:
+        apply_deadlines(instance, room_type)
+    elif old["status"] != instance.status:
+        settle_deadlines(instance)
+
+
+def recompute_deadlines(queryset, batch_size=500):
+    """
+    Recompute the deadlines of every open request in ``queryset``
+
+    For backfilling and after changing MAINTENANCE_SLA_TARGETS. Writes with
+    bulk_update, so no signals run; ``updated_at`` is bumped so delta sync
+    sends the new deadlines.
+
+    Returns:
+        int: Number of requests updated
+    """
+    requests = (
+        queryset.exclude(status__in=CLOSED_STATUSES)
+        .annotate(sla_room_type=F("room__room_type"))
+        .only("id", "status", "created_at", "responded_at", "room", "updated_at", *SLA_FIELDS)
+        .order_by("id")
+    )
+    fields = [*SLA_FIELDS, "updated_at"]
+    now = timezone.now()
+    updated = 0
+    batch = []
+    for instance in requests.iterator(chunk_size=batch_size):
+        apply_deadlines(instance, instance.sla_room_type or "")
+        instance.updated_at = now
+        batch.append(instance)
+        if len(batch) >= batch_size:
+            updated += queryset.model.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        updated += queryset.model.objects.bulk_update(batch, fields)
+    return updated
+
+
+def overdue(queryset, kind, now=None):
+    """
+    Requests in ``queryset`` whose ``<kind>_by`` deadline has passed and
+    hasn't been escalated yet (a range scan on the deadline index)
+    """
+    now = now or timezone.now()
+    return queryset.filter(
+        **{f"{kind}_by__lt": now, f"{kind}_breached_at__isnull": True}
+    ).order_by(f"{kind}_by", "id")
@@ -0,0 +1,231 @@
+"""
+Helpers for the RequestDailyStat rollup table
+"""
+
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import ArchivedRequest, MaintenanceRequest, RequestDailyStat, RequestStatusEvent
+
+
+def bump(day, building_id, floor_id, status, created=0, entered=0):
+    """
+    Add ``created``/``entered`` (may be negative) to one rollup bucket
+
+    Uses a single UPDATE with F() expressions on the hot path and only
+    creates the row when the bucket does not exist yet. If a concurrent
+    writer creates it first, the unique constraint rejects the second row
+    and the delta is applied to the existing one.
+    """
+    if not created and not entered:
+        return
+
+    key = dict(day=day, building_id=building_id, floor_id=floor_id, status=status)
+    bucket = RequestDailyStat.objects.filter(**key)
+    delta = dict(created=F("created") + created, entered=F("entered") + entered)
+    if bucket.update(**delta):
+        return
+    try:
+        with transaction.atomic():
+            RequestDailyStat.objects.create(**key, created=created, entered=entered)
+    except IntegrityError:
+        bucket.update(**delta)
+
+
+def record_change(instance, old=None, created=False):
+    """
+    Update the rollup for a saved MaintenanceRequest
+
+    Args:
+        instance (MaintenanceRequest): The request that was just saved
+        old (dict, optional): Previous ``status``, ``building_id`` and
+            ``floor_id`` of the row, if it existed before the save
+        created (bool): Whether the row was just inserted
+    """
+    if created or old is None:
+        bump(
+            timezone.localdate(instance.created_at),
+            instance.building_id,
+            instance.floor_id,
+            instance.status,
+            created=1,
+            entered=1,
+        )
+        return
+    record_changes([(instance, old)])
+
+
+def record_changes(changes):
+    """
+    Update the rollup for several existing requests at once
+
+    Deltas are summed per bucket first, so a bulk status change touches each
+    bucket once instead of once per request. ``entered`` counts belong to
+    the request's current building/floor (as in ``rebuild``), so a request
+    that moves takes its recorded transitions along (one query).
+
+    Args:
+        changes (list): ``(instance, old)`` pairs as for ``record_change``
+    """
+    today = timezone.localdate()
+    deltas = defaultdict(lambda: {"created": 0, "entered": 0})
+    moved = {}
+
+    for instance, old in changes:
+        created_day = timezone.localdate(instance.created_at)
+        current = (instance.building_id, instance.floor_id, instance.status)
+        previous = (old["building_id"], old["floor_id"], old["status"])
+        if previous != current:
+            deltas[(created_day, *previous)]["created"] -= 1
+            deltas[(created_day, *current)]["created"] += 1
+        if old["status"] != instance.status:
+            deltas[(today, *current)]["entered"] += 1
+        if previous[:2] != current[:2]:
+            moved[instance.pk] = (instance, previous[:2], old["status"] != instance.status)
+
+    if moved:
+        events = RequestStatusEvent.objects.filter(request_id__in=moved).values_list(
+            "request_id", "at", "to_status"
+        )
+        for request_id, at, to_status in events:
+            instance, previous, status_changed = moved[request_id]
+            if status_changed and at == instance.status_changed_at:
+                continue  # this save's own transition, counted above
+            day = timezone.localdate(at)
+            deltas[(day, *previous, to_status)]["entered"] -= 1
+            deltas[(day, instance.building_id, instance.floor_id, to_status)]["entered"] += 1
+
+    for key, counts in deltas.items():
+        bump(*key, **counts)
+
+
+def record_creates(instances, events):
+    """
+    Add rows inserted with bulk_create (which skips signals) to the rollup
+
+    ``created`` counts on the creation day; ``entered`` counts each of the
+    rows' status events on its day, as ``rebuild`` would count them.
+
+    Args:
+        instances (list): The inserted requests
+        events (list): Their RequestStatusEvents
+    """
+    deltas = defaultdict(lambda: {"created": 0, "entered": 0})
+    by_id = {}
+    for instance in instances:
+        by_id[instance.pk] = instance
+        location = (instance.building_id, instance.floor_id, instance.status)
+        deltas[(timezone.localdate(instance.created_at), *location)]["created"] += 1
+    for event in events:
+        instance = by_id[event.request_id]
+        location = (instance.building_id, instance.floor_id, event.to_status)
+        deltas[(timezone.localdate(event.at), *location)]["entered"] += 1
+
+    for key, counts in deltas.items():
+        bump(*key, **counts)
+
+
+def record_delete(instance):
+    """
+    Remove a request that is about to be deleted from the rollup
+
+    Called before the delete, while its status events still exist: they
+    cascade away with it, so its ``entered`` counts are taken back too and
+    the rollup stays equal to what ``rebuild`` would produce.
+    """
+    location = (instance.building_id, instance.floor_id)
+    deltas = defaultdict(lambda: {"created": 0, "entered": 0})
+    deltas[(timezone.localdate(instance.created_at), *location, instance.status)]["created"] -= 1
+
+    entries = list(instance.status_events.values_list("at", "to_status"))
+    if not entries:
+        entries = [(instance.status_changed_at or instance.updated_at, instance.status)]
+    for at, to_status in entries:
+        deltas[(timezone.localdate(at), *location, to_status)]["entered"] -= 1
+
+    for key, counts in deltas.items():
+        bump(*key, **counts)
+
+
+def release_location(field, pk):
+    """
+    Fold the rollup rows of a building or floor that is about to be deleted
+    into the matching NULL buckets
+
+    Its requests survive with ``building``/``floor`` set to NULL, so their
+    counts move along with them and the rollup stays equal to ``rebuild``.
+
+    Args:
+        field (str): ``"building_id"`` or ``"floor_id"``
+        pk (int): Id of the deleted building or floor
+    """
+    for row in RequestDailyStat.objects.filter(**{field: pk}):
+        row.delete()
+        key = dict(day=row.day, building_id=row.building_id, floor_id=row.floor_id, status=row.status)
+        key[field] = None
+        bump(**key, created=row.created, entered=row.entered)
+
+
+def rebuild(batch_size=500):
+    """
+    Recompute the whole rollup table from MaintenanceRequest
+
+    ``entered`` counts the RequestStatusEvent transitions into each status,
+    attributed to the request's current building/floor. Requests that
+    predate the status history count once, for their current status, on
+    the day they entered it (``status_changed_at`` or ``updated_at``).
+    Archived requests count the same way, from their ``status_history``.
+
+    Returns:
+        int: Number of rollup rows written
+    """
+    buckets = defaultdict(lambda: {"created": 0, "entered": 0})
+    group = ("day", "building_id", "floor_id", "status")
+
+    sources = (
+        ("created", MaintenanceRequest.objects.annotate(day=TruncDate("created_at"))),
+        ("created", ArchivedRequest.objects.annotate(day=TruncDate("created_at"))),
+        (
+            "entered",
+            RequestStatusEvent.objects.annotate(
+                day=TruncDate("at"),
+                building_id=F("request__building_id"),
+                floor_id=F("request__floor_id"),
+                status=F("to_status"),
+            ),
+        ),
+        (
+            "entered",
+            MaintenanceRequest.objects.filter(status_events__isnull=True).annotate(
+                day=TruncDate(Coalesce("status_changed_at", "updated_at"))
+            ),
+        ),
+    )
+    for counter, queryset in sources:
+        rows = queryset.values(*group).annotate(total=Count("id")).order_by()
+        for row in rows:
+            buckets[tuple(row[field] for field in group)][counter] += row["total"]
+
+    archived = ArchivedRequest.objects.values_list(
+        "building_id", "floor_id", "status", "status_history", Coalesce("status_changed_at", "updated_at")
+    )
+    for building_id, floor_id, status, history, changed_at in archived.iterator():
+        entries = [(parse_datetime(event["at"]), event["to"]) for event in history] or [(changed_at, status)]
+        for at, to_status in entries:
+            buckets[(timezone.localdate(at), building_id, floor_id, to_status)]["entered"] += 1
+
+    stats = [
+        RequestDailyStat(day=day, building_id=building_id, floor_id=floor_id, status=status, **counts)
+        for (day, building_id, floor_id, status), counts in buckets.items()
+    ]
+
+    with transaction.atomic():
+        RequestDailyStat.objects.all().delete()
+        RequestDailyStat.objects.bulk_create(stats, batch_size=batch_size)
+
+    return len(stats)
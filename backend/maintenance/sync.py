@@ -0,0 +1,121 @@
+"""
+Delta sync for maintenance requests
+
+A sync token records how far a client has read:
+- the (updated_at, id) of the last changed request it received
+- the id of the last RequestTombstone it received
+
+``changes_since`` returns everything after that position plus a new token.
+Tokens are opaque to clients; pass back exactly what the API returned.
+
+The position only moves past rows written more than MAINTENANCE_SYNC_WINDOW
+seconds ago. ``updated_at`` (and a tombstone id) is taken before the writing
+transaction commits, so a slow commit can become visible behind rows a client
+already read; keeping the token behind that window means such rows are still
+ahead of it. Rows inside the window are sent again on the next call, so
+clients apply changes and deletions by id (an upsert / idempotent delete).
+The window must exceed the longest write transaction plus clock skew between
+app servers.
+"""
+
+import base64
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Max, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from .models import MaintenanceRequest, RequestTombstone
+from .rows import REQUEST_VALUES, request_rows
+
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def encode_token(updated_at, pk, tombstone_id):
+    raw = f"{updated_at.isoformat()}|{pk}|{tombstone_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_token(token):
+    """Return (updated_at, pk, tombstone_id), raising ValidationError if invalid"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        updated_at, pk, tombstone_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        updated_at = parse_datetime(updated_at)
+        pk, tombstone_id = int(pk), int(tombstone_id)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        updated_at = None
+    if updated_at is None:
+        raise ValidationError({"since": "Invalid sync token"})
+    return updated_at, pk, tombstone_id
+
+
+def settle_horizon(now=None):
+    """Rows written at or before this time are assumed committed"""
+    window = getattr(settings, "MAINTENANCE_SYNC_WINDOW", 60)
+    return (now or timezone.now()) - timedelta(seconds=window)
+
+
+def changes_since(token=None, limit=100, request=None, now=None):
+    """
+    Collect request changes and deletions after ``token``
+
+    Args:
+        token (str, optional): Token from a previous call; None for a full sync
+        limit (int): Max changed requests and max tombstones per call
+        request (Request, optional): Used to build absolute photo URLs
+        now (datetime, optional): Current time, for the settle window
+
+    Returns:
+        dict: ``changes`` (serialized requests), ``deleted`` (request ids),
+        ``token`` and ``has_more`` (call again straight away if True)
+    """
+    horizon = settle_horizon(now)
+    if token:
+        updated_at, pk, tombstone_id = decode_token(token)
+        tombstones = list(
+            RequestTombstone.objects.filter(id__gt=tombstone_id)
+            .order_by("id")
+            .values_list("id", "request_id", "deleted_at")[: limit + 1]
+        )
+    else:
+        # Full sync: the client has nothing, so earlier deletions don't matter
+        updated_at, pk = EPOCH, 0
+        tombstone_id = (
+            RequestTombstone.objects.filter(deleted_at__lte=horizon)
+            .aggregate(last=Max("id"))["last"] or 0
+        )
+        tombstones = []
+
+    rows = list(
+        MaintenanceRequest.objects.filter(
+            Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=pk)
+        )
+        .order_by("updated_at", "id")
+        .values(*REQUEST_VALUES)[: limit + 1]
+    )
+
+    more_rows = len(rows) > limit
+    more_tombstones = len(tombstones) > limit
+    rows, tombstones = rows[:limit], tombstones[:limit]
+
+    # Advance over the settled prefix only; the rest is sent again next time
+    for row in rows:
+        if row["updated_at"] > horizon:
+            more_rows = False  # the next page starts here again; wait instead
+            break
+        updated_at, pk = row["updated_at"], row["id"]
+    for last, _request_id, deleted_at in tombstones:
+        if deleted_at > horizon:
+            more_tombstones = False
+            break
+        tombstone_id = last
+
+    return {
+        "changes": request_rows(rows, request),
+        "deleted": [request_id for _id, request_id, _at in tombstones],
+        "token": encode_token(updated_at, pk, tombstone_id),
+        "has_more": more_rows or more_tombstones,
+    }
@@ -1,3 +1,1678 @@
-from django.test import TestCase
+import csv
+import json
+import shutil
+import tempfile
+import threading
+from datetime import date, timedelta
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, connections, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.db.models import Count, QuerySet
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from buildings.models import Building, Floor, Room
+from calendar_system.models import MaintenanceSchedule
+from calendar_system.rows import schedule_rows
+from calendar_system.serializers import MaintenanceScheduleSerializer
+from notifications import counters
+from notifications.helpers import notify_sla_breaches, notify_user
+from notifications.models import ArchivedNotification, Notification
+from notifications.rows import notification_rows
+from notifications.serializers import NotificationSerializer
+from . import archive, export, search, sla, stats, sync
+from .models import (
+    ArchivedRequest, MaintenanceRequest, RequestDailyStat, RequestStatusEvent, RequestTombstone,
+)
+from .rows import request_rows
+from .serializers import MaintenanceRequestListSerializer, MaintenanceRequestSerializer
+
+
+@skipUnless(connection.vendor == "sqlite", "EXPLAIN QUERY PLAN output is SQLite specific")
+class MaintenanceRequestQueryPlanTests(TestCase):
+    """
+    Guard the hot MaintenanceRequest queries against falling back to full
+    table scans. ``SCAN maintenance_maintenancerequest`` reads every row; an
+    ordered ``SCAN ... USING INDEX`` is only acceptable when a LIMIT stops it
+    early, and ``USING COVERING INDEX`` never touches the table at all.
+    """
+
+    table = MaintenanceRequest._meta.db_table
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("staff", password="x")
+        cls.building = Building.objects.create(name="Annex")
+        cls.floor = Floor.objects.create(building=cls.building, number=1, label="1st Floor")
+        cls.room = Room.objects.create(building=cls.building, floor=cls.floor, name="A1")
+        MaintenanceRequest.objects.bulk_create(
+            MaintenanceRequest(
+                description=f"Issue {i}",
+                role="staff",
+                status=status,
+                building=cls.building,
+                floor=cls.floor,
+                room=cls.room,
+                assigned_to=cls.user if status == "in_progress" else None,
+                created_by=cls.user,
+            )
+            for i in range(50)
+            for status in ("pending", "in_progress", "completed")
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def assertUsesIndex(self, queryset):
+        plan = queryset.explain()
+        limited = queryset.query.high_mark is not None
+        for line in plan.splitlines():
+            if f"SCAN {self.table}" not in line or "USING COVERING INDEX" in line:
+                continue
+            if "USING INDEX" in line and limited:
+                continue
+            self.fail(f"Full table scan:\n{queryset.query}\n{plan}")
+
+    def test_newest_first_page(self):
+        self.assertUsesIndex(
+            MaintenanceRequest.objects.order_by("-created_at", "-id")[:100]
+        )
+
+    def test_status_filtered_list(self):
+        self.assertUsesIndex(
+            MaintenanceRequest.objects.filter(status="pending").order_by("-created_at")[:100]
+        )
+
+    def test_status_counts(self):
+        self.assertUsesIndex(
+            MaintenanceRequest.objects.values("status").order_by().annotate(n=Count("id"))
+        )
+
+    def test_room_list(self):
+        self.assertUsesIndex(
+            MaintenanceRequest.objects.filter(
+                building=self.building, floor=self.floor, room=self.room, status="pending"
+            )
+        )
+
+    def test_building_list(self):
+        self.assertUsesIndex(
+            MaintenanceRequest.objects.filter(building=self.building).order_by("-created_at")[:100]
+        )
+
+    def test_assigned_tasks(self):
+        self.assertUsesIndex(
+            MaintenanceRequest.objects.filter(assigned_to=self.user, status="in_progress")
+        )
+
+    def test_created_by_list(self):
+        self.assertUsesIndex(
+            MaintenanceRequest.objects.filter(created_by=self.user).order_by("-created_at")
+        )
+
+    def test_overdue_scan(self):
+        for kind in ("respond", "resolve"):
+            self.assertUsesIndex(
+                sla.overdue(MaintenanceRequest.objects.all(), kind, timezone.now())[:200]
+            )
+
+    def test_archive_candidates(self):
+        self.assertUsesIndex(archive.due(timezone.now()).values("id")[:500])
+
+
+class ClaimRequestConcurrencyTests(TransactionTestCase):
+    """Simultaneous claims on one request must produce exactly one winner"""
+
+    claimants = 8
+
+    def setUp(self):
+        self.staff = [User.objects.create_user(f"staff{i}") for i in range(self.claimants)]
+        self.request = MaintenanceRequest.objects.create(description="Leaking pipe", status="approved")
+
+    def claim(self, user, barrier, results):
+        client = APIClient()
+        client.force_authenticate(user)
+        try:
+            barrier.wait()
+            response = client.post(f"/api/maintenance/requests/{self.request.id}/claim/")
+            results.append((user.id, response.status_code))
+        finally:
+            connections.close_all()
+
+    def test_exactly_one_winner(self):
+        barrier = threading.Barrier(self.claimants)
+        results = []
+        threads = [
+            threading.Thread(target=self.claim, args=(user, barrier, results))
+            for user in self.staff
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        winners = [user_id for user_id, code in results if code == 200]
+        self.assertEqual(len(results), self.claimants)
+        self.assertEqual(len(winners), 1)
+        self.assertEqual(sorted(code for _id, code in results), [200] + [400] * (self.claimants - 1))
+
+        self.request.refresh_from_db()
+        self.assertEqual(self.request.assigned_to_id, winners[0])
+        self.assertEqual(self.request.status, "in_progress")
+        self.assertEqual(
+            RequestDailyStat.objects.get(status="in_progress").entered, 1
+        )
+
+
+class ChangeTrackingTests(TestCase):
+    """Saves of loaded requests compare against the load-time snapshot"""
+
+    table = MaintenanceRequest._meta.db_table
+
+    def setUp(self):
+        self.user = User.objects.create_user("staff")
+        MaintenanceRequest.objects.create(description="Broken window", created_by=self.user)
+        self.request = MaintenanceRequest.objects.get()
+
+    def test_changed_fields(self):
+        self.assertEqual(self.request.changed_fields(), [])
+        self.request.status = "approved"
+        self.request.assigned_to = self.user
+        self.assertEqual(self.request.changed_fields(), ["status", "assigned_to"])
+        self.assertTrue(self.request.save_changes())
+        self.assertEqual(self.request.changed_fields(), [])
+        self.assertFalse(self.request.save_changes())
+
+    def test_status_save_does_not_reselect_row(self):
+        self.request.status = "approved"
+        with CaptureQueriesContext(connection) as queries:
+            self.request.save_changes()
+        selects = [
+            query["sql"] for query in queries.captured_queries
+            if query["sql"].startswith("SELECT") and f'FROM "{self.table}"' in query["sql"]
+        ]
+        self.assertEqual(selects, [])
+
+        self.request.refresh_from_db()
+        self.assertEqual(self.request.status, "approved")
+        self.assertIsNotNone(self.request.status_changed_at)
+        self.assertEqual(self.request.status_events.count(), 2)
+        self.assertEqual(RequestDailyStat.objects.get(status="approved").created, 1)
+
+
+class AnalyticsTests(TestCase):
+    """Dashboard figures computed in the database"""
+
+    url = "/api/maintenance/analytics/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user("admin", is_staff=True)
+        cls.annex = Building.objects.create(name="Annex")
+        cls.hall = Building.objects.create(name="Hall")
+        now = timezone.now()
+        # Completed after 1..5 hours, all picked up after 30 minutes
+        for hours in range(1, 6):
+            request = MaintenanceRequest.objects.create(
+                description=f"Done {hours}", building=cls.annex, status="completed"
+            )
+            MaintenanceRequest.objects.filter(id=request.id).update(
+                created_at=now - timedelta(hours=hours),
+                responded_at=now - timedelta(hours=hours) + timedelta(minutes=30),
+                completed_at=now,
+            )
+        for i in range(3):
+            MaintenanceRequest.objects.create(description=f"Open {i}", building=cls.hall)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_totals_and_percentiles(self):
+        data = self.client.get(self.url).json()
+        self.assertEqual(data["total_requests"], 8)
+        self.assertEqual(data["status_counts"]["completed"], 5)
+        self.assertEqual(data["status_counts"]["pending"], 3)
+        self.assertEqual(data["completion_rate"], 62.5)
+        self.assertEqual(data["completion_time"]["count"], 5)
+        self.assertEqual(data["avg_completion_time"], 3.0)
+        self.assertEqual(data["completion_time"]["percentiles"], {"p50": 3.0, "p90": 5.0, "p95": 5.0})
+        self.assertEqual(data["avg_response_time"], 0.5)
+        self.assertEqual(
+            {row["building"]: row["total"] for row in data["buildings"]}, {"Annex": 5, "Hall": 3}
+        )
+
+    def test_building_filter(self):
+        data = self.client.get(self.url, {"building": self.hall.id}).json()
+        self.assertEqual(data["total_requests"], 3)
+        self.assertEqual(data["completion_time"]["count"], 0)
+        self.assertEqual(data["completion_time"]["percentiles"], {"p50": None, "p90": None, "p95": None})
+
+    def test_date_window(self):
+        today = timezone.localdate()
+        data = self.client.get(self.url, {"start": today.isoformat(), "end": today.isoformat()}).json()
+        self.assertEqual(data["range"], {"start": today.isoformat(), "end": today.isoformat()})
+        self.assertEqual(len(data["request_trends"]), 1)
+
+        yesterday = today - timedelta(days=1)
+        data = self.client.get(self.url, {"end": yesterday.isoformat()}).json()
+        self.assertLess(data["total_requests"], 8)
+
+    def test_invalid_parameters(self):
+        for params in (
+            {"start": "2026-13-01"},
+            {"end": "yesterday"},
+            {"start": "2026-02-01", "end": "2026-01-01"},
+            {"building": "annex"},
+        ):
+            with self.subTest(params=params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn("error", response.json())
+
+    def test_admin_only(self):
+        self.client.force_authenticate(User.objects.create_user("regular"))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class StatusHistoryTests(TestCase):
+    """Status events record time in the previous status; metrics read them"""
+
+    def setUp(self):
+        self.start = timezone.now() - timedelta(days=1)
+        self.request = self.save_at(0, MaintenanceRequest(description="Leak"))
+        for hours, status in [(2, "approved"), (5, "in_progress"), (6, "completed"), (8, "in_progress")]:
+            self.request.status = status
+            self.save_at(hours, self.request)
+        self.request.refresh_from_db()
+
+    def save_at(self, hours, request):
+        with mock.patch("django.utils.timezone.now", return_value=self.start + timedelta(hours=hours)):
+            request.save()
+        return request
+
+    def test_events_and_durations(self):
+        events = self.request.status_events.values_list("from_status", "to_status", "at", "duration")
+        self.assertEqual(list(events), [
+            ("", "pending", self.start, None),
+            ("pending", "approved", self.start + timedelta(hours=2), timedelta(hours=2)),
+            ("approved", "in_progress", self.start + timedelta(hours=5), timedelta(hours=3)),
+            ("in_progress", "completed", self.start + timedelta(hours=6), timedelta(hours=1)),
+            ("completed", "in_progress", self.start + timedelta(hours=8), timedelta(hours=2)),
+        ])
+
+    def test_reopen_clears_completed_at(self):
+        self.assertIsNone(self.request.completed_at)
+        self.assertEqual(self.request.responded_at, self.start + timedelta(hours=5))
+        self.assertEqual(self.request.status_changed_at, self.start + timedelta(hours=8))
+
+    def test_time_in_status_in_analytics(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user("admin", is_staff=True))
+        data = client.get("/api/maintenance/analytics/").json()
+        self.assertEqual(data["time_in_status"], {
+            "pending": {"count": 1, "average": 2.0},
+            "approved": {"count": 1, "average": 3.0},
+            "in_progress": {"count": 1, "average": 1.0},
+            "completed": {"count": 1, "average": 2.0},
+        })
+
+
+class DailyStatsTests(TestCase):
+    """The rollup follows creates, status/location changes and deletes"""
+
+    def setUp(self):
+        self.annex = Building.objects.create(name="Annex")
+        self.hall = Building.objects.create(name="Hall")
+        self.today = timezone.localdate()
+
+    def buckets(self):
+        rows = RequestDailyStat.objects.exclude(created=0, entered=0)
+        return {
+            (row.building_id, row.status): (row.created, row.entered)
+            for row in rows
+        }
+
+    def test_create_change_delete(self):
+        request = MaintenanceRequest.objects.create(description="Leak", building=self.annex)
+        self.assertEqual(self.buckets(), {(self.annex.id, "pending"): (1, 1)})
+
+        request.status = "approved"
+        request.save()
+        self.assertEqual(
+            self.buckets(),
+            {(self.annex.id, "pending"): (0, 1), (self.annex.id, "approved"): (1, 1)},
+        )
+
+        # Its transitions move along with it, as rebuild() attributes them
+        request.building = self.hall
+        request.save()
+        self.assertEqual(
+            self.buckets(),
+            {(self.hall.id, "pending"): (0, 1), (self.hall.id, "approved"): (1, 1)},
+        )
+
+        request.delete()
+        self.assertEqual(self.buckets(), {})
+
+    def test_rebuild_matches_incremental(self):
+        requests = [
+            MaintenanceRequest.objects.create(description=f"Issue {i}", building=building)
+            for i, building in enumerate([self.annex, self.hall, None, None])
+        ]
+        for request, status in zip(requests, ["approved", "in_progress", "approved", "completed"]):
+            request.status = status
+            request.save()
+        requests[0].building = self.hall
+        requests[0].status = "in_progress"
+        requests[0].save()
+        requests[1].delete()
+
+        incremental = self.buckets()
+        stats.rebuild()
+        self.assertEqual(self.buckets(), incremental)
+
+    def test_deleted_location_moves_to_null_bucket(self):
+        floor = Floor.objects.create(building=self.annex, number=1)
+        hall_floor = Floor.objects.create(building=self.hall, number=1)
+        MaintenanceRequest.objects.create(description="Leak", building=self.annex, floor=floor)
+        MaintenanceRequest.objects.create(description="Draft", building=self.annex)
+        MaintenanceRequest.objects.create(description="Lamp", building=self.hall, floor=hall_floor)
+        MaintenanceRequest.objects.create(description="Door")
+
+        self.annex.delete()
+        hall_floor.delete()
+        self.assertEqual(self.buckets(), {(None, "pending"): (3, 3), (self.hall.id, "pending"): (1, 1)})
+        incremental = set(RequestDailyStat.objects.values_list("day", "building", "floor", "status", "created", "entered"))
+        stats.rebuild()
+        rebuilt = set(RequestDailyStat.objects.values_list("day", "building", "floor", "status", "created", "entered"))
+        self.assertEqual(rebuilt, incremental)
+
+    def test_null_building_bucket_is_unique(self):
+        stats.bump(self.today, None, None, "pending", created=1)
+        stats.bump(self.today, None, None, "pending", created=1)
+        self.assertEqual(RequestDailyStat.objects.get(building=None).created, 2)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            RequestDailyStat.objects.create(day=self.today, status="pending", created=1)
+
+    def test_concurrent_first_writer(self):
+        # Another writer creates the bucket between our UPDATE and INSERT
+        real_update = QuerySet.update
+        calls = []
+
+        def racing_update(queryset, **kwargs):
+            if queryset.model is RequestDailyStat and not calls:
+                calls.append(1)
+                RequestDailyStat.objects.create(day=self.today, status="pending", created=5)
+                return 0
+            return real_update(queryset, **kwargs)
+
+        with mock.patch.object(QuerySet, "update", racing_update):
+            stats.bump(self.today, None, None, "pending", created=1)
+        self.assertEqual(RequestDailyStat.objects.get().created, 6)
+
+
+class KeysetPaginationTests(TestCase):
+    """Cursor pages over (created_at, id) never skip or repeat rows"""
+
+    url = "/api/maintenance/requests/"
+
+    def setUp(self):
+        self.user = User.objects.create_user("staff", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.ids = [self.create(f"Issue {i}") for i in range(7)]
+        # Identical timestamps: order falls back to the id tiebreak
+        MaintenanceRequest.objects.update(created_at=timezone.now() - timedelta(minutes=5))
+
+    def create(self, description):
+        return MaintenanceRequest.objects.create(description=description, created_by=self.user).id
+
+    def ids_of(self, response):
+        return [row["id"] for row in response.json()["results"]]
+
+    def test_cursor_round_trip(self):
+        response = self.client.get(self.url, {"cursor": "", "page_size": 3})
+        seen = self.ids_of(response)
+        self.assertEqual(seen, sorted(self.ids, reverse=True)[:3])
+
+        # Rows created between page loads don't shift the following pages
+        newer = [self.create("New 1"), self.create("New 2")]
+
+        while response.json()["next"]:
+            response = self.client.get(response.json()["next"])
+            seen += self.ids_of(response)
+        self.assertEqual(seen, sorted(self.ids, reverse=True))
+        self.assertFalse(response.json()["has_more"])
+
+        first = self.client.get(self.url, {"cursor": "", "page_size": 3})
+        self.assertEqual(self.ids_of(first), newer[::-1] + [max(self.ids)])
+
+    def test_newer_than(self):
+        response = self.client.get(self.url, {"cursor": "", "page_size": 3})
+        newer_url = response.json()["newer"]
+        self.assertEqual(self.ids_of(self.client.get(newer_url)), [])
+
+        added = [self.create("New 1"), self.create("New 2")]
+        response = self.client.get(newer_url)
+        self.assertEqual(self.ids_of(response), added[::-1])
+        self.assertIsNone(response.json()["next"])
+
+        # Polling again from the returned cursor finds nothing new
+        self.assertEqual(self.ids_of(self.client.get(response.json()["newer"])), [])
+
+    @override_settings(MAINTENANCE_MAX_PAGE_SIZE=5)
+    def test_page_size_cap(self):
+        response = self.client.get(self.url, {"cursor": "", "page_size": 50})
+        self.assertEqual(len(self.ids_of(response)), 5)
+        self.assertTrue(response.json()["has_more"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_numbers_by_default(self):
+        data = self.client.get(self.url).json()
+        self.assertEqual(data["count"], 7)
+        self.assertIn("previous", data)
+
+
+class SparseFieldsetTests(TestCase):
+    """?fields= and ?expand= on the request list"""
+
+    url = "/api/maintenance/requests/"
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("staff", is_staff=True, first_name="Sam")
+        building = Building.objects.create(name="Annex")
+        MaintenanceRequest.objects.create(
+            description="Leak", building=building, assigned_to=cls.user, created_by=cls.user
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def row(self, **params):
+        return self.client.get(self.url, params).json()["results"][0]
+
+    def test_default_fields(self):
+        row = self.row()
+        self.assertNotIn("assigned_to_details_maintenance", row)
+        self.assertEqual(row["building"]["name"], "Annex")
+        self.assertEqual(row["assigned_to_details"]["first_name"], "Sam")
+
+    def test_fields(self):
+        self.assertEqual(set(self.row(fields="id,status")), {"id", "status"})
+        # id is always included; unknown names are ignored
+        self.assertEqual(set(self.row(fields="description,nope")), {"id", "description"})
+
+    def test_expand(self):
+        row = self.row(expand="assigned_to_details_maintenance")
+        self.assertEqual(row["assigned_to_details_maintenance"], row["assigned_to_details"])
+        self.assertEqual(
+            set(self.row(fields="status", expand="assigned_to_details_maintenance")),
+            {"id", "status", "assigned_to_details_maintenance"},
+        )
+
+
+class ListRenderingParityTests(TestCase):
+    """The values() fast paths render the same JSON as the serializers"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user("staff", first_name="Sam", last_name="Lee", email="s@example.com")
+        building = Building.objects.create(name="Annex")
+        floor = Floor.objects.create(building=building, number=2, label="2nd Floor")
+        room = Room.objects.create(building=building, floor=floor, name="B2")
+        full = MaintenanceRequest.objects.create(
+            description="Leak", requester_name="Ana", role="staff", building=building, floor=floor,
+            room=room, assigned_to=cls.user, created_by=cls.user, issue_photo="issue_photos/a.jpg",
+        )
+        MaintenanceRequest.objects.filter(id=full.id).update(photo_variants={"issue_photo": {
+            "source": "issue_photos/a.jpg", "state": "ready",
+            "thumb": "issue_photos/variants/a.thumb.jpg", "medium": "issue_photos/variants/a.medium.jpg",
+        }})
+        sparse = MaintenanceRequest.objects.create(description="Noise", building=building)
+        MaintenanceSchedule.objects.create(request=full, schedule_date=date(2026, 1, 15), assigned_staff=cls.user)
+        MaintenanceSchedule.objects.create(request=sparse, schedule_date=date(2026, 1, 16))
+        Notification.objects.bulk_create([
+            Notification(user=cls.user, message="With request", maintenance_request=full),
+            Notification(user=cls.user, message="Without request"),
+        ])
+
+    def setUp(self):
+        self.renderer = JSONRenderer()
+        self.request = Request(APIRequestFactory().get("/api/maintenance/requests/"))
+
+    def assertSameJSON(self, slow, fast):
+        self.assertEqual(self.renderer.render(slow), self.renderer.render(fast))
+
+    def test_request_rows(self):
+        requests = MaintenanceRequest.objects.order_by("-created_at", "-id")
+        context = {"request": self.request}
+        self.assertSameJSON(
+            MaintenanceRequestListSerializer(requests, many=True, context=context).data,
+            request_rows(requests, self.request),
+        )
+        # Baseline: the serializer ListRequestsView used before the slim one
+        self.assertSameJSON(
+            MaintenanceRequestSerializer(requests, many=True, context=context).data,
+            request_rows(requests, self.request, full=True),
+        )
+
+    def test_notification_rows(self):
+        notifications = Notification.objects.order_by("-created_at", "-id")
+        self.assertSameJSON(NotificationSerializer(notifications, many=True).data, notification_rows(notifications))
+
+    def test_schedule_rows(self):
+        self.assertSameJSON(
+            MaintenanceScheduleSerializer(MaintenanceSchedule.objects.order_by("id"), many=True).data,
+            schedule_rows(MaintenanceRequest.objects.filter(schedule__isnull=False).order_by("schedule__id")),
+        )
+
+
+class ConditionalListTests(TestCase):
+    """Polls of an unchanged list get 304; any change gets a fresh 200"""
+
+    url = "/api/maintenance/requests/"
+
+    def setUp(self):
+        self.user = User.objects.create_user("staff", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.building = Building.objects.create(name="Annex")
+        self.request = MaintenanceRequest.objects.create(description="Leak", building=self.building)
+
+    def poll(self, etag):
+        return self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_not_modified_until_changed(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        etag = first["ETag"]
+        self.assertIn("Last-Modified", first)
+
+        unchanged = self.poll(etag)
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertEqual(unchanged.content, b"")
+
+        self.request.status = "approved"
+        self.request.save()
+        changed = self.poll(etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], etag)
+        self.assertEqual(changed.json()["results"][0]["status"], "approved")
+
+    def test_related_rename_and_delete_change_etag(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.building.name = "Annex West"
+        self.building.save()
+        response = self.poll(etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response["ETag"]
+        self.request.delete()
+        self.assertEqual(self.poll(etag).status_code, 200)
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(self.url)["Last-Modified"]
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_etag_is_per_user_and_query(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertNotEqual(self.client.get(self.url, {"status": "pending"})["ETag"], etag)
+
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user("other", is_staff=True))
+        self.assertEqual(other.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+@override_settings(MAINTENANCE_SYNC_WINDOW=0)
+class DeltaSyncTests(TestCase):
+    """Sync tokens pick up every create, update and delete exactly once they settle"""
+
+    url = "/api/maintenance/requests/changes/"
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("staff", is_staff=True))
+        self.first = MaintenanceRequest.objects.create(description="Leak")
+
+    def sync(self, token=None, **params):
+        if token:
+            params["since"] = token
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_create_update_delete_rounds(self):
+        full = self.sync()
+        self.assertEqual([row["id"] for row in full["changes"]], [self.first.id])
+        self.assertEqual(full["deleted"], [])
+        self.assertFalse(full["has_more"])
+
+        second = MaintenanceRequest.objects.create(description="Broken door")
+        created = self.sync(full["token"])
+        self.assertEqual([row["id"] for row in created["changes"]], [second.id])
+
+        self.first.status = "approved"
+        self.first.save()
+        updated = self.sync(created["token"])
+        self.assertEqual([row["id"] for row in updated["changes"]], [self.first.id])
+        self.assertEqual(updated["changes"][0]["status"], "approved")
+
+        second_id = second.id
+        second.delete()
+        deleted = self.sync(updated["token"])
+        self.assertEqual(deleted["changes"], [])
+        self.assertEqual(deleted["deleted"], [second_id])
+
+        idle = self.sync(deleted["token"])
+        self.assertEqual((idle["changes"], idle["deleted"]), ([], []))
+
+    def test_equal_updated_at_pages_by_id(self):
+        others = [MaintenanceRequest.objects.create(description=f"Issue {n}") for n in range(2)]
+        ids = [self.first.id, *(other.id for other in others)]
+        stamp = timezone.now() - timedelta(minutes=5)
+        MaintenanceRequest.objects.filter(id__in=ids).update(updated_at=stamp)
+
+        page = self.sync(limit=2)
+        self.assertEqual([row["id"] for row in page["changes"]], ids[:2])
+        self.assertTrue(page["has_more"])
+        rest = self.sync(page["token"], limit=2)
+        self.assertEqual([row["id"] for row in rest["changes"]], ids[2:])
+        self.assertFalse(rest["has_more"])
+
+    def test_deadline_recompute_is_synced(self):
+        token = self.sync()["token"]
+        MaintenanceRequest.objects.filter(id=self.first.id).update(respond_by=None)
+        sla.recompute_deadlines(MaintenanceRequest.objects.all())
+        changes = self.sync(token)["changes"]
+        self.assertEqual([row["id"] for row in changes], [self.first.id])
+        self.assertIsNotNone(changes[0]["respond_by"])
+
+    def test_invalid_token(self):
+        self.assertEqual(self.client.get(self.url, {"since": "garbage"}).status_code, 400)
+
+
+@override_settings(MAINTENANCE_SYNC_WINDOW=60)
+class DeltaSyncWindowTests(TestCase):
+    """The token stays behind recent writes, so a late commit is not skipped"""
+
+    def setUp(self):
+        self.now = timezone.now()
+
+    def request_at(self, seconds_ago):
+        request = MaintenanceRequest.objects.create(description=f"{seconds_ago}s ago")
+        MaintenanceRequest.objects.filter(id=request.id).update(
+            updated_at=self.now - timedelta(seconds=seconds_ago)
+        )
+        return request
+
+    def test_late_commit_is_still_ahead_of_token(self):
+        settled = self.request_at(120)
+        recent = self.request_at(10)
+        first = sync.changes_since(now=self.now)
+        self.assertEqual([row["id"] for row in first["changes"]], [settled.id, recent.id])
+
+        # Written before ``recent`` but committed after the first read
+        late = self.request_at(20)
+        second = sync.changes_since(first["token"], now=self.now)
+        self.assertEqual([row["id"] for row in second["changes"]], [late.id, recent.id])
+
+        # Once settled, rows are not sent again
+        later = self.now + timedelta(seconds=120)
+        third = sync.changes_since(second["token"], now=later)
+        self.assertEqual([row["id"] for row in third["changes"]], [late.id, recent.id])
+        fourth = sync.changes_since(third["token"], now=later)
+        self.assertEqual(fourth["changes"], [])
+
+    def test_unsettled_full_page_does_not_loop(self):
+        self.request_at(5)
+        self.request_at(4)
+        page = sync.changes_since(limit=1, now=self.now)
+        self.assertEqual(len(page["changes"]), 1)
+        self.assertFalse(page["has_more"])
+
+    def test_recent_tombstones_are_resent(self):
+        request = self.request_at(5)
+        request_id = request.id
+        token = sync.changes_since(now=timezone.now())["token"]
+        request.delete()
+        now = timezone.now()
+        first = sync.changes_since(token, now=now)
+        self.assertEqual(first["deleted"], [request_id])
+        again = sync.changes_since(first["token"], now=now)
+        self.assertEqual(again["deleted"], [request_id])
+
+
+@override_settings(NOTIFICATIONS_DEFERRED=False)
+class BulkUpdateTests(TestCase):
+    """Bulk approve/reject/assign: per-id results, one transaction, batched writes"""
+
+    url = "/api/maintenance/requests/bulk/"
+
+    def setUp(self):
+        self.admin = User.objects.create_user("admin", is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def make_requests(self, count):
+        owner = User.objects.create_user(f"owner{count}")
+        return [
+            MaintenanceRequest.objects.create(description=f"Issue {n}", created_by=owner)
+            for n in range(count)
+        ]
+
+    def test_admin_only(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user("student"))
+        request = self.make_requests(1)[0]
+        response = client.post(self.url, {"ids": [request.id], "status": "approved"}, format="json")
+        self.assertEqual(response.status_code, 403)
+
+    def test_per_item_results_and_missing_ids(self):
+        first, second = self.make_requests(2)
+        response = self.client.post(
+            self.url, {"ids": [first.id, 999999, second.id], "status": "approved"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body["updated"], 2)
+        self.assertEqual([result["id"] for result in body["results"]], [first.id, 999999, second.id])
+        self.assertEqual([result["ok"] for result in body["results"]], [True, False, True])
+        self.assertEqual(body["results"][1]["error"], "Request not found")
+        self.assertEqual(
+            set(MaintenanceRequest.objects.values_list("status", flat=True)), {"approved"}
+        )
+
+    def test_single_transaction(self):
+        requests = self.make_requests(3)
+        with mock.patch("maintenance.views.notify_bulk_request_updates", side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.client.post(
+                    self.url, {"ids": [r.id for r in requests], "status": "approved"}, format="json"
+                )
+        self.assertEqual(
+            set(MaintenanceRequest.objects.values_list("status", flat=True)), {"pending"}
+        )
+
+    def test_notifications_are_batched(self):
+        requests = self.make_requests(3)
+        response = self.client.post(
+            self.url, {"ids": [r.id for r in requests], "status": "approved"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        updates = Notification.objects.filter(message__contains="status changed to Approved")
+        self.assertEqual(updates.filter(user=requests[0].created_by).count(), 3)
+        self.assertEqual(updates.filter(user=self.admin).count(), 3)
+
+    def test_deadlines_match_single_save(self):
+        bulk, single = self.make_requests(2)
+        # A deadline set under older targets is settled, not recomputed, by
+        # a move between open statuses; in_progress meets respond_by
+        custom = timezone.now() + timedelta(days=30)
+        MaintenanceRequest.objects.filter(id__in=[bulk.id, single.id]).update(resolve_by=custom)
+        self.client.post(self.url, {"ids": [bulk.id], "status": "in_progress"}, format="json")
+        single = MaintenanceRequest.objects.get(id=single.id)
+        single.status = "in_progress"
+        single.save()
+
+        bulk.refresh_from_db()
+        self.assertEqual((bulk.respond_by, bulk.resolve_by), (None, custom))
+        self.assertEqual((single.respond_by, single.resolve_by), (None, custom))
+
+        # Reopening recomputes on both paths
+        for status in ("completed", "approved"):
+            self.client.post(self.url, {"ids": [bulk.id], "status": status}, format="json")
+        bulk.refresh_from_db()
+        hours = settings.MAINTENANCE_SLA_TARGETS["default"]["resolve"]
+        self.assertEqual(bulk.resolve_by, bulk.created_at + timedelta(hours=hours))
+
+    def test_query_count_does_not_grow_with_ids(self):
+        def queries_for(count):
+            requests = self.make_requests(count)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    self.url,
+                    {"ids": [r.id for r in requests], "status": "approved", "assigned_to": self.admin.id},
+                    format="json",
+                )
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+
+        queries_for(1)  # warm the recipient caches
+        self.assertEqual(queries_for(2), queries_for(12))
+
+
+class RequestOwnershipTests(TestCase):
+    """requests/mine/ scopes by created_by; staff roles come from staffprofile"""
+
+    url = "/api/maintenance/requests/mine/"
+
+    def setUp(self):
+        self.alice = User.objects.create_user("alice")
+        self.own = MaintenanceRequest.objects.create(description="Mine", created_by=self.alice)
+        # Same requester name but not owned: no longer matched by name
+        MaintenanceRequest.objects.create(description="Name only", requester_name="alice")
+        MaintenanceRequest.objects.create(
+            description="Someone else's", created_by=User.objects.create_user("bob")
+        )
+
+    def list_ids(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return {row["id"] for row in response.json()["results"]}
+
+    def test_user_sees_only_created_by_requests(self):
+        self.assertEqual(self.list_ids(self.alice), {self.own.id})
+
+    def test_create_defaults_created_by_to_caller(self):
+        client = APIClient()
+        client.force_authenticate(self.alice)
+        response = client.post(
+            "/api/maintenance/requests/create/",
+            {
+                "description": "New leak",
+                "requester_name": "Alice A.",
+                "role": "instructor",
+                "building_id": Building.objects.create(name="Annex").id,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        created = MaintenanceRequest.objects.get(description="New leak")
+        self.assertEqual(created.created_by, self.alice)
+        self.assertIn(created.id, self.list_ids(self.alice))
+
+    def test_only_admins_set_created_by(self):
+        bob = User.objects.get(username="bob")
+        admin = User.objects.create_user("admin", is_staff=True)
+        building = Building.objects.create(name="Annex")
+        for user, owner in [(self.alice, self.alice), (admin, bob)]:
+            client = APIClient()
+            client.force_authenticate(user)
+            response = client.post(
+                "/api/maintenance/requests/create/",
+                {
+                    "description": f"Filed by {user.username}",
+                    "requester_name": "Bob B.",
+                    "role": "instructor",
+                    "building_id": building.id,
+                    "created_by": bob.id,
+                },
+                format="json",
+            )
+            self.assertEqual(response.status_code, 201, response.content)
+            created = MaintenanceRequest.objects.get(description=f"Filed by {user.username}")
+            self.assertEqual(created.created_by, owner)
+
+    def test_staff_profile_role_sees_everything(self):
+        staff = User.objects.create_user("tech")
+        staff.staffprofile.role = "Maintenance Staff"
+        staff.staffprofile.save()
+        self.assertEqual(self.list_ids(staff), set(MaintenanceRequest.objects.values_list("id", flat=True)))
+
+        other = User.objects.create_user("guest")
+        other.staffprofile.role = "Volunteer"
+        other.staffprofile.save()
+        self.assertEqual(self.list_ids(other), set())
+
+
+class LinkRequestCreatorsTests(TestCase):
+    """The created_by backfill links unambiguous requester names only"""
+
+    def setUp(self):
+        self.alice = User.objects.create_user("alice")
+        User.objects.create_user("Sam")
+        User.objects.create_user("sam")
+        self.matched = MaintenanceRequest.objects.create(description="1", requester_name=" Alice ")
+        self.ambiguous = MaintenanceRequest.objects.create(description="2", requester_name="SAM")
+        self.unknown = MaintenanceRequest.objects.create(description="3", requester_name="nobody")
+        MaintenanceRequest.objects.update(updated_at=timezone.now() - timedelta(days=1))
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command("link_request_creators", *args, stdout=out)
+        return out.getvalue()
+
+    def test_links_unambiguous_names(self):
+        before = MaintenanceRequest.objects.get(id=self.matched.id).updated_at
+        output = self.run_command()
+        self.assertIn("Linked 1 requests to 1 users; 2 left unlinked", output)
+
+        owners = dict(MaintenanceRequest.objects.values_list("id", "created_by_id"))
+        self.assertEqual(owners[self.matched.id], self.alice.id)
+        self.assertIsNone(owners[self.ambiguous.id])
+        self.assertIsNone(owners[self.unknown.id])
+        # created_by is synced, so the row must move past existing sync tokens
+        self.assertGreater(MaintenanceRequest.objects.get(id=self.matched.id).updated_at, before)
+
+    def test_dry_run_writes_nothing(self):
+        output = self.run_command("--dry-run")
+        self.assertIn("Would link 1 requests", output)
+        self.assertFalse(MaintenanceRequest.objects.filter(created_by__isnull=False).exists())
+
+
+@skipUnless(search.is_available(), "full-text search needs SQLite FTS5")
+class SearchTests(TestCase):
+    """requests/search/ finds, ranks and highlights; writes keep the index current"""
+
+    url = "/api/maintenance/requests/search/"
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("staff", is_staff=True))
+        self.building = Building.objects.create(name="Science Hall")
+
+    def create(self, description, **fields):
+        return MaintenanceRequest.objects.create(
+            description=description, building=self.building, **fields
+        )
+
+    def hits(self, q):
+        response = self.client.get(self.url, {"q": q})
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+    def test_finds_indexed_request_with_highlighted_snippet(self):
+        request = self.create("Water dripping from the ceiling tiles")
+        results = self.hits("drip")
+        self.assertEqual([row["id"] for row in results], [request.id])
+        self.assertIn("<mark>dripping</mark>", results[0]["snippet"])
+        # Building names are indexed too
+        self.assertEqual([row["id"] for row in self.hits("science")], [request.id])
+
+    def test_snippet_is_escaped(self):
+        self.create("Socket <b>sparks</b> when used")
+        snippet = self.hits("sparks")[0]["snippet"]
+        self.assertIn("&lt;b&gt;<mark>sparks</mark>", snippet)
+
+    def test_results_ordered_by_rank(self):
+        weak = self.create("Door squeaks a little, also the window latch is loose and sticky")
+        strong = self.create("Leak leak leak")
+        self.create("Nothing relevant here")
+        weak.description += " and a small leak"
+        weak.save()
+
+        results = self.hits("leak")
+        self.assertEqual([row["id"] for row in results], [strong.id, weak.id])
+        self.assertLessEqual(results[0]["rank"], results[1]["rank"])
+
+    def test_update_delete_and_archive_refresh_index(self):
+        request = self.create("Broken projector")
+        request.description = "Flickering lights"
+        request.save()
+        self.assertEqual(self.hits("projector"), [])
+        self.assertEqual([row["id"] for row in self.hits("flickering")], [request.id])
+
+        request.rejection_reason = "Duplicate ticket"
+        request.status = "rejected"
+        request.save()
+        self.assertEqual([row["id"] for row in self.hits("duplicate")], [request.id])
+
+        MaintenanceRequest.objects.filter(id=request.id).update(
+            status_changed_at=timezone.now() - timedelta(days=400)
+        )
+        archive.archive(archive.cutoff())
+        self.assertEqual(self.hits("flickering"), [])
+
+        other = self.create("Cracked window")
+        other.delete()
+        self.assertEqual(self.hits("cracked"), [])
+
+    def test_query_required(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+
+
+def jpeg_upload(name="photo.jpg", size=(2000, 1000), orientation=None):
+    image = Image.new("RGB", size, "steelblue")
+    buffer = BytesIO()
+    exif = Image.Exif()
+    if orientation:
+        exif[0x0112] = orientation
+    image.save(buffer, "JPEG", exif=exif)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+
+class MediaRootMixin:
+    """Give each test an empty MEDIA_ROOT"""
+
+    def setUp(self):
+        super().setUp()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=media_root, MAINTENANCE_IMAGE_WORKERS=0)
+        media.enable()
+        self.addCleanup(media.disable)
+
+
+class PhotoVariantTests(MediaRootMixin, TestCase):
+    """Thumbnail/medium variants are created, replaced and backfilled"""
+
+    def create(self, photo):
+        with self.captureOnCommitCallbacks(execute=True):
+            request = MaintenanceRequest.objects.create(description="Leak", issue_photo=photo)
+        request.refresh_from_db()
+        return request
+
+    def open_variant(self, request, variant):
+        entry = request.photo_variants["issue_photo"]
+        with request.issue_photo.storage.open(entry[variant]) as file:
+            return Image.open(file).size
+
+    def test_variants_are_generated_and_oriented(self):
+        request = self.create(jpeg_upload(orientation=6))
+        entry = request.photo_variants["issue_photo"]
+        self.assertEqual(entry["state"], "ready")
+        self.assertEqual(entry["source"], request.issue_photo.name)
+        # EXIF orientation 6 rotates the 2000x1000 photo to portrait
+        self.assertEqual(self.open_variant(request, "thumb"), (160, 320))
+        self.assertEqual(self.open_variant(request, "medium"), (640, 1280))
+
+    def test_unreadable_photo_is_marked_failed(self):
+        photo = SimpleUploadedFile("photo.jpg", b"\xff\xd8\xffnot really", content_type="image/jpeg")
+        with self.assertLogs("maintenance.images", "WARNING"):
+            request = self.create(photo)
+        self.assertEqual(
+            request.photo_variants["issue_photo"],
+            {"source": request.issue_photo.name, "state": "failed"},
+        )
+
+    def test_replaced_photo_gets_new_variants(self):
+        request = self.create(jpeg_upload("first.jpg"))
+        storage = request.issue_photo.storage
+        old_thumb = request.photo_variants["issue_photo"]["thumb"]
+
+        request.issue_photo = jpeg_upload("second.jpg", size=(400, 400))
+        with self.captureOnCommitCallbacks(execute=True):
+            request.save()
+        request.refresh_from_db()
+        entry = request.photo_variants["issue_photo"]
+        self.assertEqual(entry["source"], request.issue_photo.name)
+        self.assertFalse(storage.exists(old_thumb))
+        self.assertEqual(self.open_variant(request, "thumb"), (320, 320))
+
+    def test_backfill_command(self):
+        request = self.create(jpeg_upload())
+        MaintenanceRequest.objects.filter(id=request.id).update(photo_variants={})
+        MaintenanceRequest.objects.create(description="No photo")
+
+        out = StringIO()
+        call_command("generate_photo_variants", stdout=out)
+        self.assertIn("Generated variants for 1 requests", out.getvalue())
+        request.refresh_from_db()
+        self.assertEqual(request.photo_variants["issue_photo"]["state"], "ready")
+
+        call_command("generate_photo_variants", stdout=out)
+        self.assertIn("Generated variants for 0 requests", out.getvalue())
+        call_command("generate_photo_variants", "--force", stdout=out)
+        self.assertIn("Generated variants for 1 requests", out.getvalue().splitlines()[-1])
+
+    def test_backfill_retries_failed_and_stalled(self):
+        failed = self.create(jpeg_upload("failed.jpg"))
+        stalled = self.create(jpeg_upload("stalled.jpg"))
+        queued = self.create(jpeg_upload("queued.jpg"))
+        for request, entry in [
+            (failed, {"state": "failed"}),
+            (stalled, {"state": "processing", "queued_at": (timezone.now() - timedelta(hours=1)).isoformat()}),
+            (queued, {"state": "processing", "queued_at": timezone.now().isoformat()}),
+        ]:
+            variants = {"issue_photo": {"source": request.issue_photo.name, **entry}}
+            MaintenanceRequest.objects.filter(id=request.id).update(photo_variants=variants)
+
+        out = StringIO()
+        call_command("generate_photo_variants", stdout=out)
+        self.assertIn("Generated variants for 2 requests", out.getvalue())
+        states = {
+            request.id: request.photo_variants["issue_photo"]["state"]
+            for request in MaintenanceRequest.objects.all()
+        }
+        self.assertEqual(states, {failed.id: "ready", stalled.id: "ready", queued.id: "processing"})
+
+    def test_rolled_back_replacement_keeps_old_variants(self):
+        request = self.create(jpeg_upload("first.jpg"))
+        storage = request.issue_photo.storage
+        old_thumb = request.photo_variants["issue_photo"]["thumb"]
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            with transaction.atomic():
+                request.issue_photo = jpeg_upload("second.jpg")
+                request.save()
+                transaction.set_rollback(True)
+        self.assertEqual(callbacks, [])
+        self.assertTrue(storage.exists(old_thumb))
+        request.refresh_from_db()
+        self.assertEqual(request.photo_variants["issue_photo"]["thumb"], old_thumb)
+
+
+@override_settings(MAINTENANCE_SYNC_WINDOW=0)
+class PhotoUploadTests(MediaRootMixin, TestCase):
+    """Uploads are size/type checked; variants go from processing to ready"""
+
+    url = "/api/maintenance/requests/create/"
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("staff", is_staff=True))
+        self.building = Building.objects.create(name="Annex")
+
+    def upload(self, photo):
+        return self.client.post(self.url, {
+            "description": "Leak",
+            "role": "instructor",
+            "building_id": self.building.id,
+            "issue_photo": photo,
+        }, format="multipart")
+
+    def test_oversize_upload_rejected(self):
+        with override_settings(MAINTENANCE_MAX_PHOTO_SIZE=1024):
+            response = self.upload(jpeg_upload())
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.json()["field"], "issue_photo")
+        self.assertFalse(MaintenanceRequest.objects.exists())
+
+    def test_wrong_type_rejected(self):
+        response = self.upload(SimpleUploadedFile("notes.pdf", b"%PDF-1.4", content_type="application/pdf"))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Unsupported file type", response.json()["error"])
+        self.assertFalse(MaintenanceRequest.objects.exists())
+
+    def test_processing_then_ready_in_list_and_sync(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.upload(jpeg_upload())
+        self.assertEqual(response.status_code, 201, response.content)
+
+        listed = self.client.get("/api/maintenance/requests/").json()["results"][0]
+        self.assertEqual(listed["issue_photo_variants"], {"status": "processing"})
+        synced = self.client.get("/api/maintenance/requests/changes/").json()
+        self.assertEqual(synced["changes"][0]["issue_photo_variants"], {"status": "processing"})
+
+        for callback in callbacks:
+            callback()
+
+        listed = self.client.get("/api/maintenance/requests/").json()["results"][0]
+        self.assertEqual(listed["issue_photo_variants"]["status"], "ready")
+        self.assertIn("thumb", listed["issue_photo_variants"])
+        changes = self.client.get(
+            "/api/maintenance/requests/changes/", {"since": synced["token"]}
+        ).json()["changes"]
+        self.assertEqual([row["id"] for row in changes], [listed["id"]])
+        self.assertEqual(changes[0]["issue_photo_variants"]["status"], "ready")
+
+
+class ExportTests(TestCase):
+    """requests/export/ streams the list's rows as CSV or NDJSON"""
+
+    url = "/api/maintenance/requests/export/"
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("staff", is_staff=True))
+        self.annex = Building.objects.create(name="Annex")
+        self.hall = Building.objects.create(name="Hall")
+        self.first = MaintenanceRequest.objects.create(description="Leak", building=self.annex)
+        self.second = MaintenanceRequest.objects.create(
+            description="=HYPERLINK(\"http://evil\")", requester_name="@sam", building=self.hall
+        )
+
+    def export(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def csv_rows(self, **params):
+        return list(csv.DictReader(StringIO(self.export(format="csv", **params))))
+
+    def test_csv(self):
+        rows = self.csv_rows()
+        self.assertEqual({row["id"] for row in rows}, {str(self.first.id), str(self.second.id)})
+        self.assertEqual(list(rows[0]), [header for header, _value in export.CSV_COLUMNS])
+        escaped = next(row for row in rows if row["id"] == str(self.second.id))
+        self.assertEqual(escaped["description"], "'=HYPERLINK(\"http://evil\")")
+        self.assertEqual(escaped["requester_name"], "'@sam")
+        self.assertEqual(escaped["building"], "Hall")
+
+    def test_escape_round_trip(self):
+        for value in ("=1+1", "+1", "-x", "@me", "\tx", "plain", "'quoted", 5, None):
+            self.assertEqual(export.unescape_cell(export.escape_cell(value)), value)
+
+    def test_ndjson_matches_list(self):
+        lines = self.export(format="ndjson").splitlines()
+        exported = [json.loads(line) for line in lines]
+        listed = self.client.get("/api/maintenance/requests/").json()["results"]
+        self.assertEqual(exported, listed)
+
+    def test_filters_match_list(self):
+        MaintenanceRequest.objects.filter(id=self.first.id).update(
+            respond_by=timezone.now() - timedelta(hours=1)
+        )
+        for params in ({"building": self.hall.id}, {"overdue": "1"}):
+            listed = self.client.get("/api/maintenance/requests/", params).json()["results"]
+            exported = [row["id"] for row in self.csv_rows(**params)]
+            self.assertEqual(exported, [str(row["id"]) for row in listed])
+
+    def test_errors(self):
+        self.assertEqual(self.client.get(self.url, {"format": "xml"}).status_code, 404)
+        response = APIClient().get(self.url, {"format": "csv"})
+        self.assertEqual(response.status_code, 401)
+        self.assertIn("detail", json.loads(response.content))
+
+
+@override_settings(NOTIFICATIONS_DEFERRED=False)
+class ImportTests(TestCase):
+    """import_requests command and requests/import/ endpoint"""
+
+    url = "/api/maintenance/requests/import/"
+
+    def setUp(self):
+        self.admin = User.objects.create_user("admin", is_staff=True)
+        self.sam = User.objects.create_user("Sam")
+        self.building = Building.objects.create(name="Annex")
+        first = Floor.objects.create(building=self.building, number=1, label="First")
+        second = Floor.objects.create(building=self.building, number=2, label="Second")
+        self.lab = Room.objects.create(building=self.building, floor=first, name="Lab")
+        Room.objects.create(building=self.building, floor=second, name="Lab")
+        self.office = Room.objects.create(building=self.building, floor=second, name="Office")
+
+    def write_csv(self, rows):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = f"{directory}/requests.csv"
+        with open(path, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        return path
+
+    def row(self, **fields):
+        return {
+            "description": "Leak", "building": "Annex", "floor": "", "room": "",
+            "status": "completed", "created_by": "",
+            "created_at": "2024-01-02T08:00:00+00:00", "updated_at": "2024-01-05T08:00:00+00:00",
+            **fields,
+        }
+
+    def run_command(self, path, *args):
+        out, err = StringIO(), StringIO()
+        call_command("import_requests", path, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_command_imports_and_reports_row_errors(self):
+        path = self.write_csv([
+            self.row(description="=1+1", room="Office", created_by="Sam"),
+            self.row(room="Lab"),
+            self.row(floor="First", room="Lab"),
+            self.row(created_by="sam"),
+            self.row(building="Nowhere"),
+        ])
+        out, err = self.run_command(path)
+        self.assertIn("Imported 2 requests, skipped 3", out)
+        self.assertIn("line 3: Room 'Lab' is on more than one floor", err)
+        self.assertIn("line 5: Unknown user 'sam'", err)
+        self.assertIn("line 6: Unknown building 'Nowhere'", err)
+
+        office, lab = MaintenanceRequest.objects.order_by("id")
+        self.assertEqual((office.room_id, office.created_by_id), (self.office.id, self.sam.id))
+        self.assertEqual(office.description, "=1+1")
+        self.assertEqual(lab.room_id, self.lab.id)
+        self.assertEqual(office.created_at.isoformat(), "2024-01-02T08:00:00+00:00")
+        self.assertEqual(office.updated_at.isoformat(), "2024-01-05T08:00:00+00:00")
+        self.assertEqual(Notification.objects.filter(user=self.admin).count(), 1)
+
+    def test_one_insert_and_one_update_per_batch(self):
+        path = self.write_csv([self.row(description=f"Issue {n}") for n in range(5)])
+        table = MaintenanceRequest._meta.db_table
+        with CaptureQueriesContext(connection) as queries:
+            self.run_command(path, "--no-notify")
+        writes = [
+            q["sql"].split()[0] for q in queries
+            if q["sql"].startswith((f'INSERT INTO "{table}"', f'UPDATE "{table}"'))
+        ]
+        self.assertEqual(writes, ["INSERT", "UPDATE"])
+        self.assertEqual(MaintenanceRequest.objects.filter(created_at__year=2024).count(), 5)
+
+    def test_impossible_date_is_a_row_error(self):
+        path = self.write_csv([self.row(created_at="2024-02-30T10:00:00"), self.row()])
+        out, err = self.run_command(path)
+        self.assertIn("Imported 1 requests, skipped 1", out)
+        self.assertIn("line 2: Invalid created_at '2024-02-30T10:00:00'", err)
+
+    def test_unreadable_file(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = f"{directory}/requests.csv"
+        with open(path, "wb") as file:
+            file.write("description,building\nCaf\u00e9,Annex\n".encode("latin-1"))
+        with self.assertRaisesMessage(CommandError, "Cannot read"):
+            self.run_command(path)
+
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        # Not UTF-8; a cell over the csv module's field size limit
+        for content in ("Caf\u00e9,Annex\n".encode("latin-1"), b"x" * 200000 + b",Annex\n"):
+            upload = SimpleUploadedFile("requests.csv", b"description,building\n" + content)
+            response = client.post(self.url, {"file": upload}, format="multipart")
+            self.assertEqual(response.status_code, 400)
+            self.assertIn("Cannot read the file", response.json()["error"])
+
+    def test_dry_run(self):
+        out, _err = self.run_command(self.write_csv([self.row()]), "--dry-run")
+        self.assertIn("1 rows valid, 0 invalid", out)
+        self.assertFalse(MaintenanceRequest.objects.exists())
+
+    def test_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        lines = [json.dumps(self.row()), json.dumps(self.row(status="bogus"))]
+        upload = SimpleUploadedFile("requests.jsonl", "\n".join(lines).encode())
+        response = client.post(self.url, {"file": upload}, format="multipart")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {
+            "created": 1,
+            "dry_run": False,
+            "error_count": 1,
+            "errors": [{"line": 2, "error": "Invalid status 'bogus'"}],
+        })
+
+        self.assertEqual(client.post(self.url, {}, format="multipart").status_code, 400)
+        upload = SimpleUploadedFile("requests.txt", b"")
+        response = client.post(self.url, {"file": upload, "format": "xml"}, format="multipart")
+        self.assertEqual(response.status_code, 400)
+
+        student = APIClient()
+        student.force_authenticate(User.objects.create_user("student"))
+        upload = SimpleUploadedFile("requests.jsonl", lines[0].encode())
+        self.assertEqual(student.post(self.url, {"file": upload}, format="multipart").status_code, 403)
+
+
+@override_settings(NOTIFICATIONS_DEFERRED=False)
+class ScanOverdueTests(TestCase):
+    """scan_overdue_requests escalates each missed deadline once, in batches"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser("admin", "admin@example.com", "pass")
+        self.bob = User.objects.create_user("bob")
+        past = timezone.now() - timedelta(hours=1)
+        future = timezone.now() + timedelta(hours=1)
+        self.late_pickup = MaintenanceRequest.objects.create(description="Leak", assigned_to=self.bob)
+        self.late_both = MaintenanceRequest.objects.create(description="Lamp")
+        self.late_third = MaintenanceRequest.objects.create(description="Tap")
+        self.on_time = MaintenanceRequest.objects.create(description="Door")
+        MaintenanceRequest.objects.filter(id__in=[self.late_pickup.id, self.late_third.id]).update(
+            respond_by=past, resolve_by=future
+        )
+        MaintenanceRequest.objects.filter(id=self.late_both.id).update(respond_by=past, resolve_by=past)
+        MaintenanceRequest.objects.filter(id=self.on_time.id).update(respond_by=future, resolve_by=future)
+
+    def scan(self, *args):
+        out = StringIO()
+        call_command("scan_overdue_requests", *args, stdout=out)
+        return out.getvalue()
+
+    def overdue_messages(self, user):
+        return sorted(
+            Notification.objects.filter(user=user, message__contains="overdue").values_list("message", flat=True)
+        )
+
+    def test_escalates_each_breach_once(self):
+        out = self.scan()
+        self.assertIn("Escalated 3 missed 'respond' deadlines", out)
+        self.assertIn("Escalated 1 missed 'resolve' deadlines", out)
+        self.assertEqual(self.overdue_messages(self.bob), [
+            f"Request #{self.late_pickup.id} is overdue: it was not picked up within its SLA.",
+        ])
+        self.assertEqual(len(self.overdue_messages(self.admin)), 4)
+        self.assertIn(
+            f"Request #{self.late_both.id} is overdue: it was not resolved within its SLA.",
+            self.overdue_messages(self.admin),
+        )
+
+        breached = MaintenanceRequest.objects.filter(respond_breached_at__isnull=False)
+        self.assertEqual(
+            set(breached.values_list("id", flat=True)),
+            {self.late_pickup.id, self.late_both.id, self.late_third.id},
+        )
+        self.assertEqual(
+            list(MaintenanceRequest.objects.filter(resolve_breached_at__isnull=False).values_list("id", flat=True)),
+            [self.late_both.id],
+        )
+
+        out = self.scan()
+        self.assertIn("Escalated 0 missed 'respond' deadlines", out)
+        self.assertIn("Escalated 0 missed 'resolve' deadlines", out)
+        self.assertEqual(len(self.overdue_messages(self.admin)), 4)
+
+    def test_batches(self):
+        command = "maintenance.management.commands.scan_overdue_requests.notify_sla_breaches"
+        with mock.patch(command, wraps=notify_sla_breaches) as notify:
+            self.scan("--batch-size", "2")
+        self.assertEqual(
+            [[kind for _request, kind in call.args[0]] for call in notify.call_args_list],
+            [["respond", "respond"], ["respond"], ["resolve"]],
+        )
+        self.assertEqual(len(self.overdue_messages(self.admin)), 4)
+
+
+@override_settings(NOTIFICATIONS_DEFERRED=False)
+class ArchiveTests(TestCase):
+    """archive_requests moves closed requests and what hangs off them to the cold tables"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser("admin", "admin@example.com", "pass")
+        self.alice = User.objects.create_user("alice")
+        self.bob = User.objects.create_user("bob")
+        self.closed = MaintenanceRequest.objects.create(description="Leak", created_by=self.alice)
+        MaintenanceSchedule.objects.create(request=self.closed, schedule_date=date.today(), assigned_staff=self.bob)
+        notify_user(self.alice, "Your request is done", self.closed)
+        self.closed.status = "completed"
+        self.closed.save()
+        self.other = MaintenanceRequest.objects.create(description="Lamp", created_by=self.bob, status="rejected")
+        self.open = MaintenanceRequest.objects.create(description="Door", created_by=self.alice)
+        self.before = timezone.now() + timedelta(seconds=1)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def list_ids(self, user, url):
+        response = self.client_for(user).get(url)
+        self.assertEqual(response.status_code, 200)
+        return {row["id"] for row in response.json()["results"]}
+
+    def test_moves_request_with_its_rows(self):
+        notifications = set(
+            Notification.objects.filter(maintenance_request=self.closed).values_list("id", flat=True)
+        )
+        alice_unread = counters.unread(self.alice.id)
+        moved_unread = Notification.objects.filter(
+            maintenance_request__in=[self.closed, self.other], user=self.alice, is_read=False
+        ).count()
+        self.assertGreater(moved_unread, 0)
+
+        self.assertEqual(archive.archive(self.before), 2)
+
+        self.assertEqual(set(MaintenanceRequest.objects.values_list("id", flat=True)), {self.open.id})
+        archived = ArchivedRequest.objects.get(id=self.closed.id)
+        self.assertEqual((archived.status, archived.created_by_id), ("completed", self.alice.id))
+        self.assertEqual([event["to"] for event in archived.status_history], ["pending", "completed"])
+        self.assertFalse(RequestStatusEvent.objects.filter(request_id=self.closed.id).exists())
+        self.assertEqual(archived.schedule.assigned_staff, self.bob)
+        self.assertFalse(MaintenanceSchedule.objects.exists())
+        self.assertEqual(
+            set(ArchivedNotification.objects.filter(maintenance_request=archived).values_list("id", flat=True)),
+            notifications,
+        )
+        self.assertFalse(Notification.objects.filter(id__in=notifications).exists())
+        self.assertEqual(counters.unread(self.alice.id), alice_unread - moved_unread)
+        self.assertEqual(
+            set(RequestTombstone.objects.values_list("request_id", flat=True)), {self.closed.id, self.other.id}
+        )
+
+    def test_request_reopened_during_run_stays_hot(self):
+        ids = list(archive.due(self.before).values_list("id", flat=True))
+        self.closed.status = "in_progress"
+        self.closed.save()
+
+        self.assertEqual(archive.archive_batch(ids, self.before), 1)
+        self.assertTrue(MaintenanceRequest.objects.filter(id=self.closed.id).exists())
+        self.assertEqual(set(ArchivedRequest.objects.values_list("id", flat=True)), {self.other.id})
+        self.assertTrue(MaintenanceSchedule.objects.filter(request_id=self.closed.id).exists())
+        self.assertTrue(Notification.objects.filter(maintenance_request_id=self.closed.id).exists())
+        self.assertEqual(list(RequestTombstone.objects.values_list("request_id", flat=True)), [self.other.id])
+
+    def test_archive_views_are_scoped_to_owner(self):
+        archive.archive(self.before)
+        url = "/api/maintenance/archive/requests/"
+        self.assertEqual(self.list_ids(self.alice, url), {self.closed.id})
+        self.assertEqual(self.list_ids(self.bob, url), {self.other.id})
+        self.assertEqual(self.list_ids(self.admin, url), {self.closed.id, self.other.id})
+
+        response = self.client_for(self.alice).get(f"{url}{self.closed.id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["schedule"]["assigned_staff"], self.bob.id)
+        self.assertEqual(len(response.json()["request"]["status_history"]), 2)
+        self.assertEqual(self.client_for(self.alice).get(f"{url}{self.other.id}/").status_code, 404)
+        self.assertEqual(self.client_for(self.admin).get(f"{url}{self.other.id}/").status_code, 200)
+
+        url = "/api/notifications/my/archived/"
+        mine = set(ArchivedNotification.objects.filter(user=self.alice).values_list("id", flat=True))
+        self.assertTrue(mine)
+        self.assertEqual(self.list_ids(self.alice, url), mine)
+        self.assertEqual(
+            self.list_ids(self.admin, url),
+            set(ArchivedNotification.objects.filter(user=self.admin).values_list("id", flat=True)),
+        )
+        self.assertFalse(self.list_ids(self.admin, url) & mine)
+
+
+class SaveSignalTests(TestCase):
+    """prepare_request_save: stats key, transition timestamps and deadlines in one pass"""
+
+    def setUp(self):
+        self.request = MaintenanceRequest.objects.create(description="Leak")
+
+    def reload(self):
+        return MaintenanceRequest.objects.get(id=self.request.id)
+
+    def test_response_settles_respond_deadline(self):
+        self.assertIsNotNone(self.request.respond_by)
+        request = self.reload()
+        request.status = "in_progress"
+        request.save()
+
+        request = self.reload()
+        self.assertIsNotNone(request.responded_at)
+        # Settled from the responded_at set earlier in the same receiver
+        self.assertIsNone(request.respond_by)
+        self.assertIsNotNone(request.resolve_by)
+        self.assertEqual(
+            list(request.status_events.values_list("from_status", "to_status")),
+            [("", "pending"), ("pending", "in_progress")],
+        )
+        self.assertEqual(
+            RequestDailyStat.objects.filter(status="in_progress").aggregate(n=Count("id"))["n"], 1
+        )
+
+    def test_reopen_recomputes_deadlines(self):
+        request = self.reload()
+        request.status = "completed"
+        request.save()
+        self.assertIsNone(self.reload().resolve_by)
+
+        request = self.reload()
+        request.status = "in_progress"
+        request.save()
+        request = self.reload()
+        self.assertIsNone(request.completed_at)
+        self.assertIsNotNone(request.resolve_by)
+        self.assertIsNone(request.respond_by)
+
+    @override_settings(MAINTENANCE_SLA_TARGETS={
+        "default": {"respond": 24, "resolve": 120},
+        "restroom": {"respond": 4, "resolve": 24},
+    })
+    def test_room_change_recomputes_deadlines(self):
+        building = Building.objects.create(name="Annex")
+        floor = Floor.objects.create(building=building, number=1)
+        room = Room.objects.create(building=building, floor=floor, name="WC", room_type="restroom")
+        request = self.reload()
+        request.room = room
+        request.save()
+        request = self.reload()
+        self.assertEqual(request.respond_by, request.created_at + timedelta(hours=4))
+        self.assertEqual(request.resolve_by, request.created_at + timedelta(hours=24))
+
+
+class MigrationTests(TransactionTestCase):
+    """Data migrations backfill from historical models without side effects"""
+
+    def migrate(self, *targets):
+        """Migrate to ``targets`` and return the historical apps there"""
+        executor = MigrationExecutor(connection)
+        executor.migrate(list(targets))
+        return executor.loader.project_state(list(targets)).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_sla_backfill_leaves_updated_at_alone(self):
+        apps = self.migrate(("maintenance", "0018_requeststatusevent"))
+        Request = apps.get_model("maintenance", "MaintenanceRequest")
+        Building = apps.get_model("buildings", "Building")
+        Floor = apps.get_model("buildings", "Floor")
+        Room = apps.get_model("buildings", "Room")
+        building = Building.objects.create(name="Annex")
+        floor = Floor.objects.create(building=building, number=1)
+        room = Room.objects.create(building=building, floor=floor, name="WC", room_type="restroom")
+        pending = Request.objects.create(description="Leak", role="staff", room=room)
+        closed = Request.objects.create(description="Done", role="staff", status="completed")
+        updated_at = dict(Request.objects.values_list("id", "updated_at"))
+
+        self.migrate(("maintenance", "0019_sla_deadlines"))
+        rows = {row.id: row for row in MaintenanceRequest.objects.all()}
+        self.assertEqual({pk: row.updated_at for pk, row in rows.items()}, updated_at)
+        target = settings.MAINTENANCE_SLA_TARGETS["restroom"]
+        self.assertEqual(rows[pending.id].respond_by, pending.created_at + timedelta(hours=target["respond"]))
+        self.assertEqual(rows[pending.id].resolve_by, pending.created_at + timedelta(hours=target["resolve"]))
+        self.assertIsNone(rows[closed.id].resolve_by)
+
+    def test_daily_stats_backfilled(self):
+        apps = self.migrate(
+            ("maintenance", "0012_alter_maintenancerequest_assigned_to_and_more"),
+            ("buildings", "0003_alter_building_options_alter_floor_options_and_more"),
+        )
+        Request = apps.get_model("maintenance", "MaintenanceRequest")
+        building = apps.get_model("buildings", "Building").objects.create(name="Annex")
+        for status in ("pending", "pending", "completed"):
+            Request.objects.create(description="Leak", role="staff", status=status, building=building)
+        Request.objects.create(description="Nowhere", role="staff")
+
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+        backfilled = set(RequestDailyStat.objects.values_list("day", "building", "floor", "status", "created", "entered"))
+        self.assertEqual(
+            {(row[1], row[3], row[4], row[5]) for row in backfilled},
+            {(building.id, "pending", 2, 2), (building.id, "completed", 1, 1), (None, "pending", 1, 1)},
+        )
+        stats.rebuild()
+        rebuilt = set(RequestDailyStat.objects.values_list("day", "building", "floor", "status", "created", "entered"))
+        self.assertEqual(backfilled, rebuilt)
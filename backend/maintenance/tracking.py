@@ -0,0 +1,125 @@
+"""
+Field-level change tracking for models
+
+An instance loaded from the database remembers the values its concrete
+fields were loaded with, so save() hooks can compare old and new values
+without fetching the row again, and callers can write only what changed:
+
+    maintenance = MaintenanceRequest.objects.get(id=pk)
+    maintenance.status = "approved"
+    maintenance.changed_fields()    # ["status"]
+    maintenance.save_changes()      # UPDATE ... SET status, updated_at, ...
+
+The snapshot is retaken after every save() and refresh_from_db(). Deferred
+fields (only()/defer()) are not tracked; ``previous_values`` falls back to
+one query for those.
+"""
+
+import copy
+
+from django.db import models
+
+
+def _comparable(field, value):
+    """Value as stored, so e.g. a FieldFile compares by its name"""
+    if isinstance(field, models.FileField):
+        return getattr(value, "name", value) or ""
+    if isinstance(value, (dict, list)):
+        return copy.deepcopy(value)
+    return value
+
+
+class ChangeTrackingMixin:
+    """Mix into a Model to track changes to its concrete fields"""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.take_snapshot()
+        return instance
+
+    def take_snapshot(self, fields=None):
+        """
+        Treat the current field values as the saved ones
+
+        Args:
+            fields (iterable, optional): Only these field names/attnames
+                (after a save with update_fields or a partial refresh)
+        """
+        deferred = self.get_deferred_fields()
+        loaded = {} if fields is None else getattr(self, "_loaded_values", None)
+        if loaded is None:
+            return
+        for field in self._meta.concrete_fields:
+            if fields is not None and field.name not in fields and field.attname not in fields:
+                continue
+            if field.attname not in deferred:
+                loaded[field.attname] = _comparable(field, getattr(self, field.attname))
+        self._loaded_values = loaded
+
+    def changed_fields(self):
+        """Names of the tracked fields whose value differs from the snapshot"""
+        loaded = getattr(self, "_loaded_values", None)
+        if loaded is None:
+            return None
+        return [
+            field.name
+            for field in self._meta.concrete_fields
+            if field.attname in loaded
+            and not field.primary_key
+            and _comparable(field, getattr(self, field.attname)) != loaded[field.attname]
+        ]
+
+    def has_changed(self, *attnames):
+        """Whether any of ``attnames`` changed; True when not tracked"""
+        loaded = getattr(self, "_loaded_values", None)
+        if loaded is None:
+            return True
+        fields = {field.attname: field for field in self._meta.concrete_fields}
+        return any(
+            attname not in loaded
+            or _comparable(fields[attname], getattr(self, attname)) != loaded[attname]
+            for attname in attnames
+        )
+
+    def previous_values(self, attnames):
+        """
+        Saved values of ``attnames`` (e.g. in a pre_save receiver)
+
+        Comes from the snapshot when the instance was loaded with all of
+        them; otherwise costs one query.
+
+        Returns:
+            dict or None: None when the row doesn't exist yet
+        """
+        if self._state.adding or self.pk is None:
+            return None
+        loaded = getattr(self, "_loaded_values", None)
+        if loaded is not None and all(attname in loaded for attname in attnames):
+            return {attname: loaded[attname] for attname in attnames}
+        return type(self)._base_manager.filter(pk=self.pk).values(*attnames).first()
+
+    def save_changes(self, **kwargs):
+        """
+        save() only the changed fields; a full save() if not tracked
+
+        Returns:
+            bool: False when nothing changed and nothing was written
+        """
+        fields = self.changed_fields()
+        if fields is None or self._state.adding:
+            self.save(**kwargs)
+            return True
+        if not fields:
+            return False
+        self.save(update_fields=fields, **kwargs)
+        return True
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        self.take_snapshot(None if update_fields is None else set(update_fields))
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using=using, fields=fields, **kwargs)
+        self.take_snapshot(None if fields is None else set(fields))
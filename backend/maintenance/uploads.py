@@ -0,0 +1,86 @@
+"""
+Streaming, size/type-limited photo uploads
+
+Views using PhotoUploadMixin swap Django's upload handlers for
+PhotoUploadHandler, which writes every file straight to a temporary file on
+disk and drops it as soon as it passes MAINTENANCE_MAX_PHOTO_SIZE or
+announces a content type that isn't an image we accept. The request thread
+never holds a whole photo in memory and never decodes it; decoding happens
+in the background (see maintenance/images.py).
+"""
+
+from django.conf import settings
+from django.core.files.uploadhandler import SkipFile, TemporaryFileUploadHandler
+from rest_framework import serializers
+from rest_framework.response import Response
+
+# content type: leading bytes that identify the format
+PHOTO_SIGNATURES = {
+    "image/jpeg": (b"\xff\xd8\xff",),
+    "image/png": (b"\x89PNG\r\n\x1a\n",),
+    "image/gif": (b"GIF87a", b"GIF89a"),
+    "image/webp": (b"RIFF",),
+}
+
+
+def max_photo_size():
+    return settings.MAINTENANCE_MAX_PHOTO_SIZE
+
+
+class PhotoUploadHandler(TemporaryFileUploadHandler):
+    """Stream uploads to disk, rejecting oversized or non-image files early"""
+
+    def new_file(self, field_name, file_name, content_type, *args, **kwargs):
+        self.received = 0
+        # Forget the previous (completed) file so a SkipFile for this one
+        # doesn't make the parser close it
+        self.__dict__.pop("file", None)
+        if content_type not in PHOTO_SIGNATURES:
+            self.reject(field_name, f"Unsupported file type. Allowed: {', '.join(PHOTO_SIGNATURES)}", 400)
+        super().new_file(field_name, file_name, content_type, *args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > max_photo_size():
+            self.reject(self.field_name, f"File too large. Maximum size is {max_photo_size() // (1024 * 1024)} MB", 413)
+        return super().receive_data_chunk(raw_data, start)
+
+    def reject(self, field_name, message, status):
+        rejected = getattr(self.request, "rejected_uploads", {})
+        rejected[field_name] = (message, status)
+        self.request.rejected_uploads = rejected
+        raise SkipFile()
+
+
+class PhotoUploadMixin:
+    """
+    For APIViews that accept photos: install PhotoUploadHandler and turn any
+    upload it dropped into an error response via ``rejected_upload_response``
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        request._request.upload_handlers = [PhotoUploadHandler(request._request)]
+
+    def rejected_upload_response(self, request):
+        """Parse the body and return an error Response if a file was dropped"""
+        request.data
+        rejected = getattr(request._request, "rejected_uploads", None)
+        if not rejected:
+            return None
+        field, (message, status) = next(iter(rejected.items()))
+        return Response({"error": message, "field": field}, status=status)
+
+
+def validate_photo(file):
+    """Cheap check that the upload starts like the image type it claims to be"""
+    if file.size > max_photo_size():
+        raise serializers.ValidationError("File too large.")
+    signatures = PHOTO_SIGNATURES.get(getattr(file, "content_type", None), ())
+    file.seek(0)
+    head = file.read(16)
+    file.seek(0)
+    if not any(head.startswith(signature) for signature in signatures):
+        raise serializers.ValidationError("Upload a valid image. The file is not a supported image type.")
+    if signatures == PHOTO_SIGNATURES["image/webp"] and head[8:12] != b"WEBP":
+        raise serializers.ValidationError("Upload a valid image. The file is not a supported image type.")
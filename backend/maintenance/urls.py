@@ -3,17 +3,39 @@ from django.urls import path
 from .views import (
     CreateRequestView,
     ListRequestsView,
+    ExportRequestsView,
+    ImportRequestsView,
+    ListUserRequestsView,
+    RequestChangesView,
+    SearchRequestsView,
+    ArchivedRequestsView,
+    ArchivedRequestDetailView,
     ClaimRequestView,
     CompleteRequestView,
     UpdateStatusView,
     ApproveRejectRequestView,  # ✅ NEW
+    BulkUpdateRequestsView,
+    MaintenanceDetailView,
+    AnalyticsView,
+    DailyStatsView,
 )
 
 urlpatterns = [
     path("requests/", ListRequestsView.as_view(), name="list_requests"),
+    path("requests/export/", ExportRequestsView.as_view(), name="export_requests"),
+    path("requests/import/", ImportRequestsView.as_view(), name="import_requests"),
+    path("requests/changes/", RequestChangesView.as_view(), name="request_changes"),
+    path("requests/bulk/", BulkUpdateRequestsView.as_view(), name="bulk_update_requests"),
+    path("requests/search/", SearchRequestsView.as_view(), name="search_requests"),
+    path("requests/mine/", ListUserRequestsView.as_view(), name="list_user_requests"),
     path("requests/create/", CreateRequestView.as_view(), name="create_request"),
     path("requests/<int:pk>/claim/", ClaimRequestView.as_view(), name="claim_request"),
     path("requests/<int:pk>/complete/", CompleteRequestView.as_view(), name="complete_request"),
     path("requests/<int:pk>/update-status/", UpdateStatusView.as_view(), name="update_status"),
+    path("requests/<int:pk>/detail/", MaintenanceDetailView.as_view(), name="request_detail"),
+    path("archive/requests/", ArchivedRequestsView.as_view(), name="archived_requests"),
+    path("archive/requests/<int:pk>/", ArchivedRequestDetailView.as_view(), name="archived_request_detail"),
+    path("analytics/", AnalyticsView.as_view(), name="analytics"),
+    path("stats/daily/", DailyStatsView.as_view(), name="daily_stats"),
     path("requests/<int:pk>/", ApproveRejectRequestView.as_view(), name="approve_reject_request"),  # ✅ NEW - PATCH endpoint
 ]
\ No newline at end of file
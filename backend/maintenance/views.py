@@ -1,36 +1,77 @@
 # maintenance/views.py
+import csv
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from rest_framework import generics, permissions, viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from accounts.models import User
+from api.conditional import ConditionalListMixin
+from notifications.helpers import notify_bulk_request_updates
 
-from .models import MaintenanceRequest
+from .analytics import DEFAULT_WINDOW_DAYS, build_analytics, daily_series
+from . import history, search, sla, stats
+from .models import ArchivedRequest, MaintenanceRequest
+from .export import CSVRenderer, NDJSONRenderer, export_response
+from .importer import IMPORT_FORMATS, guess_format, import_requests, notify_import_summary, read_rows
+from .pagination import RequestListPagination
+from .rows import REQUEST_VALUES, request_rows
+from .sync import changes_since
+from .uploads import PhotoUploadMixin
 from .serializers import (
+    ArchivedRequestSerializer,
     MaintenanceRequestSerializer,
+    MaintenanceRequestListSerializer,
     ClaimRequestSerializer,
     CompleteRequestSerializer,
 )
 
 
+# Anything that changes a rendered request row also changes one of these
+REQUEST_LIST_VERSION = {
+    "count": Count("id"),
+    "updated": Max("updated_at"),
+    "building": Max("building__updated_at"),
+    "floor": Max("floor__updated_at"),
+    "room": Max("room__updated_at"),
+}
+
+
 # Anyone can submit
-class CreateRequestView(generics.CreateAPIView):
+class CreateRequestView(PhotoUploadMixin, generics.CreateAPIView):
     queryset = MaintenanceRequest.objects.all()
     serializer_class = MaintenanceRequestSerializer
-    
+
+    def create(self, request, *args, **kwargs):
+        rejected = self.rejected_upload_response(request)
+        if rejected is not None:
+            return rejected
+        return super().create(request, *args, **kwargs)
+
     def perform_create(self, serializer):
-        # Log the incoming data for debugging
-        print("Creating maintenance request with data:", self.request.data)
-        serializer.save()
+        # Ownership is tracked by created_by: the caller, unless an admin
+        # files the request for someone else (read-only for everyone else)
+        created_by = serializer.validated_data.get('created_by') or self.request.user
+        serializer.save(created_by=created_by)
 
 
 # Staff + admin can see all
-class ListRequestsView(generics.ListAPIView):
-    serializer_class = MaintenanceRequestSerializer
+class ListRequestsView(ConditionalListMixin, generics.ListAPIView):
+    serializer_class = MaintenanceRequestListSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = RequestListPagination
+    version_aggregates = REQUEST_LIST_VERSION
 
     def get_queryset(self):
-        queryset = MaintenanceRequest.objects.all().order_by("-created_at")
+        queryset = MaintenanceRequest.objects.select_related(
+            'building', 'floor', 'room', 'assigned_to'
+        ).order_by("-created_at", "-id")
         
         # ✅ Filter by room if provided
         room_id = self.request.query_params.get('room', None)
@@ -46,36 +87,188 @@ class ListRequestsView(generics.ListAPIView):
         floor_id = self.request.query_params.get('floor', None)
         if floor_id:
             queryset = queryset.filter(floor_id=floor_id)
+
+        # Requests past an SLA deadline right now (indexed range on respond_by/resolve_by)
+        if self.request.query_params.get('overdue') in ('1', 'true'):
+            now = timezone.now()
+            queryset = queryset.filter(Q(respond_by__lt=now) | Q(resolve_by__lt=now))
         
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        # Sparse fieldsets need the serializer; everything else takes the
+        # values() fast path, which renders the same JSON
+        if 'fields' in request.query_params or 'expand' in request.query_params:
+            return super().list(request, *args, **kwargs)
 
-class ListUserRequestsView(generics.ListAPIView):
-    serializer_class = MaintenanceRequestSerializer
+        queryset = self.filter_queryset(self.get_queryset()).values(*REQUEST_VALUES)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(request_rows(page, request))
+        return Response(request_rows(queryset, request))
+
+
+
+class ExportRequestsView(ListRequestsView):
+    """
+    Stream every request matching the ListRequestsView filters as a file
+
+    ``?format=csv`` (default) or ``?format=ndjson``; other formats get a
+    404 from content negotiation. Not paginated.
+    """
+    renderer_classes = [CSVRenderer, NDJSONRenderer]
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        return export_response(queryset, request.accepted_renderer.format, request)
+
+def sees_all_requests(user):
+    """
+    Admins and staff see every request; everyone else only their own
+
+    ``user.staffprofile`` is loaded together with the user by
+    StaffProfileJWTAuthentication, so this costs no query.
+    """
+    if user.is_superuser or user.is_staff:
+        return True
+    profile = getattr(user, 'staffprofile', None)
+    if profile is None:
+        return False
+    role = (profile.role or '').lower()
+    return 'staff' in role or role == 'admin' or role == 'administrator'
+
+
+class ListUserRequestsView(ConditionalListMixin, generics.ListAPIView):
+    serializer_class = MaintenanceRequestListSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = RequestListPagination
+    version_aggregates = REQUEST_LIST_VERSION
     
     def get_queryset(self):
-        user = self.request.user
-        
-        # Try to get role from staff_profile or check if superuser
-        try:
-            # Check if user is superuser (admin)
-            if user.is_superuser or user.is_staff:
-                return MaintenanceRequest.objects.all().order_by("-created_at")
-            
-            # Check if user has staff_profile
-            if hasattr(user, 'staff_profile'):
-                role = user.staff_profile.role.lower()
-                # Staff and maintenance staff see all requests
-                if 'staff' in role or role == 'admin' or role == 'administrator':
-                    return MaintenanceRequest.objects.all().order_by("-created_at")
-        except AttributeError:
-            pass  # User doesn't have staff_profile, treat as regular user
-        
+        queryset = MaintenanceRequest.objects.select_related(
+            'building', 'floor', 'room', 'assigned_to'
+        ).order_by("-created_at", "-id")
+        if sees_all_requests(self.request.user):
+            return queryset
+
         # Regular users see only their own requests
-        return MaintenanceRequest.objects.filter(
-            requester_name__iexact=user.username
-        ).order_by("-created_at")
+        return queryset.filter(created_by=self.request.user)
+
+
+class ArchivedRequestsView(generics.ListAPIView):
+    """
+    Read-only list of archived requests (see maintenance/archive.py)
+
+    Same scoping as requests/mine/ and the same pagination as requests/;
+    filter with ``?building=`` and ``?status=``.
+    """
+    serializer_class = ArchivedRequestSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = RequestListPagination
+
+    def get_queryset(self):
+        queryset = ArchivedRequest.objects.select_related(
+            'building', 'floor', 'room', 'assigned_to'
+        ).order_by("-created_at", "-id")
+        if not sees_all_requests(self.request.user):
+            queryset = queryset.filter(created_by=self.request.user)
+
+        building_id = self.request.query_params.get('building')
+        if building_id:
+            queryset = queryset.filter(building_id=building_id)
+        status_filter = self.request.query_params.get('status')
+        if status_filter:
+            queryset = queryset.filter(status=status_filter)
+        return queryset
+
+
+class ArchivedRequestDetailView(APIView):
+    """One archived request with its status history and schedule"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk):
+        queryset = ArchivedRequest.objects.select_related(
+            'building', 'floor', 'room', 'assigned_to', 'schedule', 'schedule__assigned_staff'
+        )
+        if not sees_all_requests(request.user):
+            queryset = queryset.filter(created_by=request.user)
+        try:
+            archived = queryset.get(id=pk)
+        except ArchivedRequest.DoesNotExist:
+            return Response({"error": "Archived request not found"}, status=404)
+
+        schedule = None
+        if hasattr(archived, 'schedule'):
+            from calendar_system.serializers import ArchivedScheduleSerializer
+            schedule = ArchivedScheduleSerializer(archived.schedule).data
+
+        return Response({
+            "request": ArchivedRequestSerializer(archived, history=True, context={"request": request}).data,
+            "schedule": schedule,
+        })
+
+
+class SearchRequestsView(APIView):
+    """
+    Full-text search: ``?q=<words>&limit=&offset=``
+
+    Results are ranked by BM25 (best first). Each carries the usual request
+    fields plus ``rank`` and an HTML ``snippet`` with matches in <mark>.
+    Regular users only search their own requests, as in requests/mine/.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        if not search.is_available():
+            return Response({"error": "Full-text search requires SQLite FTS5"}, status=501)
+
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"error": "q is required"}, status=400)
+        try:
+            limit = int(request.query_params.get('limit', 20))
+            offset = max(0, int(request.query_params.get('offset', 0)))
+        except ValueError:
+            return Response({"error": "limit and offset must be numbers"}, status=400)
+        limit = max(1, min(limit, settings.MAINTENANCE_MAX_PAGE_SIZE))
+
+        created_by = None if sees_all_requests(request.user) else request.user.id
+        hits = search.search(query, limit=limit + 1, offset=offset, created_by=created_by)
+        has_more = len(hits) > limit
+        hits = hits[:limit]
+
+        found = MaintenanceRequest.objects.filter(id__in=[pk for pk, _rank, _snippet in hits])
+        rows = {row["id"]: row for row in request_rows(found, request)}
+        results = []
+        for pk, rank, snippet in hits:
+            if pk in rows:
+                results.append({**rows[pk], "rank": rank, "snippet": snippet})
+
+        return Response({"results": results, "has_more": has_more})
+
+
+class RequestChangesView(APIView):
+    """
+    Delta sync: requests created/updated and ids deleted since ``?since=<token>``
+
+    Omit ``since`` for a full sync. Keep calling with the returned token while
+    ``has_more`` is true. Recent changes can be sent more than once (see
+    maintenance/sync.py); apply them by id.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        try:
+            limit = int(request.query_params.get('limit', 100))
+        except ValueError:
+            return Response({"error": "limit must be a number"}, status=400)
+        limit = max(1, min(limit, settings.MAINTENANCE_MAX_PAGE_SIZE))
+
+        return Response(changes_since(
+            token=request.query_params.get('since'),
+            limit=limit,
+            request=request,
+        ))
 
 
 # ✅ NEW: Approve/Reject endpoint
@@ -127,50 +320,282 @@ class ApproveRejectRequestView(APIView):
                 except (ValueError, User.DoesNotExist):
                     return Response({"error": "Invalid user ID"}, status=400)
         
-        maintenance.save()
+        maintenance._actor_id = request.user.id
+        maintenance.save_changes()
         
         serializer = MaintenanceRequestSerializer(maintenance)
         return Response(serializer.data)
 
 
+class BulkUpdateRequestsView(APIView):
+    """
+    Approve, reject or assign many maintenance requests at once
+
+    Takes ``ids`` plus the same ``status``, ``rejection_reason`` and
+    ``assigned_to`` fields as ApproveRejectRequestView. All rows are written
+    in one transaction with bulk_update, the daily stats and notifications
+    the model signals would have produced are applied in batches, and the
+    response reports the outcome per id.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    max_ids = 500
+
+    def post(self, request):
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not ids:
+            return Response({"error": "ids must be a non-empty list"}, status=400)
+        if len(ids) > self.max_ids:
+            return Response({"error": f"At most {self.max_ids} requests can be updated at once"}, status=400)
+        try:
+            ids = list(dict.fromkeys(int(pk) for pk in ids))
+        except (TypeError, ValueError):
+            return Response({"error": "ids must be integers"}, status=400)
+
+        new_status = request.data.get('status')
+        rejection_reason = request.data.get('rejection_reason', '')
+
+        valid_statuses = ['pending', 'approved', 'rejected', 'in_progress', 'completed']
+        if new_status not in valid_statuses:
+            return Response(
+                {"error": f"Invalid status. Must be one of: {', '.join(valid_statuses)}"},
+                status=400
+            )
+        if new_status == 'rejected' and not (rejection_reason and rejection_reason.strip()):
+            return Response(
+                {"error": "Rejection reason is required when rejecting a request"},
+                status=400
+            )
+
+        fields = ['status', 'updated_at', *history.TRANSITION_FIELDS, *sla.SLA_FIELDS]
+        if new_status == 'rejected':
+            fields.append('rejection_reason')
+
+        assigned_to = request.data.get('assigned_to')
+        assignee = None
+        if assigned_to is not None:  # Check for None to allow empty string
+            fields.append('assigned_to')
+            if assigned_to != '':
+                try:
+                    assignee = User.objects.get(id=int(assigned_to))
+                except (ValueError, User.DoesNotExist):
+                    return Response({"error": "Invalid user ID"}, status=400)
+
+        now = timezone.now()
+        changes = []
+        events = []
+        results = []
+        with transaction.atomic():
+            found = MaintenanceRequest.objects.select_for_update().in_bulk(ids)
+            room_types = sla.room_types(m.room_id for m in found.values())
+            for pk in ids:
+                maintenance = found.get(pk)
+                if maintenance is None:
+                    results.append({"id": pk, "ok": False, "error": "Request not found"})
+                    continue
+
+                old = {
+                    "status": maintenance.status,
+                    "building_id": maintenance.building_id,
+                    "floor_id": maintenance.floor_id,
+                    "room_id": maintenance.room_id,
+                    "assigned_to_id": maintenance.assigned_to_id,
+                }
+                maintenance.status = new_status
+                if new_status == 'rejected':
+                    maintenance.rejection_reason = rejection_reason
+                if assigned_to is not None:
+                    maintenance.assigned_to = assignee
+                maintenance.updated_at = now
+                events.append(history.transition(maintenance, old["status"], request.user.id, now))
+                sla.update_deadlines(maintenance, old, room_types.get(maintenance.room_id))
+                changes.append((maintenance, old))
+                results.append({
+                    "id": pk,
+                    "ok": True,
+                    "status": maintenance.status,
+                    "assigned_to": maintenance.assigned_to_id,
+                })
+
+            if changes:
+                MaintenanceRequest.objects.bulk_update([m for m, _old in changes], fields, batch_size=200)
+                history.record(events)
+                stats.record_changes(changes)
+                if 'rejection_reason' in fields:
+                    search.index_requests([m.id for m, _old in changes])
+                notify_bulk_request_updates(changes, assignee)
+
+        return Response({"updated": len(changes), "results": results})
+
+
+
+class ImportRequestsView(APIView):
+    """
+    Admin-only bulk import of historical requests
+
+    Multipart POST with ``file`` (CSV or JSONL, see maintenance/importer.py)
+    and optional ``format``, ``dry_run`` and ``notify`` (default true).
+    Returns the number of rows imported and the first errors by line.
+    """
+    permission_classes = [permissions.IsAdminUser]
+    max_reported_errors = 100
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": "file is required"}, status=400)
+        import_format = request.data.get('format') or guess_format(upload.name)
+        if import_format not in IMPORT_FORMATS:
+            return Response({"error": f"format must be one of: {', '.join(IMPORT_FORMATS)}"}, status=400)
+        dry_run = str(request.data.get('dry_run', '')).lower() in ('1', 'true', 'yes')
+        notify = str(request.data.get('notify', 'true')).lower() in ('1', 'true', 'yes')
+
+        try:
+            result = import_requests(read_rows(upload, import_format), dry_run=dry_run)
+        except (UnicodeDecodeError, csv.Error) as e:
+            # Batches read before the bad line are already imported
+            return Response({"error": f"Cannot read the file: {e}"}, status=400)
+        if result["created"] and notify and not dry_run:
+            notify_import_summary(result, upload.name)
+
+        return Response({
+            "created": result["created"],
+            "dry_run": dry_run,
+            "error_count": len(result["errors"]),
+            "errors": result["errors"][:self.max_reported_errors],
+        })
+
+def parse_report_params(request):
+    """
+    Read ``start``, ``end`` (YYYY-MM-DD) and ``building`` query parameters
+
+    Returns:
+        tuple: (params dict, error Response or None)
+    """
+    params = {}
+    for key in ('start', 'end'):
+        value = request.query_params.get(key)
+        try:
+            params[key] = parse_date(value) if value else None
+        except ValueError:
+            params[key] = None
+        if value and params[key] is None:
+            return None, Response({"error": "Dates must be in YYYY-MM-DD format"}, status=400)
+
+    if params['start'] and params['end'] and params['start'] > params['end']:
+        return None, Response({"error": "start must be on or before end"}, status=400)
+
+    building_id = request.query_params.get('building')
+    try:
+        params['building_id'] = int(building_id) if building_id else None
+    except ValueError:
+        return None, Response({"error": "Invalid building ID"}, status=400)
+
+    return params, None
+
+
 class AnalyticsView(APIView):
+    """Dashboard analytics computed in the database"""
     permission_classes = [permissions.IsAdminUser]
     
     def get(self, request):
-        # Pre-calculated analytics
-        # This would be more efficient than processing on frontend
+        params, error = parse_report_params(request)
+        if error:
+            return error
+        return Response(build_analytics(**params))
+
+
+class DailyStatsView(APIView):
+    """Request/completion trend series read from the daily stats rollup"""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        params, error = parse_report_params(request)
+        if error:
+            return error
+
+        end = params['end'] or timezone.localdate()
+        start = params['start'] or end - timedelta(days=DEFAULT_WINDOW_DAYS - 1)
+        building_id = params['building_id']
+
         return Response({
-            'avg_response_time': 0,
-            'avg_completion_time': 0,
-            # etc.
+            "request_trends": daily_series("created", "requests", start, end, building_id),
+            "completion_trends": daily_series(
+                "entered", "completed", start, end, building_id, status="completed"
+            ),
         })
 
 
 # Staff claims a request
 class ClaimRequestView(APIView):
+    """
+    Staff claims an unassigned request
+
+    The claim is a single conditional UPDATE that only matches while the
+    request is still unassigned, so of several simultaneous claims exactly
+    one wins. The update skips model signals; the daily stats and
+    notifications they would produce are applied here instead.
+    """
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, pk):
         try:
-            maintenance = MaintenanceRequest.objects.get(id=pk)
+            maintenance = MaintenanceRequest.objects.only(
+                "id", "status", "building", "floor", "room", "assigned_to", "created_by", "created_at",
+                *history.TRANSITION_FIELDS, *sla.SLA_FIELDS,
+            ).get(id=pk)
         except MaintenanceRequest.DoesNotExist:
             return Response({"error": "Request not found"}, status=404)
-            
-        if maintenance.assigned_to is not None:
+
+        if maintenance.assigned_to_id is not None:
             return Response({"error": "Already taken"}, status=400)
 
-        # Assign to the user directly (not staff profile)
-        maintenance.assigned_to = request.user
+        old = {
+            "status": maintenance.status,
+            "building_id": maintenance.building_id,
+            "floor_id": maintenance.floor_id,
+            "assigned_to_id": None,
+        }
+        now = timezone.now()
         maintenance.status = "in_progress"
-        maintenance.save()
+        event = history.transition(maintenance, old["status"], request.user.id, now)
+        if old["status"] in sla.CLOSED_STATUSES:
+            sla.apply_deadlines(maintenance)
+        else:
+            sla.settle_deadlines(maintenance)
+        with transaction.atomic():
+            # Assign to the user directly (not staff profile)
+            claimed = MaintenanceRequest.objects.filter(
+                id=pk, assigned_to__isnull=True, status=old["status"]
+            ).update(
+                assigned_to=request.user,
+                status="in_progress",
+                updated_at=now,
+                **{
+                    field: getattr(maintenance, field)
+                    for field in (*history.TRANSITION_FIELDS, *sla.SLA_FIELDS)
+                },
+            )
+            if not claimed:
+                return Response({"error": "Already taken"}, status=400)
+
+            maintenance.assigned_to = request.user
+            maintenance.updated_at = now
+            history.record([event])
+            stats.record_changes([(maintenance, old)])
+            notify_bulk_request_updates([(maintenance, old)], request.user)
+
         return Response({"message": "Request claimed successfully"})
 
 
 # Staff completes the task
-class CompleteRequestView(APIView):
+class CompleteRequestView(PhotoUploadMixin, APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def post(self, request, pk):
+        rejected = self.rejected_upload_response(request)
+        if rejected is not None:
+            return rejected
+
         try:
             maintenance = MaintenanceRequest.objects.get(id=pk)
         except MaintenanceRequest.DoesNotExist:
@@ -190,17 +615,22 @@ class CompleteRequestView(APIView):
             maintenance, data=request.data, partial=True
         )
         if serializer.is_valid():
+            maintenance._actor_id = request.user.id
             serializer.save(status="completed")
             return Response({"message": "Request completed"})
         return Response(serializer.errors, status=400)
 
 
 # ✅ FIXED: Update status endpoint
-class UpdateStatusView(APIView):
+class UpdateStatusView(PhotoUploadMixin, APIView):
     """Update maintenance request status and details"""
     permission_classes = [permissions.IsAuthenticated]
     
     def post(self, request, pk):
+        rejected = self.rejected_upload_response(request)
+        if rejected is not None:
+            return rejected
+
         try:
             maintenance_request = MaintenanceRequest.objects.get(id=pk)
         except MaintenanceRequest.DoesNotExist:
@@ -214,6 +644,7 @@ class UpdateStatusView(APIView):
         )
         
         if serializer.is_valid():
+            maintenance_request._actor_id = request.user.id
             serializer.save()
             # Return the full request data
             response_serializer = MaintenanceRequestSerializer(maintenance_request)
@@ -0,0 +1,158 @@
+"""
+Cross-process relay for the notification stream
+
+Any process that writes notifications (web workers, the
+``deliver_notifications`` worker) appends stream events to a small SQLite
+file, settings.NOTIFICATION_EVENT_BUS; each ASGI process tails it with one
+query per poll and fans new events out to its connected clients (see
+notifications/stream.py). No broker is needed, but every process must see
+the same file, i.e. run on the same host.
+
+Event ids come from an AUTOINCREMENT key, so they only ever grow and a
+client can resume after the last id it saw (Last-Event-ID). Events older
+than NOTIFICATION_EVENT_RETENTION seconds are pruned.
+
+The file also records which stream tickets have been used, so a ticket
+opens only one stream whichever process serves it.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        data TEXT NOT NULL,
+        created REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS events_user_idx ON events (user_id, id)",
+    "CREATE INDEX IF NOT EXISTS events_created_idx ON events (created)",
+    "CREATE TABLE IF NOT EXISTS used_tickets (nonce TEXT PRIMARY KEY, expires REAL NOT NULL)",
+)
+
+_local = threading.local()
+
+
+def path():
+    """The bus file, or None when the stream is disabled"""
+    value = getattr(settings, "NOTIFICATION_EVENT_BUS", None)
+    return str(value) if value else None
+
+
+def enabled():
+    return path() is not None
+
+
+def _connection():
+    """This thread's connection to the bus file (created with the schema)"""
+    name = path()
+    conn = getattr(_local, "conn", None)
+    if conn is not None and _local.name == name:
+        return conn
+
+    conn = sqlite3.connect(name, timeout=5, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    for statement in SCHEMA:
+        conn.execute(statement)
+    _local.conn, _local.name = conn, name
+    return conn
+
+
+@contextmanager
+def _transaction():
+    """
+    This thread's connection inside BEGIN ... COMMIT (ROLLBACK on error)
+
+    The connection is in autocommit mode (isolation_level=None), where
+    ``with conn:`` doesn't open a transaction, so statements would each
+    commit on their own.
+    """
+    conn = _connection()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def append(events):
+    """
+    Append ``(user_id, kind, data)`` events in one transaction
+
+    Args:
+        events (list): ``data`` must be JSON-serializable
+    """
+    if not events or not enabled():
+        return
+    now = time.time()
+    rows = [(user_id, kind, json.dumps(data, default=str), now) for user_id, kind, data in events]
+    with _transaction() as conn:
+        conn.executemany("INSERT INTO events (user_id, kind, data, created) VALUES (?, ?, ?, ?)", rows)
+
+
+def read_after(last_id, user_id=None, limit=500):
+    """
+    Events with an id above ``last_id``, oldest first
+
+    Returns:
+        list: ``(id, user_id, kind, data)`` tuples, ``data`` decoded
+    """
+    query = "SELECT id, user_id, kind, data FROM events WHERE id > ?"
+    params = [last_id]
+    if user_id is not None:
+        query += " AND user_id = ?"
+        params.append(user_id)
+    query += " ORDER BY id LIMIT ?"
+    params.append(limit)
+    rows = _connection().execute(query, params).fetchall()
+    return [(pk, owner, kind, json.loads(data)) for pk, owner, kind, data in rows]
+
+
+def last_id():
+    """Id of the newest event (0 when empty)"""
+    row = _connection().execute("SELECT MAX(id) FROM events").fetchone()
+    return row[0] or 0
+
+
+def claim_ticket(nonce, expires):
+    """
+    Record a stream ticket as used
+
+    Args:
+        nonce (str): The ticket's unique part
+        expires (float): When the ticket stops being valid (epoch seconds);
+            the record is pruned after that
+
+    Returns:
+        bool: False if the ticket was already used
+    """
+    with _transaction() as conn:
+        cursor = conn.execute("INSERT OR IGNORE INTO used_tickets (nonce, expires) VALUES (?, ?)", (nonce, expires))
+    return cursor.rowcount == 1
+
+
+def prune(max_age=None):
+    """
+    Drop events older than ``max_age`` seconds, and expired ticket records
+
+    Returns:
+        int: Number of events removed
+    """
+    if max_age is None:
+        max_age = getattr(settings, "NOTIFICATION_EVENT_RETENTION", 3600)
+    with _transaction() as conn:
+        cursor = conn.execute("DELETE FROM events WHERE created < ?", (time.time() - max_age,))
+        conn.execute("DELETE FROM used_tickets WHERE expires < ?", (time.time(),))
+    return cursor.rowcount
@@ -0,0 +1,95 @@
+"""
+Per-user unread notification counters
+
+UnreadCounter holds each user's number of unread notifications so the bell
+can poll ``/api/notifications/unread-count/`` with a primary-key lookup
+instead of counting (or listing) Notification rows. Every write that
+creates, reads or deletes notifications adjusts it in the same transaction
+with UPDATE ... SET unread = unread + n:
+
+- NotificationBatch.deliver and queue.drain (``create``)
+- the mark-read, mark-all-read and delete views (``add``)
+- archiving and request deletion (``subtract_unread``)
+
+Each change is also published to the notification stream
+(notifications/events.py). ``rebuild`` recomputes every counter from the
+Notification table, e.g. after a bulk edit that bypassed these helpers.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from . import events
+from .models import Notification, UnreadCounter
+
+
+def unread(user_id):
+    """The user's unread count (one primary-key lookup)"""
+    value = UnreadCounter.objects.filter(user_id=user_id).values_list("unread", flat=True).first()
+    return value or 0
+
+
+def add(deltas):
+    """
+    Apply ``{user_id: delta}`` to the counters; never goes below zero
+
+    Users sharing a delta are updated with one statement, so a fan-out
+    costs one INSERT (for missing rows) plus one UPDATE per distinct delta.
+    """
+    by_delta = defaultdict(list)
+    for user_id, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(user_id)
+    if not by_delta:
+        return
+
+    raised = [user_id for delta, ids in by_delta.items() if delta > 0 for user_id in ids]
+    if raised:
+        UnreadCounter.objects.bulk_create(
+            (UnreadCounter(user_id=user_id) for user_id in raised), ignore_conflicts=True
+        )
+    for delta, user_ids in by_delta.items():
+        UnreadCounter.objects.filter(user_id__in=user_ids).update(
+            unread=Greatest(F("unread") + delta, 0)
+        )
+    events.publish_unread([user_id for user_ids in by_delta.values() for user_id in user_ids])
+
+
+def create(notifications, batch_size=500):
+    """bulk_create ``notifications`` and count the unread ones"""
+    with transaction.atomic():
+        Notification.objects.bulk_create(notifications, batch_size=batch_size)
+        events.publish_created(notifications)
+        add(Counter(n.user_id for n in notifications if not n.is_read))
+    return notifications
+
+
+def unread_by_user(queryset):
+    """``{user_id: unread}`` for a Notification queryset (one query)"""
+    rows = queryset.filter(is_read=False).values("user_id").annotate(total=Count("id")).order_by()
+    return {row["user_id"]: row["total"] for row in rows}
+
+
+def subtract_unread(queryset):
+    """Take the unread rows of ``queryset`` off the counters before it is deleted"""
+    add({user_id: -total for user_id, total in unread_by_user(queryset).items()})
+
+
+def rebuild(batch_size=500):
+    """
+    Recompute every counter from the Notification table
+
+    Returns:
+        int: Number of counters written
+    """
+    counters = [
+        UnreadCounter(user_id=user_id, unread=total)
+        for user_id, total in unread_by_user(Notification.objects.all()).items()
+    ]
+    with transaction.atomic():
+        UnreadCounter.objects.all().delete()
+        UnreadCounter.objects.bulk_create(counters, batch_size=batch_size)
+    return len(counters)
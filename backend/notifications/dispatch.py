@@ -0,0 +1,153 @@
+"""
+Batched notification fan-out
+
+Collect the notifications for an event (or many) in a NotificationBatch and
+write them with one bulk_create:
+
+    batch = NotificationBatch()
+    batch.add(ADMINS, "Request #1 was approved.", request, exclude=[actor_id])
+    batch.add([request.created_by_id], "Your request #1 was approved.", request)
+    batch.send()
+
+``ADMINS`` stands for every staff/superuser account; it is resolved once,
+from the cached registry in notifications/recipients.py, when the batch is
+delivered, however many events use it. A
+user gets a given message about a given request at most once per batch, so
+e.g. an assignee who is also an admin is not notified twice.
+
+send() writes the rows right away unless settings.NOTIFICATIONS_DEFERRED
+is on; then it only queues the batch once the current transaction commits
+and the ``deliver_notifications`` worker writes the rows (see
+notifications/queue.py). Turn it on only where that worker runs.
+"""
+
+from django.conf import settings
+from django.contrib.auth.models import User
+
+from maintenance.models import MaintenanceRequest
+from . import counters
+from .models import Notification
+from .recipients import admin_ids
+
+ADMINS = "admins"
+
+
+def drop_missing(notifications, known_user_ids=()):
+    """
+    Drop rows whose request or user no longer exists (deleted or archived
+    since they were queued); at most two queries
+
+    Args:
+        notifications (list): Unsaved Notification rows
+        known_user_ids (iterable, optional): Ids known to exist (admins)
+    """
+    request_ids = {n.maintenance_request_id for n in notifications} - {None}
+    user_ids = {n.user_id for n in notifications}
+    if request_ids:
+        request_ids = set(MaintenanceRequest.objects.filter(id__in=request_ids).values_list("id", flat=True))
+    if user_ids - set(known_user_ids or ()):
+        user_ids = set(User.objects.filter(id__in=user_ids).values_list("id", flat=True))
+    return [
+        n for n in notifications
+        if n.user_id in user_ids
+        and (n.maintenance_request_id is None or n.maintenance_request_id in request_ids)
+    ]
+
+
+class NotificationBatch:
+    def __init__(self):
+        self._pending = []
+        self._admin_ids = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, recipients, message, maintenance_request=None, exclude=()):
+        """
+        Queue ``message`` for each recipient
+
+        Args:
+            recipients: ``ADMINS`` or an iterable of user ids (None is skipped)
+            message (str): Notification text
+            maintenance_request (MaintenanceRequest, optional): Related request
+            exclude (iterable, optional): User ids to leave out
+        """
+        if recipients != ADMINS:
+            recipients = [user_id for user_id in recipients if user_id is not None]
+        request_id = maintenance_request.pk if maintenance_request is not None else None
+        self._pending.append((recipients, message, request_id, [i for i in exclude if i is not None]))
+
+    def payload(self):
+        """JSON-serializable form of the queued messages"""
+        return [list(entry) for entry in self._pending]
+
+    @classmethod
+    def from_payload(cls, payload, admin_ids=None):
+        batch = cls()
+        batch._pending = [tuple(entry) for entry in payload]
+        batch._admin_ids = admin_ids
+        return batch
+
+    def admin_ids(self):
+        if self._admin_ids is None:
+            self._admin_ids = admin_ids()
+        return self._admin_ids
+
+    def build(self, check_existing=False):
+        """
+        The unsaved Notification rows, recipients resolved and deduplicated
+
+        Args:
+            check_existing (bool): Drop rows for requests (or users) deleted
+                or archived since the batch was queued
+        """
+        seen = set()
+        notifications = []
+        for recipients, message, request_id, exclude in self._pending:
+            if recipients == ADMINS:
+                recipients = self.admin_ids()
+            for user_id in recipients:
+                key = (user_id, message, request_id)
+                if user_id in exclude or key in seen:
+                    continue
+                seen.add(key)
+                notifications.append(Notification(
+                    user_id=user_id,
+                    message=message,
+                    maintenance_request_id=request_id,
+                ))
+        if check_existing:
+            return drop_missing(notifications, self._admin_ids)
+        return notifications
+
+    def deliver(self, check_existing=False):
+        """
+        Insert everything queued so far with one bulk_create, right now,
+        and raise the recipients' unread counters
+
+        Returns:
+            int: Number of notifications created
+        """
+        notifications = self.build(check_existing)
+        self._pending = []
+        counters.create(notifications)
+        return len(notifications)
+
+    def send(self):
+        """
+        Deliver the batch: inline, or with NOTIFICATIONS_DEFERRED queued for
+        the worker after the current transaction commits
+
+        Returns:
+            int: Number of notifications created now (0 when queued)
+        """
+        if not self._pending:
+            return 0
+        if not getattr(settings, "NOTIFICATIONS_DEFERRED", False):
+            return self.deliver()
+
+        from .queue import enqueue
+
+        enqueue(self.payload())
+        self._pending = []
+        return 0
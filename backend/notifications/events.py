@@ -0,0 +1,49 @@
+"""
+Publishing to the notification stream
+
+Writes that create notifications or move unread counters call these
+helpers (via notifications/counters.py); the events reach the bus
+(notifications/bus.py) once the transaction commits, and from there every
+connected client of that user. Two kinds of event:
+
+- ``notification``: a new notification (id, message, maintenance_request,
+  is_read, created_at)
+- ``unread``: the user's new unread count, ``{"unread": n}``
+
+A failure to publish is logged and never breaks the write itself.
+"""
+
+from django.db import transaction
+
+from maintenance.rows import datetime_repr
+from . import bus
+from .models import UnreadCounter
+
+
+def publish(events):
+    """Queue ``(user_id, kind, data)`` events for the bus after commit"""
+    if events and bus.enabled():
+        transaction.on_commit(lambda: bus.append(events), robust=True)
+
+
+def notification_data(notification):
+    return {
+        "id": notification.id,
+        "message": notification.message,
+        "maintenance_request": notification.maintenance_request_id,
+        "is_read": notification.is_read,
+        "created_at": datetime_repr(notification.created_at),
+    }
+
+
+def publish_created(notifications):
+    publish([(n.user_id, "notification", notification_data(n)) for n in notifications])
+
+
+def publish_unread(user_ids):
+    """Publish the current unread count of ``user_ids`` (one query)"""
+    if not user_ids or not bus.enabled():
+        return
+    unread = dict.fromkeys(user_ids, 0)
+    unread.update(UnreadCounter.objects.filter(user_id__in=user_ids).values_list("user_id", "unread"))
+    publish([(user_id, "unread", {"unread": count}) for user_id, count in unread.items()])
@@ -3,8 +3,7 @@ Helper functions for creating notifications
 Place this in: notifications/helpers.py
 """
 
-from django.contrib.auth.models import User
-from notifications.models import Notification
+from .dispatch import ADMINS, NotificationBatch
 
 
 def notify_admins(message, maintenance_request=None):
@@ -15,15 +14,9 @@ def notify_admins(message, maintenance_request=None):
         message (str): Notification message
         maintenance_request (MaintenanceRequest, optional): Related request
     """
-    admin_users = User.objects.filter(is_staff=True) | User.objects.filter(is_superuser=True)
-    admin_users = admin_users.distinct()
-    
-    for admin in admin_users:
-        Notification.objects.create(
-            user=admin,
-            message=message,
-            maintenance_request=maintenance_request,
-        )
+    batch = NotificationBatch()
+    batch.add(ADMINS, message, maintenance_request)
+    return batch.send()
 
 
 def notify_user(user, message, maintenance_request=None):
@@ -36,11 +29,10 @@ def notify_user(user, message, maintenance_request=None):
         maintenance_request (MaintenanceRequest, optional): Related request
     """
     if user:
-        Notification.objects.create(
-            user=user,
-            message=message,
-            maintenance_request=maintenance_request,
-        )
+        batch = NotificationBatch()
+        batch.add([user.id], message, maintenance_request)
+        return batch.send()
+    return 0
 
 
 def notify_staff_and_admins(message, maintenance_request=None, exclude_user=None):
@@ -52,15 +44,87 @@ def notify_staff_and_admins(message, maintenance_request=None, exclude_user=None
         maintenance_request (MaintenanceRequest, optional): Related request
         exclude_user (User, optional): User to exclude from notifications
     """
-    users = User.objects.filter(is_staff=True) | User.objects.filter(is_superuser=True)
-    users = users.distinct()
-    
-    if exclude_user:
-        users = users.exclude(id=exclude_user.id)
-    
-    for user in users:
-        Notification.objects.create(
-            user=user,
-            message=message,
-            maintenance_request=maintenance_request,
-        )
\ No newline at end of file
+    batch = NotificationBatch()
+    batch.add(ADMINS, message, maintenance_request, exclude=[exclude_user.id] if exclude_user else [])
+    return batch.send()
+
+
+def add_request_update(batch, request, old, staff_name=None):
+    """
+    Queue what the MaintenanceRequest save signals send for one update
+
+    Args:
+        batch (NotificationBatch): Where to queue the notifications
+        request (MaintenanceRequest): The updated request
+        old (dict): Its previous ``status`` and ``assigned_to_id``
+        staff_name (str, optional): Display name of the new assignee
+    """
+    # Staff accepted / was assigned
+    if old["assigned_to_id"] is None and request.assigned_to_id is not None:
+        batch.add(
+            ADMINS,
+            f"Request #{request.id} has been accepted by {staff_name}.",
+            request,
+            exclude=[request.assigned_to_id],
+        )
+
+    if old["status"] and old["status"] != request.status:
+        status = request.get_status_display()
+        batch.add(
+            [request.created_by_id],
+            f"Your maintenance request #{request.id} status changed to {status}.",
+            request,
+        )
+        # Assignee and admins get the same text, so an assignee who is also
+        # an admin is notified once
+        batch.add(
+            [request.assigned_to_id],
+            f"Request #{request.id} status changed to {status}.",
+            request,
+            exclude=[request.created_by_id],
+        )
+        batch.add(
+            ADMINS,
+            f"Request #{request.id} status changed to {status}.",
+            request,
+            exclude=[request.created_by_id],
+        )
+
+
+def notify_bulk_request_updates(changes, assignee=None):
+    """
+    Send the notifications the MaintenanceRequest signals would have sent,
+    for requests updated together with bulk_update (which skips signals)
+
+    Admins are looked up once and every row is written with one bulk_create.
+
+    Args:
+        changes (list): ``(request, old)`` pairs where ``old`` holds the
+            previous ``status`` and ``assigned_to_id``
+        assignee (User, optional): The user the requests were assigned to
+    """
+    staff_name = (assignee.get_full_name() or assignee.username) if assignee else None
+    batch = NotificationBatch()
+    for request, old in changes:
+        add_request_update(batch, request, old, staff_name)
+    return batch.send()
+
+
+def notify_sla_breaches(breaches):
+    """
+    Escalate overdue maintenance requests to admins and the assignee
+
+    Args:
+        breaches (list): ``(request, kind)`` pairs, ``kind`` being
+            ``"respond"`` or ``"resolve"``
+
+    Returns:
+        int: Number of notifications created
+    """
+    batch = NotificationBatch()
+    for request, kind in breaches:
+        what = "picked up" if kind == "respond" else "resolved"
+        message = f"Request #{request.id} is overdue: it was not {what} within its SLA."
+        batch.add([request.assigned_to_id], message, request)
+        batch.add(ADMINS, message, request)
+    return batch.send()
@@ -0,0 +1,58 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.queue import drain
+
+
+class Command(BaseCommand):
+    help = (
+        "Deliver queued notifications (NotificationJob rows) in batches, "
+        "retrying failed jobs with exponential backoff. Runs until the queue "
+        "is empty, or forever with --loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=100,
+            help="Jobs delivered per transaction (default: 100)",
+        )
+        parser.add_argument(
+            "--max-attempts",
+            type=int,
+            default=5,
+            help="Mark a job failed after this many tries (default: 5)",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for new jobs instead of exiting when idle",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait between polls with --loop (default: 1)",
+        )
+
+    def handle(self, *args, **options):
+        totals = {"jobs": 0, "notifications": 0, "retrying": 0, "failed": 0}
+        try:
+            while True:
+                result = drain(options["batch_size"], options["max_attempts"])
+                for key, value in result.items():
+                    totals[key] += value
+                if result["jobs"]:
+                    continue
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Delivered {totals['notifications']} notifications from {totals['jobs']} jobs "
+            f"({totals['retrying']} retrying, {totals['failed']} failed)"
+        ))
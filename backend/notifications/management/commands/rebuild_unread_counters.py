@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from notifications.counters import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute every user's UnreadCounter from the Notification table. "
+        "Run after any bulk edit of notifications that bypasses notifications.counters."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Rows per bulk insert (default: 500)",
+        )
+
+    def handle(self, *args, **options):
+        count = rebuild(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt unread counters: {count} users"))
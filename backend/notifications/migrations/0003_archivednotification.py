@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-17 18:59
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0020_archivedrequest'),
+        ('notifications', '0002_alter_notification_options_remove_notification_title_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedNotification',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('message', models.TextField()),
+                ('created_at', models.DateTimeField()),
+                ('is_read', models.BooleanField(default=False)),
+                ('maintenance_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='maintenance.archivedrequest')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'created_at'], name='narc_user_created_idx')],
+            },
+        ),
+    ]
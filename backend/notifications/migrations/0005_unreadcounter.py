@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-17 19:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_counters(apps, schema_editor):
+    Notification = apps.get_model("notifications", "Notification")
+    UnreadCounter = apps.get_model("notifications", "UnreadCounter")
+    rows = Notification.objects.filter(is_read=False).values("user_id").annotate(total=Count("id")).order_by()
+    UnreadCounter.objects.bulk_create(
+        (UnreadCounter(user_id=row["user_id"], unread=row["total"]) for row in rows.iterator()),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('notifications', '0004_notificationjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
-from maintenance.models import MaintenanceRequest
+from maintenance.models import ArchivedRequest, MaintenanceRequest
 
 
 class Notification(models.Model):
@@ -19,4 +20,62 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
 
     def __str__(self):
-        return f"Notif for {self.user.username}: {self.message[:30]}"
\ No newline at end of file
+        return f"Notif for {self.user.username}: {self.message[:30]}"
+
+class ArchivedNotification(models.Model):
+    """Notification of an archived request (see maintenance/archive.py)"""
+
+    id = models.IntegerField(primary_key=True)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="+")
+    message = models.TextField()
+    maintenance_request = models.ForeignKey(
+        ArchivedRequest, on_delete=models.CASCADE, related_name="notifications"
+    )
+    created_at = models.DateTimeField()
+    is_read = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "created_at"], name="narc_user_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"Archived notif for {self.user_id}: {self.message[:30]}"
+
+
+class NotificationJob(models.Model):
+    """
+    A NotificationBatch waiting to be delivered by the
+    ``deliver_notifications`` worker (see notifications/queue.py)
+    """
+
+    # NotificationBatch.payload(): [[recipients, message, request_id, exclude], ...]
+    payload = models.JSONField()
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    failed = models.BooleanField(default=False)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["failed", "run_after"], name="notif_job_due_idx"),
+        ]
+
+    def __str__(self):
+        return f"Notification job #{self.id} ({self.attempts} attempts)"
+
+
+class UnreadCounter(models.Model):
+    """
+    Denormalized count of a user's unread notifications, kept in step with
+    Notification writes by notifications/counters.py
+    """
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="+"
+    )
+    unread = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread} unread"
@@ -0,0 +1,110 @@
+"""
+Deferred notification delivery
+
+NotificationBatch.send() hands its payload to ``enqueue``, which inserts a
+NotificationJob once the surrounding transaction commits (nothing is queued
+if it rolls back, and a failure to queue is logged instead of breaking the
+write that triggered it). The ``deliver_notifications`` worker calls
+``drain``:
+
+- due jobs are taken ``batch_size`` at a time and their notifications are
+  written with one bulk_create (and counted in the recipients' unread
+  counters), then the jobs are deleted
+- if that fails, each job is retried on its own; a failing job is
+  rescheduled with exponential backoff (NOTIFICATION_RETRY_DELAY seconds,
+  doubling, at most NOTIFICATION_RETRY_MAX_DELAY) and marked failed after
+  ``max_attempts``
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from . import counters
+from .dispatch import NotificationBatch, drop_missing
+from .models import NotificationJob
+from .recipients import admin_ids
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(payload):
+    """Queue a NotificationBatch payload for the worker after commit"""
+    transaction.on_commit(lambda: NotificationJob.objects.create(payload=payload), robust=True)
+
+
+def retry_delay(attempts):
+    """Backoff before the next try of a job that failed ``attempts`` times"""
+    base = getattr(settings, "NOTIFICATION_RETRY_DELAY", 30)
+    cap = getattr(settings, "NOTIFICATION_RETRY_MAX_DELAY", 3600)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), cap))
+
+
+def due_jobs(now):
+    return NotificationJob.objects.filter(failed=False, run_after__lte=now).order_by("run_after", "id")
+
+
+def _deliver_one(job, admins, now, max_attempts):
+    """Deliver a single job in its own savepoint; returns rows written or None"""
+    try:
+        with transaction.atomic():
+            count = NotificationBatch.from_payload(job.payload, admins).deliver(check_existing=True)
+            job.delete()
+        return count
+    except Exception as e:
+        logger.warning("Notification job #%s failed (attempt %s)", job.pk, job.attempts + 1, exc_info=True)
+        job.attempts += 1
+        job.last_error = f"{type(e).__name__}: {e}"
+        if job.attempts >= max_attempts:
+            job.failed = True
+        else:
+            job.run_after = now + retry_delay(job.attempts)
+        job.save(update_fields=["attempts", "last_error", "failed", "run_after"])
+        return None
+
+
+def drain(batch_size=100, max_attempts=5):
+    """
+    Deliver one batch of due jobs
+
+    Returns:
+        dict: ``jobs`` taken, ``notifications`` written, ``retrying`` and
+        ``failed`` job counts
+    """
+    result = {"jobs": 0, "notifications": 0, "retrying": 0, "failed": 0}
+    now = timezone.now()
+    with transaction.atomic():
+        jobs = due_jobs(now)
+        if connection.features.has_select_for_update_skip_locked:
+            jobs = jobs.select_for_update(skip_locked=True)
+        jobs = list(jobs[:batch_size])
+        if not jobs:
+            return result
+        result["jobs"] = len(jobs)
+        admins = admin_ids()
+
+        try:
+            with transaction.atomic():
+                notifications = []
+                for job in jobs:
+                    notifications.extend(NotificationBatch.from_payload(job.payload, admins).build())
+                notifications = drop_missing(notifications, admins)
+                counters.create(notifications)
+                NotificationJob.objects.filter(id__in=[job.id for job in jobs]).delete()
+            result["notifications"] = len(notifications)
+            return result
+        except Exception:
+            logger.warning("Notification batch failed, delivering its %s jobs one by one", len(jobs), exc_info=True)
+
+        for job in jobs:
+            count = _deliver_one(job, admins, now, max_attempts)
+            if count is not None:
+                result["notifications"] += count
+            elif job.failed:
+                result["failed"] += 1
+            else:
+                result["retrying"] += 1
+    return result
@@ -0,0 +1,121 @@
+"""
+Cached notification recipients
+
+The ids ``ADMINS`` notifications fan out to (every staff/superuser
+account, ``admin_ids()``), kept in a Django cache so routine events don't
+query the user table.
+
+The registry lives in the cache named by NOTIFICATION_RECIPIENTS_CACHE
+(default "default"). Receivers in notifications/signals.py call
+``invalidate_if_changed`` on every User save or delete and drop the entry
+when that user's membership changed.
+
+A registry loaded inside a transaction that changed recipients is not
+cached until that transaction commits, so a rollback can't leave ids of
+users that don't exist in the cache.
+
+With a shared backend (Redis, Memcached, database) that invalidation is
+seen by every process. With the process-local LocMemCache, other processes
+(e.g. the deliver_notifications worker) pick changes up when the entry
+expires after NOTIFICATION_RECIPIENTS_TTL seconds.
+"""
+
+import threading
+import weakref
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models import Q
+
+CACHE_KEY = "notifications:recipients:v2"
+# User fields that decide membership (see load())
+MEMBERSHIP_FIELDS = {"is_staff", "is_superuser"}
+
+_local = threading.local()
+
+
+def _cache():
+    return caches[getattr(settings, "NOTIFICATION_RECIPIENTS_CACHE", "default")]
+
+
+def load():
+    """Build the registry from the database (one query)"""
+    admins = list(
+        User.objects.filter(Q(is_staff=True) | Q(is_superuser=True))
+        .order_by("id")
+        .values_list("id", flat=True)
+    )
+    return {"admins": admins}
+
+
+def registry():
+    """The cached registry, loading it on a miss"""
+    cache = _cache()
+    data = cache.get(CACHE_KEY)
+    if data is None:
+        data = load()
+        if _change_pending():
+            return data
+        cache.set(CACHE_KEY, data, getattr(settings, "NOTIFICATION_RECIPIENTS_TTL", 300))
+    return data
+
+
+def admin_ids():
+    return list(registry()["admins"])
+
+
+class _Invalidation:
+    """on_commit hook of a transaction that changed recipients"""
+
+    done = False
+
+    def __call__(self):
+        self.done = True
+        _cache().delete(CACHE_KEY)
+
+
+def _change_pending():
+    """
+    Whether this thread's open transaction changed recipients
+
+    Only a weak reference to the hook is kept: a rollback discards the
+    hook without running it, and the reference goes dead with it.
+    """
+    ref = getattr(_local, "pending", None)
+    hook = ref() if ref is not None else None
+    return hook is not None and not hook.done and connection.in_atomic_block
+
+
+def invalidate():
+    # Again after commit: a reload racing the open transaction in another
+    # process would have cached the old rows
+    _cache().delete(CACHE_KEY)
+    hook = _Invalidation()
+    _local.pending = weakref.ref(hook)
+    transaction.on_commit(hook)
+
+
+def invalidate_if_changed(user, deleted=False, created=False, update_fields=None):
+    """
+    Drop the cached registry if ``user``'s membership in it no longer
+    matches the database row that was just saved or deleted
+
+    Saves that can't affect recipients (``update_fields`` without
+    is_staff / is_superuser, e.g. last_login updates; new or deleted
+    regular users) return straight away.
+    """
+    if update_fields is not None and not MEMBERSHIP_FIELDS.intersection(update_fields):
+        return
+    is_admin = user.is_staff or user.is_superuser
+    if (created or deleted) and not is_admin:
+        return
+    data = _cache().get(CACHE_KEY)
+    if data is None:
+        # Nothing to drop, but a registry loaded before this change commits
+        # must not be cached either
+        invalidate()
+        return
+    if (user.pk in data["admins"]) != (is_admin and not deleted):
+        invalidate()
@@ -0,0 +1,55 @@
+"""
+Fast rendering for the notification list
+
+Builds the same JSON as NotificationSerializer from a ``.values()`` query
+with the request/building/room columns joined in, so no model instances or
+serializer fields are created per row. Keep in sync with
+NotificationSerializer.
+"""
+
+from maintenance.rows import datetime_repr
+
+NOTIFICATION_VALUES = (
+    "id",
+    "message",
+    "maintenance_request_id",
+    "maintenance_request__description",
+    "maintenance_request__status",
+    "maintenance_request__building__name",
+    "maintenance_request__room_id",
+    "maintenance_request__room__name",
+    "is_read",
+    "created_at",
+)
+
+
+def notification_row(row):
+    request_id = row["maintenance_request_id"]
+    details = None
+    if request_id is not None:
+        description = row["maintenance_request__description"]
+        details = {
+            "id": request_id,
+            "request_type": description[:50] if description else "N/A",
+            "status": row["maintenance_request__status"],
+            "building": row["maintenance_request__building__name"],
+            "room": (
+                row["maintenance_request__room__name"]
+                if row["maintenance_request__room_id"] is not None else None
+            ),
+        }
+    return {
+        "id": row["id"],
+        "message": row["message"],
+        "maintenance_request": request_id,
+        "request_details": details,
+        "is_read": row["is_read"],
+        "created_at": datetime_repr(row["created_at"]),
+    }
+
+
+def notification_rows(queryset):
+    """Render a Notification queryset (or NOTIFICATION_VALUES rows) as a list"""
+    if hasattr(queryset, "values"):
+        queryset = queryset.values(*NOTIFICATION_VALUES)
+    return [notification_row(row) for row in queryset]
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Notification
+from .models import ArchivedNotification, Notification
 
 
 class NotificationSerializer(serializers.ModelSerializer):
@@ -44,6 +44,14 @@ class NotificationSerializer(serializers.ModelSerializer):
         return None
     
 
+class ArchivedNotificationSerializer(NotificationSerializer):
+    """Read-only; ``request_details`` comes from the ArchivedRequest"""
+
+    class Meta(NotificationSerializer.Meta):
+        model = ArchivedNotification
+        read_only_fields = NotificationSerializer.Meta.fields
+
+
 class NotificationSerializerAlternative(serializers.ModelSerializer):
     request_details = serializers.SerializerMethodField()
     
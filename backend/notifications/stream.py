@@ -0,0 +1,184 @@
+"""
+Server-sent events for notifications (``/api/notifications/stream/``)
+
+Each ASGI process keeps one ``Hub``: a single task tails the event bus
+(notifications/bus.py) every NOTIFICATION_EVENT_POLL_INTERVAL seconds and
+puts new events on the queues of that user's open streams. An idle stream
+costs no queries at all, however many tabs are open; only the poll does,
+once per process.
+
+A stream replays what the client missed when it sends Last-Event-ID (or
+``?last_event_id=``), then sends the user's current unread count and
+follows the hub. Comments are sent every NOTIFICATION_STREAM_KEEPALIVE
+seconds so proxies keep the connection open. A client that can't keep up
+is disconnected and resumes from its last id.
+
+Browsers can't set headers on an EventSource, so a client first POSTs
+(authenticated as usual) to ``stream/ticket/`` and opens the stream with
+``?ticket=``: a signed, single-purpose value that expires after
+NOTIFICATION_STREAM_TICKET_TTL seconds and is accepted once, so the access
+token never appears in URLs or access logs.
+
+Serve the project with an ASGI server (``uvicorn backend.asgi:application``)
+for this; under WSGI each open stream holds a worker thread.
+"""
+
+import asyncio
+import json
+import logging
+import secrets
+import time
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+
+from . import bus, counters
+
+logger = logging.getLogger(__name__)
+
+QUEUE_SIZE = 100
+READ_BATCH = 500
+PRUNE_EVERY = 60  # seconds
+RETRY_MS = 5000  # EventSource reconnect delay
+LAGGED = object()
+TICKET_SALT = "notifications.stream.ticket"
+
+
+def ticket_ttl():
+    return getattr(settings, "NOTIFICATION_STREAM_TICKET_TTL", 30)
+
+
+def issue_ticket(user_id):
+    """A ticket that opens one stream for ``user_id`` within ticket_ttl() seconds"""
+    return signing.TimestampSigner(salt=TICKET_SALT).sign_object(
+        {"user": user_id, "nonce": secrets.token_urlsafe(12)}
+    )
+
+
+def redeem_ticket(ticket):
+    """The user id a ticket was issued to, or None if it is invalid, expired or used"""
+    try:
+        data = signing.TimestampSigner(salt=TICKET_SALT).unsign_object(ticket, max_age=ticket_ttl())
+    except (signing.BadSignature, ValueError):
+        return None
+    if not bus.claim_ticket(data["nonce"], time.time() + ticket_ttl()):
+        return None
+    return data["user"]
+
+
+def format_event(kind, data, event_id=None):
+    """One SSE message"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {kind}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+class Hub:
+    """In-process pub/sub for stream subscribers, fed from the bus"""
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._task = None
+        self._loop = None
+
+    def subscribe(self, user_id):
+        """A queue receiving ``(id, kind, data)`` events for ``user_id``"""
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self._subscribers[user_id].add(queue)
+        self._ensure_polling()
+        return queue
+
+    def unsubscribe(self, user_id, queue):
+        queues = self._subscribers.get(user_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[user_id]
+
+    def publish(self, event_id, user_id, kind, data):
+        """Hand an event to the user's subscribers in this process"""
+        for queue in list(self._subscribers.get(user_id, ())):
+            try:
+                queue.put_nowait((event_id, kind, data))
+            except asyncio.QueueFull:
+                # Too far behind: end that stream; it resumes from its last id
+                self.unsubscribe(user_id, queue)
+                queue.get_nowait()
+                queue.put_nowait(LAGGED)
+
+    def _ensure_polling(self):
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._loop is not loop:
+            self._loop = loop
+            self._task = loop.create_task(self._poll())
+
+    async def _poll(self):
+        interval = getattr(settings, "NOTIFICATION_EVENT_POLL_INTERVAL", 0.5)
+        last_id = await asyncio.to_thread(bus.last_id)
+        pruned_at = 0
+        while self._subscribers:
+            events = []
+            try:
+                events = await asyncio.to_thread(bus.read_after, last_id, None, READ_BATCH)
+                for event_id, user_id, kind, data in events:
+                    last_id = event_id
+                    self.publish(event_id, user_id, kind, data)
+                now = asyncio.get_running_loop().time()
+                if now - pruned_at > PRUNE_EVERY:
+                    pruned_at = now
+                    await asyncio.to_thread(bus.prune)
+            except Exception:
+                logger.warning("Reading the notification event bus failed", exc_info=True)
+            if len(events) < READ_BATCH:
+                await asyncio.sleep(interval)
+
+
+hub = Hub()
+
+
+async def event_stream(user_id, last_event_id=None):
+    """
+    The SSE body for one client
+
+    Args:
+        user_id (int): Whose events to send
+        last_event_id (int, optional): Replay bus events after this id
+    """
+    keepalive = getattr(settings, "NOTIFICATION_STREAM_KEEPALIVE", 15)
+    # Subscribe before replaying so nothing published meanwhile is lost
+    queue = hub.subscribe(user_id)
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+
+        sent = last_event_id or 0
+        if last_event_id is not None:
+            while True:
+                missed = await asyncio.to_thread(bus.read_after, sent, user_id, READ_BATCH)
+                for event_id, _, kind, data in missed:
+                    sent = event_id
+                    yield format_event(kind, data, event_id)
+                if len(missed) < READ_BATCH:
+                    break
+        # After the replay, so a replayed (older) count can't override it
+        unread = await sync_to_async(counters.unread)(user_id)
+        yield format_event("unread", {"unread": unread})
+
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), keepalive)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event is LAGGED:
+                return
+            event_id, kind, data = event
+            if event_id > sent:
+                sent = event_id
+                yield format_event(kind, data, event_id)
+    finally:
+        hub.unsubscribe(user_id, queue)
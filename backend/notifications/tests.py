@@ -1,3 +1,322 @@
-from django.test import TestCase
+import asyncio
+import sqlite3
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from maintenance.models import MaintenanceRequest
+from . import bus, queue, recipients
+from .helpers import notify_user
+from .models import Notification, NotificationJob
+
+
+@override_settings(NOTIFICATIONS_DEFERRED=False)
+class UnreadCounterTests(TestCase):
+    """The unread counter follows notification creates, reads and deletes"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser("admin", "admin@example.com", "pass")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        for i in range(3):
+            MaintenanceRequest.objects.create(description=f"Leak {i}", created_by=self.admin)
+
+    def unread(self):
+        return self.client.get("/api/notifications/unread-count/").json()["unread"]
+
+    def test_counter_tracks_writes(self):
+        self.assertEqual(self.unread(), 3)
+        first, second, _ = Notification.objects.filter(user=self.admin).order_by("id")
+
+        self.client.post(f"/api/notifications/{first.id}/mark-read/")
+        self.client.post(f"/api/notifications/{first.id}/mark-read/")
+        self.assertEqual(self.unread(), 2)
+
+        self.client.delete(f"/api/notifications/{first.id}/")
+        second.maintenance_request.delete()
+        self.assertEqual(self.unread(), 1)
+
+        self.client.post("/api/notifications/mark-all-read/")
+        self.assertEqual(self.unread(), 0)
+
+
+class ConditionalNotificationListTests(TestCase):
+    """The notification list ETag moves on new rows and on mark-read"""
+
+    url = "/api/notifications/my/"
+
+    def setUp(self):
+        self.user = User.objects.create_user("reader")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.notification = Notification.objects.create(user=self.user, message="Hello")
+
+    def test_not_modified_until_changed(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.client.post(f"/api/notifications/{self.notification.id}/mark-read/")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response["ETag"]
+        Notification.objects.create(user=self.user, message="Again")
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class NotificationStreamTests(TestCase):
+    """The SSE stream resumes after the client's Last-Event-ID"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings = override_settings(NOTIFICATION_EVENT_BUS=Path(directory.name) / "bus.sqlite3")
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.user = User.objects.create_user("reader")
+        self.token = str(AccessToken.for_user(self.user))
+        bus.append([(self.user.id, "unread", {"unread": 1})])
+        self.seen = bus.last_id()
+        bus.append([
+            (self.user.id + 1, "unread", {"unread": 9}),
+            (self.user.id, "unread", {"unread": 2}),
+        ])
+
+    async def test_resume_from_last_event_id(self):
+        response = await self.async_client.get(
+            "/api/notifications/stream/",
+            headers={"Authorization": f"Bearer {self.token}", "Last-Event-ID": str(self.seen)},
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        chunks = response.streaming_content.__aiter__()
+        received = [await asyncio.wait_for(chunks.__anext__(), 5) for _ in range(3)]
+        await chunks.aclose()
+
+        self.assertEqual(received[1], f'id: {self.seen + 2}\nevent: unread\ndata: {{"unread":2}}\n\n'.encode())
+        self.assertEqual(received[2], b'event: unread\ndata: {"unread":0}\n\n')
+
+    async def test_requires_token(self):
+        response = await self.async_client.get("/api/notifications/stream/")
+        self.assertEqual(response.status_code, 401)
+
+    def ticket(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        response = client.post("/api/notifications/stream/ticket/")
+        self.assertEqual(response.status_code, 200)
+        return response.data["ticket"]
+
+    async def open_stream(self, **params):
+        return await self.async_client.get("/api/notifications/stream/", params)
+
+    async def test_ticket_opens_one_stream(self):
+        ticket = await sync_to_async(self.ticket)()
+        response = await self.open_stream(ticket=ticket)
+        self.assertEqual(response.status_code, 200)
+        await response.streaming_content.__aiter__().aclose()
+
+        reused = await self.open_stream(ticket=ticket)
+        self.assertEqual(reused.status_code, 401)
+
+    async def test_rejects_expired_forged_and_query_tokens(self):
+        ticket = await sync_to_async(self.ticket)()
+        with override_settings(NOTIFICATION_STREAM_TICKET_TTL=-1):
+            self.assertEqual((await self.open_stream(ticket=ticket)).status_code, 401)
+        self.assertEqual((await self.open_stream(ticket=ticket + "x")).status_code, 401)
+        self.assertEqual((await self.open_stream(token=self.token)).status_code, 401)
+
+    def test_append_is_one_transaction(self):
+        last = bus.last_id()
+        with self.assertRaises(sqlite3.IntegrityError):
+            bus.append([(self.user.id, "unread", {"unread": 3}), (None, "unread", {"unread": 4})])
+        self.assertEqual(bus.last_id(), last)
+        self.assertFalse(bus.read_after(last))
+
+    def test_ticket_requires_authentication(self):
+        response = APIClient().post("/api/notifications/stream/ticket/")
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(NOTIFICATIONS_DEFERRED=True, NOTIFICATION_RETRY_DELAY=30)
+class NotificationQueueTests(TestCase):
+    """Deferred delivery: queued on commit, drained by the worker, retried"""
+
+    def setUp(self):
+        self.user = User.objects.create_user("student")
+
+    def queue_message(self, message="Hello"):
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_user(self.user, message)
+
+    def test_enqueued_on_commit_and_drained(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            notify_user(self.user, "Hello")
+            self.assertFalse(NotificationJob.objects.exists())
+        for callback in callbacks:
+            callback()
+        self.assertEqual(NotificationJob.objects.count(), 1)
+        self.assertFalse(Notification.objects.exists())
+
+        result = queue.drain()
+        self.assertEqual(result, {"jobs": 1, "notifications": 1, "retrying": 0, "failed": 0})
+        self.assertEqual(Notification.objects.get().message, "Hello")
+        self.assertFalse(NotificationJob.objects.exists())
+
+    def test_rollback_drops_job(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    notify_user(self.user, "Hello")
+                    raise RuntimeError
+        self.assertEqual(callbacks, [])
+        self.assertFalse(NotificationJob.objects.exists())
+
+    def test_failed_job_is_retried_with_backoff(self):
+        self.queue_message()
+        with mock.patch("notifications.counters.create", side_effect=RuntimeError("db down")):
+            with self.assertLogs("notifications.queue", "WARNING"):
+                result = queue.drain()
+        self.assertEqual(result["retrying"], 1)
+        job = NotificationJob.objects.get()
+        self.assertEqual((job.attempts, job.failed), (1, False))
+        self.assertEqual(job.last_error, "RuntimeError: db down")
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=25))
+
+        # Not due yet
+        self.assertEqual(queue.drain()["jobs"], 0)
+        NotificationJob.objects.update(run_after=timezone.now())
+        self.assertEqual(queue.drain()["notifications"], 1)
+        self.assertFalse(NotificationJob.objects.exists())
+
+    def test_backoff_doubles_up_to_cap(self):
+        with self.settings(NOTIFICATION_RETRY_MAX_DELAY=100):
+            delays = [queue.retry_delay(attempts).total_seconds() for attempts in (1, 2, 3, 4)]
+        self.assertEqual(delays, [30, 60, 100, 100])
+
+    def test_marked_failed_after_max_attempts(self):
+        self.queue_message()
+        with mock.patch("notifications.counters.create", side_effect=RuntimeError):
+            with self.assertLogs("notifications.queue", "WARNING"):
+                result = queue.drain(max_attempts=1)
+        self.assertEqual(result["failed"], 1)
+        self.assertTrue(NotificationJob.objects.get().failed)
+        self.assertEqual(queue.drain()["jobs"], 0)
+
+    def test_bad_job_falls_back_to_per_job_delivery(self):
+        self.queue_message("Good")
+        NotificationJob.objects.create(payload=[[1, 2]])
+        with self.assertLogs("notifications.queue", "WARNING") as logs:
+            result = queue.drain()
+        self.assertIn("delivering its 2 jobs one by one", logs.output[0])
+        self.assertEqual(result, {"jobs": 2, "notifications": 1, "retrying": 1, "failed": 0})
+        self.assertEqual(Notification.objects.get().message, "Good")
+        self.assertEqual(NotificationJob.objects.get().attempts, 1)
+
+    @override_settings(NOTIFICATIONS_DEFERRED=False)
+    def test_inline_delivery(self):
+        self.assertEqual(notify_user(self.user, "Hello"), 1)
+        self.assertFalse(NotificationJob.objects.exists())
+
+
+@override_settings(NOTIFICATIONS_DEFERRED=False)
+class RecipientCacheTests(TransactionTestCase):
+    """
+    ADMINS resolves from the cache, which follows admin changes only
+
+    A TransactionTestCase so invalidations run on commit as they would in
+    a request.
+    """
+
+    def setUp(self):
+        recipients.invalidate()
+        self.admin = User.objects.create_user("admin", is_staff=True)
+        self.user = User.objects.create_user("student")
+
+    def tearDown(self):
+        # The table flush doesn't send signals
+        recipients.invalidate()
+
+    def cached(self):
+        entry = recipients._cache().get(recipients.CACHE_KEY)
+        return None if entry is None else entry["admins"]
+
+    def warm(self):
+        self.assertEqual(recipients.admin_ids(), [self.admin.id])
+        self.assertEqual(self.cached(), [self.admin.id])
+
+    def test_status_change_does_not_look_up_recipients(self):
+        request = MaintenanceRequest.objects.create(description="Leak", created_by=self.user)
+        self.warm()
+        request.status = "approved"
+        with CaptureQueriesContext(connection) as queries:
+            request.save()
+        tables = ("auth_user", "accounts_staffprofile")
+        self.assertEqual([q["sql"] for q in queries if any(t in q["sql"] for t in tables)], [])
+        self.assertTrue(Notification.objects.filter(user=self.admin, message__contains="Approved").exists())
+
+    def test_admin_changes_invalidate(self):
+        self.warm()
+        self.user.is_staff = True
+        self.user.save()
+        self.assertIsNone(self.cached())
+        self.assertEqual(recipients.admin_ids(), [self.admin.id, self.user.id])
+
+        self.user.is_staff = False
+        self.user.save()
+        self.assertIsNone(self.cached())
+        self.warm()
+
+        self.admin.delete()
+        self.assertIsNone(self.cached())
+        self.assertEqual(recipients.admin_ids(), [])
+
+    def test_unrelated_changes_keep_cache(self):
+        self.warm()
+        self.user.last_login = timezone.now()
+        self.user.save()
+        User.objects.create_user("another")
+        profile = self.user.staffprofile
+        profile.role = "Maintenance Staff"
+        profile.save()
+        self.assertEqual(self.cached(), [self.admin.id])
+        profile.delete()
+        self.assertEqual(self.cached(), [self.admin.id])
+
+    def test_rolled_back_admin_is_not_cached(self):
+        self.warm()
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                temp = User.objects.create_user("temp", is_staff=True)
+                self.assertIn(temp.id, recipients.admin_ids())
+                raise RuntimeError
+        self.assertNotIn(temp.id, recipients.admin_ids())
+
+    def test_caching_resumes_after_rollback(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                User.objects.create_user("temp", is_staff=True)
+                raise RuntimeError
+        self.assertIsNone(self.cached())
+        with transaction.atomic():
+            recipients.admin_ids()
+            self.assertEqual(self.cached(), [self.admin.id])
+
+    def test_unrelated_saves_leave_caching_alone(self):
+        recipients.invalidate()
+        with transaction.atomic():
+            self.user.last_login = timezone.now()
+            self.user.save(update_fields=["last_login"])
+            User.objects.create_user("another")
+            recipients.admin_ids()
+            self.assertEqual(self.cached(), [self.admin.id])
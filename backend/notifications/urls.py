@@ -1,6 +1,10 @@
 from django.urls import path
 from .views import (
     UserNotificationsView,
+    ArchivedNotificationsView,
+    unread_count,
+    notification_stream,
+    stream_ticket,
     mark_notification_read,
     mark_all_read,
     delete_notification,
@@ -8,6 +12,10 @@ from .views import (
 
 urlpatterns = [
     path("my/", UserNotificationsView.as_view(), name="my_notifications"),
+    path("my/archived/", ArchivedNotificationsView.as_view(), name="my_archived_notifications"),
+    path("unread-count/", unread_count, name="unread_notification_count"),
+    path("stream/", notification_stream, name="notification_stream"),
+    path("stream/ticket/", stream_ticket, name="notification_stream_ticket"),
     path("<int:pk>/mark-read/", mark_notification_read, name="mark_notification_read"),
     path("mark-all-read/", mark_all_read, name="mark_all_read"),
     path("<int:pk>/", delete_notification, name="delete_notification"),
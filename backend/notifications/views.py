@@ -1,13 +1,34 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
 from rest_framework import generics, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from .models import Notification
-from .serializers import NotificationSerializer
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from api.authentication import StaffProfileJWTAuthentication
+from api.conditional import ConditionalListMixin
+from . import bus, counters
+from .models import ArchivedNotification, Notification
+from .rows import NOTIFICATION_VALUES, notification_rows
+from .serializers import ArchivedNotificationSerializer, NotificationSerializer
+from .stream import event_stream, issue_ticket, redeem_ticket, ticket_ttl
 
 
-class UserNotificationsView(generics.ListAPIView):
+class UserNotificationsView(ConditionalListMixin, generics.ListAPIView):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # Notifications have no updated_at: new/deleted rows move count/latest,
+    # mark-read moves unread, request status changes move request_updated
+    version_aggregates = {
+        "count": Count("id"),
+        "unread": Count("id", filter=Q(is_read=False)),
+        "latest": Max("id"),
+        "created": Max("created_at"),
+        "request_updated": Max("maintenance_request__updated_at"),
+    }
 
     def get_queryset(self):
         return Notification.objects.filter(
@@ -18,30 +39,65 @@ class UserNotificationsView(generics.ListAPIView):
             'maintenance_request__room'  # Add this if room is ForeignKey
         ).order_by("-created_at")
 
+    def list(self, request, *args, **kwargs):
+        # values() fast path - same JSON as NotificationSerializer
+        queryset = self.filter_queryset(self.get_queryset()).values(*NOTIFICATION_VALUES)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(notification_rows(page))
+        return Response(notification_rows(queryset))
+
+
+class ArchivedNotificationsView(generics.ListAPIView):
+    """The user's notifications about archived requests (read-only)"""
+    serializer_class = ArchivedNotificationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return ArchivedNotification.objects.filter(
+            user=self.request.user
+        ).select_related(
+            'maintenance_request',
+            'maintenance_request__building',
+            'maintenance_request__room',
+        ).order_by("-created_at", "-id")
+
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated])
+def unread_count(request):
+    """The current user's unread notification count, from UnreadCounter"""
+    return Response({"unread": counters.unread(request.user.id)})
+
 
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
 def mark_notification_read(request, pk):
     """Mark a single notification as read"""
-    try:
-        notification = Notification.objects.get(id=pk, user=request.user)
-        notification.is_read = True
-        notification.save()
-        serializer = NotificationSerializer(notification)
-        return Response(serializer.data)
-    except Notification.DoesNotExist:
-        return Response(
-            {"error": "Notification not found"}, status=status.HTTP_404_NOT_FOUND
-        )
+    with transaction.atomic():
+        try:
+            notification = Notification.objects.select_for_update().get(id=pk, user=request.user)
+        except Notification.DoesNotExist:
+            return Response(
+                {"error": "Notification not found"}, status=status.HTTP_404_NOT_FOUND
+            )
+        if not notification.is_read:
+            notification.is_read = True
+            notification.save(update_fields=["is_read"])
+            counters.add({request.user.id: -1})
+    serializer = NotificationSerializer(notification)
+    return Response(serializer.data)
 
 
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
 def mark_all_read(request):
     """Mark all notifications as read for current user"""
-    updated = Notification.objects.filter(user=request.user, is_read=False).update(
-        is_read=True
-    )
+    with transaction.atomic():
+        updated = Notification.objects.filter(user=request.user, is_read=False).update(
+            is_read=True
+        )
+        counters.add({request.user.id: -updated})
 
     return Response(
         {"message": f"{updated} notifications marked as read", "count": updated}
@@ -52,13 +108,71 @@ def mark_all_read(request):
 @permission_classes([permissions.IsAuthenticated])
 def delete_notification(request, pk):
     """Delete a notification"""
-    try:
-        notification = Notification.objects.get(id=pk, user=request.user)
+    with transaction.atomic():
+        try:
+            notification = Notification.objects.select_for_update().get(id=pk, user=request.user)
+        except Notification.DoesNotExist:
+            return Response(
+                {"error": "Notification not found"}, status=status.HTTP_404_NOT_FOUND
+            )
         notification.delete()
-        return Response(
-            {"message": "Notification deleted"}, status=status.HTTP_204_NO_CONTENT
-        )
-    except Notification.DoesNotExist:
-        return Response(
-            {"error": "Notification not found"}, status=status.HTTP_404_NOT_FOUND
-        )
\ No newline at end of file
+        if not notification.is_read:
+            counters.add({request.user.id: -1})
+    return Response(
+        {"message": "Notification deleted"}, status=status.HTTP_204_NO_CONTENT
+    )
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def stream_ticket(request):
+    """
+    A short-lived, single-use ticket for opening the notification stream
+
+    EventSource can't send an Authorization header; the ticket goes in the
+    stream URL instead of the access token (see notifications/stream.py).
+    """
+    return Response({"ticket": issue_ticket(request.user.id), "expires_in": ticket_ttl()})
+
+
+def stream_user(request):
+    """
+    The user a stream request authenticates as, or None
+
+    Accepts a Bearer access token header or a ``?ticket=`` from
+    stream_ticket.
+    """
+    ticket = request.GET.get("ticket")
+    if ticket:
+        user_id = redeem_ticket(ticket)
+        return User.objects.filter(id=user_id, is_active=True).first() if user_id else None
+
+    authentication = StaffProfileJWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if not raw_token:
+        return None
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+@require_GET
+async def notification_stream(request):
+    """Server-sent events for the current user (see notifications/stream.py)"""
+    if not bus.enabled():
+        return JsonResponse({"error": "Notification stream is disabled"}, status=503)
+    user = await sync_to_async(stream_user)(request)
+    if user is None:
+        return JsonResponse({"error": "Authentication credentials were not provided or are invalid"}, status=401)
+
+    last_event_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    last_event_id = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+
+    response = StreamingHttpResponse(
+        event_stream(user.id, last_event_id), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # don't let nginx buffer the stream
+    return response
@@ -26,35 +26,113 @@ function NotificationBell() {
         notificationsData = [];
       }
       
-      const unread = notificationsData.filter(n => !n.is_read);
-      
+      setNotifications(notificationsData.filter(n => !n.is_read));
+    } catch (error) {
+      console.error('Error fetching notifications:', error);
+      setNotifications([]);
+    }
+  }, []);
+
+  const applyUnreadCount = useCallback((unread) => {
+    setUnreadCount((previous) => {
       // Check if there are new notifications
-      if (unread.length > unreadCount && unreadCount !== 0) {
+      if (unread > previous && previous !== 0) {
         setShowNewBadge(true);
         // Auto-hide the "new" indicator after 3 seconds
         setTimeout(() => setShowNewBadge(false), 3000);
       }
-      
-      setNotifications(unread);
-      setUnreadCount(unread.length);
+      return unread;
+    });
+  }, []);
+
+  // The badge only needs the count: a few bytes per poll instead of the list
+  const fetchUnreadCount = useCallback(async () => {
+    try {
+      const response = await notificationAPI.getUnreadCount();
+      applyUnreadCount(response.data?.unread ?? 0);
     } catch (error) {
-      console.error('Error fetching notifications:', error);
-      setNotifications([]);
-      setUnreadCount(0);
+      console.error('Error fetching unread count:', error);
     }
-  }, [unreadCount]);
+  }, [applyUnreadCount]);
 
+  // Live updates over server-sent events; polls the count while the stream
+  // is unavailable (no EventSource, not signed in, or the server refused it)
   useEffect(() => {
-    fetchNotifications();
+    let source = null;
+    let reconnectTimer = null;
+    let lastEventId = null;
+    let stopped = false;
+
+    const track = (event) => {
+      if (event.lastEventId) lastEventId = event.lastEventId;
+    };
+
+    const connect = async () => {
+      const signedIn = localStorage.getItem('access_token') || localStorage.getItem('token');
+      if (!signedIn || typeof EventSource === 'undefined') return fetchUnreadCount();
+
+      // The stream URL carries a single-use ticket, never the access token
+      let ticket;
+      try {
+        ticket = (await notificationAPI.createStreamTicket()).data.ticket;
+      } catch (error) {
+        console.error('Error opening notification stream:', error);
+        if (!stopped) reconnectTimer = setTimeout(connect, 15000);
+        return fetchUnreadCount();
+      }
+      if (stopped) return;
+
+      const params = { ticket };
+      if (lastEventId) params.last_event_id = lastEventId;
+      source = new EventSource(notificationAPI.streamUrl(params));
+
+      source.addEventListener('unread', (event) => {
+        track(event);
+        applyUnreadCount(JSON.parse(event.data).unread);
+      });
+      source.addEventListener('notification', (event) => {
+        track(event);
+        const notification = JSON.parse(event.data);
+        setNotifications((current) =>
+          current.some((n) => n.id === notification.id) ? current : [notification, ...current]
+        );
+      });
+      source.onerror = () => {
+        // EventSource would retry with the same, already used ticket:
+        // reconnect with a fresh one instead
+        source.close();
+        source = null;
+        reconnectTimer = setTimeout(connect, 5000);
+      };
+    };
+
+    connect();
     // Refresh every 15 seconds for more responsive updates
-    const interval = setInterval(fetchNotifications, 15000);
-    return () => clearInterval(interval);
-  }, [fetchNotifications]);
+    const interval = setInterval(() => {
+      if (!source || source.readyState !== EventSource.OPEN) fetchUnreadCount();
+    }, 15000);
+
+    return () => {
+      stopped = true;
+      clearInterval(interval);
+      clearTimeout(reconnectTimer);
+      if (source) source.close();
+    };
+  }, [fetchUnreadCount, applyUnreadCount]);
+
+  // Load the list itself only while the dropdown is open, and again when
+  // the count changes under it
+  useEffect(() => {
+    if (showDropdown) {
+      fetchNotifications();
+    }
+  }, [showDropdown, unreadCount, fetchNotifications]);
 
   const markAsRead = async (id) => {
     try {
       await notificationAPI.markAsRead(id);
-      await fetchNotifications();
+      setNotifications((current) => current.filter((n) => n.id !== id));
+      await fetchUnreadCount();
     } catch (error) {
       console.error('Error marking as read:', error);
     }
@@ -63,7 +141,8 @@ function NotificationBell() {
   const markAllAsRead = async () => {
     try {
       await notificationAPI.markAllAsRead();
-      await fetchNotifications();
+      setNotifications([]);
+      await fetchUnreadCount();
     } catch (error) {
       console.error('Error marking all as read:', error);
     }
@@ -35,26 +35,9 @@ const AnalyticsPage = () => {
     setError(null);
     
     try {
-      // Fetch all maintenance requests
-      const response = await api.get('/maintenance/requests/');
-      
-      // Handle different response formats (array or paginated object)
-      let requests = response.data;
-      
-      // If response is paginated (has results key), use results array
-      if (requests && typeof requests === 'object' && requests.results) {
-        requests = requests.results;
-      }
-      
-      // Ensure requests is an array
-      if (!Array.isArray(requests)) {
-        console.error('Unexpected response format:', requests);
-        throw new Error('Invalid data format received from server');
-      }
-      
-      // Process the data
-      const processedData = processAnalytics(requests);
-      setAnalytics(processedData);
+      // Analytics are aggregated on the server
+      const response = await api.get('/maintenance/analytics/');
+      setAnalytics(processAnalytics(response.data));
     } catch (err) {
       console.error('Error fetching analytics:', err);
       setError(err.message || 'Failed to load analytics data. Please try again later.');
@@ -63,188 +46,26 @@ const AnalyticsPage = () => {
     }
   };
 
-  const processAnalytics = (requests) => {
-    const now = new Date();
-    const last7Days = new Date(now.getTime() - 7 * 24 * 60 * 60 * 1000);
-    const last30Days = new Date(now.getTime() - 30 * 24 * 60 * 60 * 1000);
-
-    // Calculate status counts
-    const statusCounts = {
-      pending: requests.filter(r => r.status === 'pending').length,
-      in_progress: requests.filter(r => r.status === 'in_progress').length,
-      completed: requests.filter(r => r.status === 'completed').length
-    };
-
-    // Calculate average times
-    const { avgResponse, avgCompletion } = calculateAverageTimes(requests);
-
-    // Calculate trends
-    const requestTrends = calculateTrends(requests, 'created_at', 30);
-    const completionTrends = calculateCompletionTrends(requests, 30);
-
-    // Calculate location statistics
-    const locationStats = calculateLocationStats(requests);
-
-    // Calculate user engagement
-    const userEngagement = calculateUserEngagement(requests, last30Days);
-
-    // Recent metrics
-    const recentRequests = requests.filter(r => new Date(r.created_at) >= last7Days);
-    const recentMonthRequests = requests.filter(r => new Date(r.created_at) >= last30Days);
-    const completionRate = statusCounts.completed > 0 
-      ? ((statusCounts.completed / requests.length) * 100).toFixed(1)
-      : 0;
-
-    return {
-      avgResponseTime: avgResponse,
-      avgCompletionTime: avgCompletion,
-      totalRequests: requests.length,
-      completedRequests: statusCounts.completed,
-      pendingRequests: statusCounts.pending,
-      inProgressRequests: statusCounts.in_progress,
-      requestTrends,
-      completionTrends,
-      locationStats,
-      userEngagement,
-      recentMetrics: {
-        last7Days: recentRequests.length,
-        last30Days: recentMonthRequests.length,
-        completionRate
-      }
-    };
-  };
-
-  const calculateAverageTimes = (requests) => {
-    const inProgressRequests = requests.filter(r => 
-      r.status === 'in_progress' || r.status === 'completed'
-    );
-    
-    const completedRequests = requests.filter(r => r.status === 'completed');
-
-    // Calculate average response time (created -> in_progress)
-    let totalResponseTime = 0;
-    let responseCount = 0;
-    
-    inProgressRequests.forEach(req => {
-      const created = new Date(req.created_at);
-      const updated = new Date(req.updated_at);
-      const diffHours = (updated - created) / (1000 * 60 * 60);
-      
-      if (diffHours >= 0) {
-        totalResponseTime += diffHours;
-        responseCount++;
-      }
-    });
-
-    // Calculate average completion time (created -> completed)
-    let totalCompletionTime = 0;
-    let completionCount = 0;
-    
-    completedRequests.forEach(req => {
-      const created = new Date(req.created_at);
-      const updated = new Date(req.updated_at);
-      const diffHours = (updated - created) / (1000 * 60 * 60);
-      
-      if (diffHours >= 0) {
-        totalCompletionTime += diffHours;
-        completionCount++;
-      }
-    });
-
-    return {
-      avgResponse: responseCount > 0 ? (totalResponseTime / responseCount).toFixed(1) : 0,
-      avgCompletion: completionCount > 0 ? (totalCompletionTime / completionCount).toFixed(1) : 0
-    };
-  };
-
-  const calculateTrends = (requests, dateField, days) => {
-    const trends = {};
-    const now = new Date();
-    
-    // Initialize last 'days' days
-    for (let i = days - 1; i >= 0; i--) {
-      const date = new Date(now.getTime() - i * 24 * 60 * 60 * 1000);
-      const dateStr = date.toISOString().split('T')[0];
-      trends[dateStr] = 0;
-    }
-
-    // Count requests per day
-    requests.forEach(req => {
-      const reqDate = new Date(req[dateField]).toISOString().split('T')[0];
-      if (trends.hasOwnProperty(reqDate)) {
-        trends[reqDate]++;
-      }
-    });
-
-    // Convert to array for recharts
-    return Object.entries(trends).map(([date, count]) => ({
-      date: new Date(date).toLocaleDateString('en-US', { month: 'short', day: 'numeric' }),
-      requests: count
-    }));
-  };
-
-  const calculateCompletionTrends = (requests, days) => {
-    const trends = {};
-    const now = new Date();
-    
-    // Initialize last 'days' days
-    for (let i = days - 1; i >= 0; i--) {
-      const date = new Date(now.getTime() - i * 24 * 60 * 60 * 1000);
-      const dateStr = date.toISOString().split('T')[0];
-      trends[dateStr] = 0;
+  const formatDay = (date) =>
+    new Date(`${date}T00:00:00`).toLocaleDateString('en-US', { month: 'short', day: 'numeric' });
+
+  const processAnalytics = (data) => ({
+    avgResponseTime: data.avg_response_time ?? 0,
+    avgCompletionTime: data.avg_completion_time ?? 0,
+    totalRequests: data.total_requests,
+    completedRequests: data.status_counts.completed,
+    pendingRequests: data.status_counts.pending,
+    inProgressRequests: data.status_counts.in_progress,
+    requestTrends: data.request_trends.map(({ date, requests }) => ({ date: formatDay(date), requests })),
+    completionTrends: data.completion_trends.map(({ date, completed }) => ({ date: formatDay(date), completed })),
+    locationStats: data.top_locations,
+    userEngagement: data.user_engagement,
+    recentMetrics: {
+      last7Days: data.recent.last_7_days,
+      last30Days: data.recent.last_30_days,
+      completionRate: data.completion_rate
     }
-
-    // Count completed requests per day
-    const completedRequests = requests.filter(r => r.status === 'completed');
-    completedRequests.forEach(req => {
-      const reqDate = new Date(req.updated_at).toISOString().split('T')[0];
-      if (trends.hasOwnProperty(reqDate)) {
-        trends[reqDate]++;
-      }
-    });
-
-    // Convert to array for recharts
-    return Object.entries(trends).map(([date, count]) => ({
-      date: new Date(date).toLocaleDateString('en-US', { month: 'short', day: 'numeric' }),
-      completed: count
-    }));
-  };
-
-  const calculateLocationStats = (requests) => {
-    const locationMap = {};
-
-    requests.forEach(req => {
-      // Extract the actual name/number from the objects
-      const buildingName = req.building?.name || 'Unknown Building';
-      const floorNumber = req.floor?.number || 'N/A';
-      
-      const location = `${buildingName} - Floor ${floorNumber}`;
-      locationMap[location] = (locationMap[location] || 0) + 1;
-    });
-
-    // Sort by count and take top 10
-    return Object.entries(locationMap)
-      .map(([location, count]) => ({ location, count }))
-      .sort((a, b) => b.count - a.count)
-      .slice(0, 10);
-  };
-
-  const calculateUserEngagement = (requests, since) => {
-    const userMap = {};
-
-    requests
-      .filter(r => new Date(r.created_at) >= since)
-      .forEach(req => {
-        const user = req.requester_name || 'Anonymous';
-        userMap[user] = (userMap[user] || 0) + 1;
-      });
-
-    // Sort by count and take top 10
-    return Object.entries(userMap)
-      .map(([user, count]) => ({ user, count }))
-      .sort((a, b) => b.count - a.count)
-      .slice(0, 10);
-  };
+  });
 
   if (loading) {
     return (
@@ -626,7 +626,7 @@ const ComplaintsPage = () => {
                     <div>
                       <label className="block text-sm font-medium text-gray-700 mb-2">Issue Photo</label>
                       <img 
-                        src={getImageUrl(selectedComplaint.issue_photo)}
+                        src={getImageUrl(selectedComplaint.issue_photo_variants?.medium || selectedComplaint.issue_photo)}
                         alt="Issue" 
                         className="w-full max-h-64 object-contain rounded border"
                         onError={(e) => {
@@ -727,7 +727,7 @@ const ComplaintsPage = () => {
                   <div>
                     <label className="block text-sm font-medium text-gray-700 mb-2">Completion Photo</label>
                     <img 
-                      src={getImageUrl(selectedComplaint.completion_photo)}
+                      src={getImageUrl(selectedComplaint.completion_photo_variants?.medium || selectedComplaint.completion_photo)}
                       alt="Completion" 
                       className="w-full max-h-64 object-contain rounded border"
                       onError={(e) => {
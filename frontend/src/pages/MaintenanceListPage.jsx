@@ -511,7 +511,7 @@ function MaintenanceList() {
                   <div>
                     <label className="block text-sm font-medium text-gray-700 mb-2">Issue Photo</label>
                     <img 
-                      src={getImageUrl(selectedRequest.issue_photo)}
+                      src={getImageUrl(selectedRequest.issue_photo_variants?.medium || selectedRequest.issue_photo)}
                       alt="Issue" 
                       className="w-full max-h-64 object-contain rounded border"
                       onError={(e) => {
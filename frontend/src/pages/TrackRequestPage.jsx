@@ -390,7 +390,7 @@ export default function TrackRequest() {
                               <h3 className="font-semibold text-gray-800">Issue Photo</h3>
                             </div>
                             <img 
-                              src={getImageUrl(selectedRequest.issue_photo)}
+                              src={getImageUrl(selectedRequest.issue_photo_variants?.medium || selectedRequest.issue_photo)}
                               alt="Issue"
                               className="w-full max-h-64 object-contain rounded border"
                             />
@@ -106,6 +106,11 @@ export const requestAPI = {
 // Notification API
 export const notificationAPI = {
   getAll: () => api.get('/notifications/my/'),
+  getUnreadCount: () => api.get('/notifications/unread-count/'),
+  // EventSource can't send headers: open the stream with a single-use
+  // ticket from createStreamTicket, never the access token
+  createStreamTicket: () => api.post('/notifications/stream/ticket/'),
+  streamUrl: (params) => `${API_BASE_URL}/api/notifications/stream/?${new URLSearchParams(params)}`,
   markAsRead: (id) => api.post(`/notifications/${id}/mark-read/`),
   markAllAsRead: () => api.post('/notifications/mark-all-read/'),
   delete: (id) => api.delete(`/notifications/${id}/`),